@@ -0,0 +1,84 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import jsii
+from aws_cdk import (
+    BundlingOptions,
+    ILocalBundling,
+    aws_lambda as _lambda
+)
+
+# Only these files make up the function; tests, caches and notes stay out of the asset
+SOURCE_PATTERNS = ["*.py", "*.sh"]
+
+# Hash-based pycs stay valid even though asset zips don't preserve mtimes,
+# so the read-only /var/task never has to be recompiled at cold start
+COMPILE_ARGS = ["-m", "compileall", "-q", "--invalidation-mode", "unchecked-hash", "-j", "0"]
+
+DOCKER_COMMAND = " && ".join([
+    "pip install --no-cache-dir --no-compile -r requirements.txt -t /asset-output",
+    "cp " + " ".join(SOURCE_PATTERNS) + " /asset-output/",
+    "python " + " ".join(COMPILE_ARGS) + " /asset-output",
+    "find /asset-output -type d \\( -name tests -o -name '*.dist-info' \\) -prune -exec rm -rf {} +",
+])
+
+
+# pip platform tags for Lambda's Amazon Linux 2023 runtimes
+PIP_PLATFORMS = {
+    "x86_64": "manylinux2014_x86_64",
+    "arm64": "manylinux2014_aarch64",
+}
+
+
+@jsii.implements(ILocalBundling)
+class LocalPythonBundling:
+    """
+    Bundle on the host when its Python matches the Lambda runtime, skipping Docker.
+
+    Wheels are selected for the function's architecture rather than the host's,
+    so numpy, orjson and brotli are correct even when bundling for arm64 on x86.
+    """
+
+    def __init__(self, source_dir, runtime, architecture=_lambda.Architecture.X86_64):
+        self.source_dir = Path(source_dir)
+        self.runtime = runtime
+        self.architecture = architecture
+
+    def try_bundle(self, output_dir, *, image, **kwargs):
+        if self.runtime.name != f"python{sys.version_info.major}.{sys.version_info.minor}":
+            return False
+
+        output = Path(output_dir)
+        subprocess.run(
+            [sys.executable, "-m", "pip", "install", "--no-cache-dir", "--no-compile",
+             "--platform", PIP_PLATFORMS[self.architecture.name], "--only-binary=:all:",
+             "--implementation", "cp", "--python-version", self.runtime.name[len("python"):],
+             "-r", str(self.source_dir / "requirements.txt"), "-t", str(output)],
+            check=True
+        )
+        for pattern in SOURCE_PATTERNS:
+            for path in self.source_dir.glob(pattern):
+                shutil.copy2(path, output / path.name)
+        subprocess.run([sys.executable, *COMPILE_ARGS, str(output)], check=True)
+        for path in list(output.glob("*.dist-info")):
+            shutil.rmtree(path)
+        return True
+
+
+def bundled_lambda_code(source_dir, runtime, architecture=_lambda.Architecture.X86_64):
+    """
+    Build a minimal, precompiled asset for the Lambda source directory.
+
+    boto3/botocore come from the Lambda runtime and are not bundled.
+    """
+    return _lambda.Code.from_asset(
+        source_dir,
+        bundling=BundlingOptions(
+            image=runtime.bundling_image,
+            platform=architecture.docker_platform,
+            command=["bash", "-c", DOCKER_COMMAND],
+            local=LocalPythonBundling(source_dir, runtime, architecture)
+        )
+    )
@@ -0,0 +1,143 @@
+import json
+from typing import NamedTuple, Optional, Tuple
+
+from aws_cdk import aws_lambda as _lambda
+
+
+class ScalingSchedule(NamedTuple):
+    """
+    Provisioned-concurrency bounds applied from a cron/rate expression onward
+    """
+    name: str
+    expression: str
+    min_capacity: Optional[int] = None
+    max_capacity: Optional[int] = None
+
+
+class StackSettings(NamedTuple):
+    """
+    Function sizing and concurrency for SummarizationApiStack.
+
+    The defaults deploy on Graviton with on-demand concurrency only; provisioned
+    concurrency is billed while allocated, so it is opt-in.
+    """
+    architecture: str = "arm64"
+    runtime: str = "python3.13"
+    memory_size: int = 512
+    worker_memory_size: int = 512
+    # Caps the API function so a burst can't starve the rest of the account
+    reserved_concurrency: Optional[int] = None
+    # Instances kept initialized on the "live" alias; 0 disables provisioned concurrency
+    provisioned_concurrency: int = 0
+    # Upper bound for utilization-based scaling; equal to the minimum disables it
+    provisioned_concurrency_max: Optional[int] = None
+    provisioned_concurrency_utilization: float = 0.7
+    provisioned_concurrency_schedules: Tuple[ScalingSchedule, ...] = ()
+    # SnapStart for the API function (Python 3.12+, no provisioned concurrency);
+    # off by default because snapshot caching and restores are billed
+    snap_start: bool = False
+    # SQS ingestion: messages per worker invocation and how long to wait to fill a batch
+    ingest_batch_size: int = 10
+    ingest_batching_window_seconds: int = 0
+    # Concurrent worker invocations the queue may drive; None leaves it to Lambda
+    ingest_max_concurrency: Optional[int] = None
+    # Items summarized in parallel within one invocation
+    ingest_max_workers: int = 8
+    # Deliveries before a message moves to the dead-letter queue
+    ingest_max_receive_count: int = 3
+
+    @property
+    def lambda_architecture(self):
+        if self.architecture == "arm64":
+            return _lambda.Architecture.ARM_64
+        if self.architecture == "x86_64":
+            return _lambda.Architecture.X86_64
+        raise ValueError(f"Unsupported architecture: {self.architecture}")
+
+    @property
+    def lambda_runtime(self):
+        runtime = getattr(_lambda.Runtime, self.runtime.upper().replace("PYTHON", "PYTHON_").replace(".", "_"), None)
+        if runtime is None or runtime.family != _lambda.RuntimeFamily.PYTHON:
+            raise ValueError(f"Unsupported runtime: {self.runtime}")
+        return runtime
+
+    @property
+    def snap_start_supported(self):
+        version = tuple(int(part) for part in self.runtime[len("python"):].split("."))
+        return version >= (3, 12) and not self.provisioned_concurrency
+
+    @property
+    def scaling_max(self):
+        return max(self.provisioned_concurrency_max or 0, self.provisioned_concurrency,
+                   *(schedule.max_capacity or schedule.min_capacity or 0 for schedule in self.provisioned_concurrency_schedules))
+
+    def validate(self):
+        """
+        Raise ValueError for combinations Lambda would reject at deploy time
+        """
+        self.lambda_architecture
+        self.lambda_runtime
+        if not 128 <= self.memory_size <= 10240 or not 128 <= self.worker_memory_size <= 10240:
+            raise ValueError("memory_size must be between 128 and 10240 MB")
+        if self.provisioned_concurrency < 0:
+            raise ValueError("provisioned_concurrency must not be negative")
+        if self.provisioned_concurrency_max is not None and self.provisioned_concurrency_max < self.provisioned_concurrency:
+            raise ValueError("provisioned_concurrency_max must be at least provisioned_concurrency")
+        if not 0 < self.provisioned_concurrency_utilization <= 1:
+            raise ValueError("provisioned_concurrency_utilization must be in (0, 1]")
+        if self.provisioned_concurrency_schedules and not self.provisioned_concurrency:
+            raise ValueError("provisioned_concurrency_schedules require provisioned_concurrency")
+        if self.reserved_concurrency is not None and self.reserved_concurrency < self.scaling_max:
+            raise ValueError("reserved_concurrency must cover the maximum provisioned concurrency")
+        if self.snap_start and not self.snap_start_supported:
+            raise ValueError("snap_start requires python3.12 or later and no provisioned concurrency")
+        if not 1 <= self.ingest_batch_size <= 10000:
+            raise ValueError("ingest_batch_size must be between 1 and 10000")
+        if not 0 <= self.ingest_batching_window_seconds <= 300:
+            raise ValueError("ingest_batching_window_seconds must be between 0 and 300")
+        if self.ingest_batch_size > 10 and not self.ingest_batching_window_seconds:
+            raise ValueError("ingest_batch_size above 10 requires ingest_batching_window_seconds")
+        if self.ingest_max_concurrency is not None and not 2 <= self.ingest_max_concurrency <= 1000:
+            raise ValueError("ingest_max_concurrency must be between 2 and 1000")
+        if self.ingest_max_workers < 1 or self.ingest_max_receive_count < 1:
+            raise ValueError("ingest_max_workers and ingest_max_receive_count must be positive")
+        return self
+
+    @classmethod
+    def from_context(cls, node):
+        """
+        Read settings from CDK context (cdk.json or `cdk deploy -c key=value`).
+
+        Values passed with -c arrive as strings, so numbers and the JSON list of
+        schedules are parsed here.
+        """
+        def get(key, convert):
+            value = node.try_get_context(key)
+            if value is None or value == "":
+                return cls._field_defaults[key]
+            return convert(value)
+
+        def boolean(value):
+            return value if isinstance(value, bool) else str(value).lower() == "true"
+
+        def schedules(value):
+            items = json.loads(value) if isinstance(value, str) else value
+            return tuple(ScalingSchedule(**item) for item in items)
+
+        return cls(
+            architecture=get("architecture", str),
+            runtime=get("runtime", str),
+            memory_size=get("memory_size", int),
+            worker_memory_size=get("worker_memory_size", int),
+            reserved_concurrency=get("reserved_concurrency", int),
+            provisioned_concurrency=get("provisioned_concurrency", int),
+            provisioned_concurrency_max=get("provisioned_concurrency_max", int),
+            provisioned_concurrency_utilization=get("provisioned_concurrency_utilization", float),
+            provisioned_concurrency_schedules=get("provisioned_concurrency_schedules", schedules),
+            snap_start=get("snap_start", boolean),
+            ingest_batch_size=get("ingest_batch_size", int),
+            ingest_batching_window_seconds=get("ingest_batching_window_seconds", int),
+            ingest_max_concurrency=get("ingest_max_concurrency", int),
+            ingest_max_workers=get("ingest_max_workers", int),
+            ingest_max_receive_count=get("ingest_max_receive_count", int)
+        ).validate()
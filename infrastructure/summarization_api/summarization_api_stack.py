@@ -3,29 +3,197 @@ from aws_cdk import (
     aws_apigatewayv2 as apigatewayv2,
     aws_apigatewayv2_integrations as apigateway_integrations,
     aws_lambda as _lambda,
+    aws_dynamodb as dynamodb,
     aws_logs as logs,
     aws_iam as iam,
+    aws_s3 as s3,
+    aws_sqs as sqs,
+    aws_lambda_event_sources as lambda_event_sources,
+    aws_applicationautoscaling as appscaling,
     Duration,
     RemovalPolicy,
     CfnOutput
 )
 from constructs import Construct
+from .lambda_bundling import bundled_lambda_code
+from .stack_settings import StackSettings
 
 class SummarizationApiStack(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(self, scope: Construct, construct_id: str, settings: StackSettings = None, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # Sizing and concurrency come from CDK context unless passed in
+        settings = (settings or StackSettings.from_context(self.node)).validate()
+        runtime = settings.lambda_runtime
+        architecture = settings.lambda_architecture
+
+        # One minimal, precompiled asset shared by every function
+        lambda_code = bundled_lambda_code("./lambda", runtime, architecture)
+
+        # Table holding asynchronous job state and results
+        jobs_table = dynamodb.Table(
+            self, "JobsTable",
+            partition_key=dynamodb.Attribute(name="job_id", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        # Table holding rolling-summary documents
+        documents_table = dynamodb.Table(
+            self, "DocumentsTable",
+            partition_key=dynamodb.Attribute(name="document_id", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        # Bucket holding documents submitted by reference or presigned upload
+        input_bucket = s3.Bucket(
+            self, "InputBucket",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            enforce_ssl=True,
+            cors=[
+                s3.CorsRule(
+                    allowed_methods=[s3.HttpMethods.PUT],
+                    allowed_origins=["*"],
+                    allowed_headers=["*"]
+                )
+            ],
+            lifecycle_rules=[
+                s3.LifecycleRule(prefix="uploads/", expiration=Duration.days(1)),
+                # Job inputs too large for a DynamoDB item; kept as long as the job
+                s3.LifecycleRule(prefix="jobs/", expiration=Duration.days(7))
+            ],
+            removal_policy=RemovalPolicy.DESTROY,
+            auto_delete_objects=True
+        )
+
+        # Table holding token buckets shared by all containers calling Bedrock
+        rate_limit_table = dynamodb.Table(
+            self, "RateLimitTable",
+            partition_key=dynamodb.Attribute(name="bucket_key", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+        # Background worker for long-running jobs, invoked asynchronously
+        job_worker_lambda = _lambda.Function(
+            self, "JobWorkerFunction",
+            runtime=runtime,
+            architecture=architecture,
+            handler="job_worker.handler",
+            code=lambda_code,
+            timeout=Duration.minutes(15),
+            memory_size=settings.worker_memory_size,
+            retry_attempts=1,
+            environment={
+                "JOBS_TABLE_NAME": jobs_table.table_name,
+                "RATE_LIMIT_TABLE_NAME": rate_limit_table.table_name,
+                "INPUT_BUCKET_NAME": input_bucket.bucket_name
+            }
+        )
+        jobs_table.grant_read_write_data(job_worker_lambda)
+        input_bucket.grant_read(job_worker_lambda, "jobs/*")
+        rate_limit_table.grant_read_write_data(job_worker_lambda)
+        job_worker_lambda.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=['bedrock:InvokeModel'],
+                resources=['*']
+            )
+        )
+
+        # Bulk ingestion: producers enqueue documents, the worker summarizes
+        # each SQS batch concurrently and reports only failed messages for retry
+        ingest_worker_timeout = Duration.minutes(5)
+        ingest_dead_letter_queue = sqs.Queue(
+            self, "IngestDeadLetterQueue",
+            retention_period=Duration.days(14),
+            enforce_ssl=True
+        )
+        ingest_queue = sqs.Queue(
+            self, "IngestQueue",
+            # Six times the worker timeout, as Lambda recommends, so messages
+            # aren't redelivered while a throttled invocation is still retried
+            visibility_timeout=Duration.minutes(ingest_worker_timeout.to_minutes() * 6),
+            retention_period=Duration.days(4),
+            enforce_ssl=True,
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=settings.ingest_max_receive_count,
+                queue=ingest_dead_letter_queue
+            )
+        )
+
+        ingest_worker_lambda = _lambda.Function(
+            self, "IngestWorkerFunction",
+            runtime=runtime,
+            architecture=architecture,
+            handler="ingest_worker.handler",
+            code=lambda_code,
+            timeout=ingest_worker_timeout,
+            memory_size=settings.worker_memory_size,
+            environment={
+                "JOBS_TABLE_NAME": jobs_table.table_name,
+                "RATE_LIMIT_TABLE_NAME": rate_limit_table.table_name,
+                "INPUT_BUCKET_NAME": input_bucket.bucket_name,
+                "INGEST_MAX_WORKERS": str(settings.ingest_max_workers),
+                "INGEST_MAX_RECEIVE_COUNT": str(settings.ingest_max_receive_count)
+            }
+        )
+        jobs_table.grant_read_write_data(ingest_worker_lambda)
+        rate_limit_table.grant_read_write_data(ingest_worker_lambda)
+        input_bucket.grant_read(ingest_worker_lambda)
+        ingest_worker_lambda.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=['bedrock:InvokeModel'],
+                resources=['*']
+            )
+        )
+        ingest_worker_lambda.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                ingest_queue,
+                batch_size=settings.ingest_batch_size,
+                max_batching_window=Duration.seconds(settings.ingest_batching_window_seconds) if settings.ingest_batching_window_seconds else None,
+                max_concurrency=settings.ingest_max_concurrency,
+                report_batch_item_failures=True
+            )
+        )
+
         # Lambda function for summarization
         summarization_lambda = _lambda.Function(
             self, "SummarizationFunction",
-            runtime=_lambda.Runtime.PYTHON_3_9,
+            runtime=runtime,
+            architecture=architecture,
             handler="summarization.handler",
-            code=_lambda.Code.from_asset("./lambda"),
+            code=lambda_code,
             timeout=Duration.minutes(5),
-            memory_size=512,
+            memory_size=settings.memory_size,
+            reserved_concurrent_executions=settings.reserved_concurrency,
+            # Restores a snapshot of the initialized (and primed) environment on
+            # scale-out; see lambda/snapstart.py for the runtime hooks
+            snap_start=_lambda.SnapStartConf.ON_PUBLISHED_VERSIONS if settings.snap_start else None,
             dead_letter_queue_enabled=True,
-            retry_attempts=2
+            retry_attempts=2,
+            environment={
+                "JOBS_TABLE_NAME": jobs_table.table_name,
+                "JOB_WORKER_FUNCTION_NAME": job_worker_lambda.function_name,
+                "DOCUMENTS_TABLE_NAME": documents_table.table_name,
+                "RATE_LIMIT_TABLE_NAME": rate_limit_table.table_name,
+                "INPUT_BUCKET_NAME": input_bucket.bucket_name
+            }
         )
+        jobs_table.grant_read_write_data(summarization_lambda)
+        documents_table.grant_read_write_data(summarization_lambda)
+        rate_limit_table.grant_read_write_data(summarization_lambda)
+        job_worker_lambda.grant_invoke(summarization_lambda)
+        # Read for s3:// sources; put so presigned upload URLs it signs are
+        # honoured, and for job inputs too large for the jobs table
+        input_bucket.grant_read(summarization_lambda)
+        input_bucket.grant_put(summarization_lambda, "uploads/*")
+        input_bucket.grant_put(summarization_lambda, "jobs/*")
         
         # Grant permission to invoke Bedrock models
         summarization_lambda.add_to_role_policy(
@@ -36,6 +204,76 @@ class SummarizationApiStack(Stack):
             )
         )
 
+        # The API invokes the "live" alias so provisioned concurrency, which is
+        # configured per version, actually serves requests
+        summarization_alias = _lambda.Alias(
+            self, "SummarizationLiveAlias",
+            alias_name="live",
+            version=summarization_lambda.current_version,
+            provisioned_concurrent_executions=settings.provisioned_concurrency or None
+        )
+        if settings.provisioned_concurrency and settings.scaling_max > settings.provisioned_concurrency:
+            scaling = summarization_alias.add_auto_scaling(
+                min_capacity=settings.provisioned_concurrency,
+                max_capacity=settings.scaling_max
+            )
+            if (settings.provisioned_concurrency_max or 0) > settings.provisioned_concurrency:
+                scaling.scale_on_utilization(utilization_target=settings.provisioned_concurrency_utilization)
+            for schedule in settings.provisioned_concurrency_schedules:
+                scaling.scale_on_schedule(
+                    schedule.name,
+                    schedule=appscaling.Schedule.expression(schedule.expression),
+                    min_capacity=schedule.min_capacity,
+                    max_capacity=schedule.max_capacity
+                )
+
+        # Lambda function that streams summaries through a function URL.
+        # Python runtimes can't stream responses natively, so the Lambda Web
+        # Adapter layer runs streaming.py as a local HTTP server and relays
+        # its chunked output.
+        streaming_lambda = _lambda.Function(
+            self, "StreamingSummarizationFunction",
+            runtime=runtime,
+            architecture=architecture,
+            handler="run.sh",
+            code=lambda_code,
+            timeout=Duration.minutes(5),
+            memory_size=settings.memory_size,
+            layers=[
+                _lambda.LayerVersion.from_layer_version_arn(
+                    self, "LambdaWebAdapterLayer",
+                    f"arn:aws:lambda:{self.region}:753240598075:layer:"
+                    f"LambdaAdapterLayer{'Arm64' if settings.architecture == 'arm64' else 'X86'}:25"
+                )
+            ],
+            environment={
+                "AWS_LAMBDA_EXEC_WRAPPER": "/opt/bootstrap",
+                "AWS_LWA_INVOKE_MODE": "response_stream",
+                "AWS_LWA_READINESS_CHECK_PATH": "/health",
+                "PORT": "8080",
+                "RATE_LIMIT_TABLE_NAME": rate_limit_table.table_name
+            }
+        )
+        rate_limit_table.grant_read_write_data(streaming_lambda)
+
+        streaming_lambda.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=['bedrock:InvokeModel', 'bedrock:InvokeModelWithResponseStream'],
+                resources=['*']
+            )
+        )
+
+        streaming_url = streaming_lambda.add_function_url(
+            auth_type=_lambda.FunctionUrlAuthType.NONE,
+            invoke_mode=_lambda.InvokeMode.RESPONSE_STREAM,
+            cors=_lambda.FunctionUrlCorsOptions(
+                allowed_origins=["*"],
+                allowed_methods=[_lambda.HttpMethod.POST, _lambda.HttpMethod.GET],
+                allowed_headers=["*"]
+            )
+        )
+
         # HTTP API Gateway
         api = apigatewayv2.HttpApi(
             self, "SummarizationApi",
@@ -54,7 +292,92 @@ class SummarizationApiStack(Stack):
             methods=[apigatewayv2.HttpMethod.POST],
             integration=apigateway_integrations.HttpLambdaIntegration(
                 "SummarizeIntegration",
-                handler=summarization_lambda,
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        # Create a route for presigned uploads
+        api.add_routes(
+            path="/uploads",
+            methods=[apigatewayv2.HttpMethod.POST],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "CreateUploadIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        # Create a route for batch summarize
+        api.add_routes(
+            path="/summarize/batch",
+            methods=[apigatewayv2.HttpMethod.POST],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "SummarizeBatchIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        # Create a route for multi-document summaries
+        api.add_routes(
+            path="/summarize/multi",
+            methods=[apigatewayv2.HttpMethod.POST],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "SummarizeMultiIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        # Create routes for asynchronous jobs
+        api.add_routes(
+            path="/jobs",
+            methods=[apigatewayv2.HttpMethod.POST],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "SubmitJobIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        api.add_routes(
+            path="/jobs/{id}",
+            methods=[apigatewayv2.HttpMethod.GET],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "GetJobIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        # Create routes for rolling-summary documents
+        api.add_routes(
+            path="/documents",
+            methods=[apigatewayv2.HttpMethod.POST],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "CreateDocumentIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        api.add_routes(
+            path="/documents/{id}/append",
+            methods=[apigatewayv2.HttpMethod.POST],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "AppendDocumentIntegration",
+                handler=summarization_alias,
+                payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
+            )
+        )
+
+        api.add_routes(
+            path="/documents/{id}/summary",
+            methods=[apigatewayv2.HttpMethod.GET],
+            integration=apigateway_integrations.HttpLambdaIntegration(
+                "DocumentSummaryIntegration",
+                handler=summarization_alias,
                 payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
             )
         )
@@ -65,7 +388,7 @@ class SummarizationApiStack(Stack):
             methods=[apigatewayv2.HttpMethod.GET],
             integration=apigateway_integrations.HttpLambdaIntegration(
                 "HealthIntegration",
-                handler=summarization_lambda,
+                handler=summarization_alias,
                 payload_format_version=apigatewayv2.PayloadFormatVersion.VERSION_2_0
             )
         )
@@ -76,3 +399,27 @@ class SummarizationApiStack(Stack):
             value=api.url,
             description="URL of the Summarization API"
         )
+
+        CfnOutput(
+            self, "InputBucketName",
+            value=input_bucket.bucket_name,
+            description="Bucket for documents summarized by s3:// reference"
+        )
+
+        CfnOutput(
+            self, "IngestQueueUrl",
+            value=ingest_queue.queue_url,
+            description="Queue for bulk summarization (see tools/enqueue_documents.py)"
+        )
+
+        CfnOutput(
+            self, "IngestDeadLetterQueueUrl",
+            value=ingest_dead_letter_queue.queue_url,
+            description="Messages that failed ingestion after every retry"
+        )
+
+        CfnOutput(
+            self, "StreamingUrl",
+            value=streaming_url.url,
+            description="Function URL for streaming summaries"
+        )
@@ -1,8 +1,16 @@
-import json
+import contextvars
 import logging
-import boto3
 import os
-from botocore.exceptions import ClientError
+import time
+from concurrent.futures import ThreadPoolExecutor
+from summary_cache import get_summary_cache, make_cache_key
+from resilience import call_with_retries, is_retryable, CircuitOpenError
+from rate_limiter import get_rate_limiter, RateLimitExceeded
+from token_estimator import estimate_tokens, get_token_estimator
+from model_router import get_model_router, DEFAULT_TIER
+from metrics import MILLISECONDS, record_metric, record_phase, record_property
+from extractive import compress_text
+from near_duplicate import get_near_duplicate_index, near_duplicates_enabled
 
 # Configure logging
 logger = logging.getLogger()
@@ -10,6 +18,45 @@ logger.setLevel(logging.INFO)
 
 # Global variables
 bedrock_client = None
+batch_executor = None
+
+DEFAULT_MODEL_ID = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
+SUMMARY_PROMPT = "Please summarize the following text in a concise and clear manner:\n\n{text}"
+
+def get_bedrock_region():
+    """
+    Return the region to call Bedrock in, honouring the Lambda environment
+    """
+    return os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION') or 'us-east-2'
+
+
+def get_bedrock_client_config():
+    """
+    Build the botocore config for the Bedrock client.
+
+    The connection pool is sized to our largest fan-out so parallel calls don't
+    queue for a socket. SDK retries are limited to one attempt by default
+    because resilience.call_with_retries owns retries; adaptive mode still
+    applies client-side rate shaping after throttling responses.
+    """
+    from botocore.config import Config
+    
+    fan_out = max(
+        int(os.environ.get('BATCH_MAX_WORKERS', '16')),
+        int(os.environ.get('MAP_REDUCE_MAX_WORKERS', '8')),
+        int(os.environ.get('INGEST_MAX_WORKERS', '8'))
+    )
+    return Config(
+        max_pool_connections=int(os.environ.get('BEDROCK_MAX_POOL_CONNECTIONS', str(fan_out))),
+        connect_timeout=float(os.environ.get('BEDROCK_CONNECT_TIMEOUT', '2')),
+        read_timeout=float(os.environ.get('BEDROCK_READ_TIMEOUT', '120')),
+        tcp_keepalive=True,
+        retries={
+            'mode': 'adaptive',
+            'total_max_attempts': int(os.environ.get('BEDROCK_SDK_MAX_ATTEMPTS', '1'))
+        }
+    )
+
 
 def get_bedrock_client():
     """
@@ -20,41 +67,388 @@ def get_bedrock_client():
     if bedrock_client:
         return bedrock_client
     
-    bedrock_client = boto3.client(service_name='bedrock-runtime', region_name='us-east-1')
+    # Imported here so routes that never call Bedrock don't pay for boto3
+    import boto3
+    
+    options = {}
+    # Point at a local emulator (tools/bedrock_emulator.py) for offline testing
+    if os.environ.get('BEDROCK_ENDPOINT_URL'):
+        options['endpoint_url'] = os.environ['BEDROCK_ENDPOINT_URL']
+    
+    bedrock_client = boto3.client(
+        service_name='bedrock-runtime',
+        region_name=get_bedrock_region(),
+        config=get_bedrock_client_config(),
+        **options
+    )
     return bedrock_client
 
 
-def summarize_text(text_to_summarize):
+def warm_bedrock_connection():
     """
-    Use Amazon Bedrock to summarize text
+    Open a TLS connection to the Bedrock endpoint so the first request reuses it.
+
+    Sends an unsigned GET through the client's own connection pool; the error
+    response is irrelevant, only the established keep-alive connection matters.
     """
     try:
-        client = get_bedrock_client()
+        from botocore.awsrequest import AWSRequest
         
-        messages = [{
-            "role": "user", 
-            "content": [{
-                "text": f"Please summarize the following text in a concise and clear manner:\n\n{text_to_summarize}"
-            }]
+        client = get_bedrock_client()
+        request = AWSRequest(method='GET', url=client.meta.endpoint_url + '/')
+        # The client's HTTP session isn't public API, but it is the pool later calls use
+        response = client._endpoint.http_session.send(request.prepare())
+        response.content
+        return True
+    except Exception as e:
+        logger.warning("Could not pre-warm Bedrock connection: %s", e)
+        return False
+
+
+def get_batch_executor():
+    """
+    Initialize and return the thread pool shared by batch requests
+    """
+    global batch_executor
+    
+    if batch_executor:
+        return batch_executor
+    
+    max_workers = int(os.environ.get('BATCH_MAX_WORKERS', '16'))
+    batch_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='summarize-batch')
+    return batch_executor
+
+
+def _rate_limit_enabled():
+    return os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+
+
+def output_token_budget(input_tokens):
+    """
+    Choose inferenceConfig.maxTokens for a prompt of input_tokens.
+
+    A fraction (SUMMARY_OUTPUT_RATIO, default 0.5) of the input, clamped to
+    SUMMARY_MIN_OUTPUT_TOKENS..SUMMARY_MAX_OUTPUT_TOKENS (default 256..2048), so
+    short texts can't produce long summaries and quota isn't reserved for them.
+    """
+    ratio = float(os.environ.get('SUMMARY_OUTPUT_RATIO', '0.5'))
+    low = int(os.environ.get('SUMMARY_MIN_OUTPUT_TOKENS', '256'))
+    high = int(os.environ.get('SUMMARY_MAX_OUTPUT_TOKENS', '2048'))
+    return max(low, min(high, int(input_tokens * ratio)))
+
+
+def _reserve_tokens(model_id, input_tokens, max_tokens):
+    """
+    Wait for (or be refused) quota before calling Bedrock
+    """
+    if not _rate_limit_enabled():
+        return 0
+    return get_rate_limiter().acquire(model_id, input_tokens, max_tokens)
+
+
+def _reconcile_tokens(model_id, reserved_tokens, usage):
+    """
+    Settle a quota reservation against the usage Bedrock reported
+    """
+    if _rate_limit_enabled() and isinstance(usage, dict):
+        get_rate_limiter().reconcile(model_id, reserved_tokens, usage)
+
+
+def _record_usage(model_id, usage, metrics, raw_estimate, estimated_tokens):
+    """
+    Add a Bedrock call's token usage and server-side latency to the request
+    metrics, and calibrate the token estimator against it
+    """
+    usage = usage or {}
+    get_token_estimator().observe(model_id, raw_estimate, usage.get('inputTokens'))
+    record_metric('BedrockCalls', 1)
+    record_metric('EstimatedInputTokens', estimated_tokens)
+    record_metric('InputTokens', usage.get('inputTokens'))
+    record_metric('OutputTokens', usage.get('outputTokens'))
+    record_metric('BedrockLatencyMs', (metrics or {}).get('latencyMs'), MILLISECONDS)
+    record_property('ModelId', model_id)
+
+
+def _timed(operation, timing):
+    """
+    Wrap a Bedrock call so timing['ms'] holds the duration of its latest attempt
+    """
+    def timed_operation():
+        started = time.monotonic()
+        result = operation()
+        timing['ms'] = (time.monotonic() - started) * 1000
+        return result
+    return timed_operation
+
+
+def _call_with_fallback(route, call):
+    """
+    Call call(model_id, max_attempts, timing) for each model in route until one succeeds.
+
+    Returns (model_id, result). Non-retryable errors are raised immediately;
+    throttling, outages, open breakers and exhausted quota move on to the next model.
+    The call wraps its Bedrock request in _timed(..., timing), so the router sees
+    Bedrock's latency rather than quota waits and retry backoff.
+    """
+    router = get_model_router()
+    fallback_attempts = int(os.environ.get('BEDROCK_FALLBACK_ATTEMPTS', '2'))
+    last_error = None
+    
+    for position, model_id in enumerate(route):
+        is_last = position == len(route) - 1
+        timing = {}
+        try:
+            result = call(model_id, None if is_last else fallback_attempts, timing)
+        except (CircuitOpenError, RateLimitExceeded) as e:
+            last_error = e
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            router.observe(model_id, None, False)
+            last_error = e
+        else:
+            router.observe(model_id, timing.get('ms'), True)
+            return model_id, result
+        if not is_last:
+            logger.warning("Falling back from %s after %s", model_id, type(last_error).__name__)
+            # Fallbacks usually land on a larger, costlier model
+            record_metric('ModelFallbacks', 1)
+            if isinstance(last_error, RateLimitExceeded):
+                record_metric('QuotaFallbacks', 1)
+    
+    raise last_error
+
+
+def _converse_summary(text_to_summarize, prompt_template, route):
+    """
+    Call the Bedrock Converse API and return the generated summary
+    """
+    client = get_bedrock_client()
+    prompt = prompt_template.format(text=text_to_summarize)
+    raw_estimate = get_token_estimator().raw_estimate(prompt)
+    
+    messages = [{
+        "role": "user", 
+        "content": [{
+            "text": prompt
         }]
+    }]
+    
+    def converse(model_id, max_attempts, timing):
+        input_tokens = get_token_estimator().calibrate(raw_estimate, model_id)
+        max_tokens = output_token_budget(input_tokens)
+        reserved_tokens = _reserve_tokens(model_id, input_tokens, max_tokens)
         
         # Call Converse API to summarize the text
-        response = client.converse(
-            modelId="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        response = call_with_retries(_timed(lambda: client.converse(
+            modelId=model_id,
             messages=messages,
-        )
+            inferenceConfig={'maxTokens': max_tokens},
+        ), timing), model_id=model_id, max_attempts=max_attempts)
+        
+        _reconcile_tokens(model_id, reserved_tokens, response.get('usage'))
+        return input_tokens, response
+    
+    with record_phase('Bedrock'):
+        model_id, (estimated_tokens, response) = _call_with_fallback(route, converse)
+    _record_usage(model_id, response.get('usage'), response.get('metrics'), raw_estimate, estimated_tokens)
+    
+    logger.info('Bedrock response', extra={
+        'model_id': model_id,
+        'stop_reason': response.get('stopReason'),
+        'usage': response.get('usage'),
+        'estimated_input_tokens': estimated_tokens,
+        'latency_ms': response.get('metrics', {}).get('latencyMs')
+    })
+    
+    # Extract and return the summary
+    return {
+        'summary': response['output']['message']['content'][0]['text'],
+        'model_id': model_id
+    }
+
+
+def _summarize_or_reuse(prompt_text, prompt_template, route):
+    """
+    Reuse the summary of a near-identical text if the index has one, otherwise
+    call Bedrock and index the result
+    """
+    if not near_duplicates_enabled():
+        return _converse_summary(prompt_text, prompt_template, route)
+    
+    index = get_near_duplicate_index()
+    with record_phase('Fingerprint'):
+        signature = index.fingerprint(prompt_text)
+    if signature is None:
+        return _converse_summary(prompt_text, prompt_template, route)
+    
+    # Scoped like the exact cache, so summaries never cross models or prompts
+    scope = make_cache_key('', route[0], prompt_template)
+    match = index.lookup(signature, scope)
+    if match is not None:
+        value, similarity = match
+        record_metric('NearDuplicateHits', 1)
+        return dict(value, similarity=round(similarity, 4))
+    
+    value = _converse_summary(prompt_text, prompt_template, route)
+    index.add(signature, value, scope)
+    return value
+
+
+def _prepare_prompt(text_to_summarize, prompt_template, tier, keep_ratio):
+    """
+    Compress and route a text and build its cache key, the same way for
+    streamed and whole responses so they share cache entries.
+
+    Returns (prompt_text, route, cache_key).
+    """
+    if keep_ratio is None:
+        keep_ratio = float(os.environ.get('EXTRACTIVE_KEEP_RATIO', '1.0'))
+    with record_phase('Compress'):
+        prompt_text = compress_text(text_to_summarize, keep_ratio)
+    
+    route = get_model_router().route(estimate_tokens(prompt_template.format(text=prompt_text)), tier)
+    # Keyed by the preferred model so fallbacks don't fragment the cache
+    return prompt_text, route, make_cache_key(prompt_text, route[0], prompt_template)
 
-        logger.info(f"Response: {response}")
+
+def summarize_text(text_to_summarize, prompt_template=SUMMARY_PROMPT, tier=DEFAULT_TIER, keep_ratio=None):
+    """
+    Use Amazon Bedrock to summarize text, serving repeated texts from the cache.
+
+    With keep_ratio below 1 (default EXTRACTIVE_KEEP_RATIO, 1.0) only the most
+    central sentences of long texts are sent to the model.
+    """
+    try:
+        prompt_text, route, key = _prepare_prompt(text_to_summarize, prompt_template, tier, keep_ratio)
+        
+        if os.environ.get('SUMMARY_CACHE_ENABLED', 'true').lower() == 'true':
+            value, cached = get_summary_cache().get_or_compute(
+                key, lambda: _summarize_or_reuse(prompt_text, prompt_template, route)
+            )
+        else:
+            value, cached = _summarize_or_reuse(prompt_text, prompt_template, route), False
         
-        # Extract and return the summary
-        summary = response['output']['message']['content'][0]['text']
+        summary = value['summary']
+        record_metric('CacheHits' if cached else 'CacheMisses', 1)
         
-        return {
+        result = {
             'summary': summary,
             'original_length': len(text_to_summarize),
-            'summary_length': len(summary)
+            'summary_length': len(summary),
+            'model_id': value['model_id'],
+            'cached': cached
         }
+        if 'similarity' in value:
+            result['near_duplicate_similarity'] = value['similarity']
+        return result
 
     except Exception as e:
-        logger.error(f"Error summarizing text: {str(e)}")
+        logger.error("Error summarizing text: %s", e)
         raise
+
+
+def summarize_batch(texts):
+    """
+    Summarize many texts concurrently on the shared worker pool.
+
+    Returns one entry per input, in input order, each either a result or an error.
+    """
+    # Build the shared client up front so workers don't race to create it
+    get_bedrock_client()
+    executor = get_batch_executor()
+    # Run each item in a copy of the caller's context so metrics land on its request
+    futures = [executor.submit(contextvars.copy_context().run, summarize_text, text) for text in texts]
+    
+    results = []
+    for index, future in enumerate(futures):
+        try:
+            results.append({'index': index, 'success': True, 'data': future.result()})
+        except Exception as e:
+            results.append({'index': index, 'success': False, 'error': str(e)})
+    return results
+
+
+def stream_summary(text_to_summarize, prompt_template=SUMMARY_PROMPT, tier=DEFAULT_TIER, keep_ratio=None):
+    """
+    Use the Bedrock ConverseStream API to summarize text, yielding text
+    fragments as they are generated. Cached summaries are yielded whole.
+    """
+    prompt_text, route, key = _prepare_prompt(text_to_summarize, prompt_template, tier, keep_ratio)
+    prompt = prompt_template.format(text=prompt_text)
+    raw_estimate = get_token_estimator().raw_estimate(prompt)
+    
+    cache_enabled = os.environ.get('SUMMARY_CACHE_ENABLED', 'true').lower() == 'true'
+    if cache_enabled:
+        value = get_summary_cache().get(key)
+        if value is not None:
+            yield value['summary']
+            return
+    
+    try:
+        client = get_bedrock_client()
+        
+        def open_stream(model_id, max_attempts, timing):
+            input_tokens = get_token_estimator().calibrate(raw_estimate, model_id)
+            max_tokens = output_token_budget(input_tokens)
+            reserved_tokens = _reserve_tokens(model_id, input_tokens, max_tokens)
+            # Only opening the stream is retried; tokens already sent can't be taken back
+            response = call_with_retries(_timed(lambda: client.converse_stream(
+                modelId=model_id,
+                messages=[{
+                    "role": "user",
+                    "content": [{
+                        "text": prompt
+                    }]
+                }],
+                inferenceConfig={'maxTokens': max_tokens},
+            ), timing), model_id=model_id, max_attempts=max_attempts)
+            return input_tokens, reserved_tokens, response
+        
+        model_id, (estimated_tokens, reserved_tokens, response) = _call_with_fallback(route, open_stream)
+        
+        parts = []
+        for event in response['stream']:
+            if 'contentBlockDelta' in event:
+                fragment = event['contentBlockDelta']['delta'].get('text', '')
+                if fragment:
+                    parts.append(fragment)
+                    yield fragment
+            elif 'metadata' in event:
+                logger.info('Bedrock stream completed', extra={
+                    'model_id': model_id,
+                    'usage': event['metadata'].get('usage'),
+                    'estimated_input_tokens': estimated_tokens,
+                    'latency_ms': event['metadata'].get('metrics', {}).get('latencyMs')
+                })
+                _reconcile_tokens(model_id, reserved_tokens, event['metadata'].get('usage'))
+                _record_usage(model_id, event['metadata'].get('usage'), event['metadata'].get('metrics'), raw_estimate, estimated_tokens)
+        
+        if cache_enabled:
+            get_summary_cache().put(key, {'summary': ''.join(parts), 'model_id': model_id})
+
+    except Exception as e:
+        logger.error("Error streaming summary: %s", e)
+        raise
+
+
+def should_prewarm():
+    """
+    Decide whether to build the client and connect during the init phase.
+
+    By default only for provisioned concurrency, where init happens off the
+    request path; an on-demand cold start would pay for the boto3 import even
+    when the first request is /health. SnapStart inits are handled by the
+    snapstart hooks, since a connection opened before the snapshot is dead
+    after restore.
+    """
+    if not os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        return False
+    setting = os.environ.get('BEDROCK_PREWARM', 'auto').lower()
+    if setting == 'auto':
+        return os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE', 'on-demand') == 'provisioned-concurrency'
+    return setting == 'true'
+
+
+if should_prewarm():
+    warm_bedrock_connection()
@@ -0,0 +1,226 @@
+import contextvars
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from bedrock_service import summarize_text, DEFAULT_MODEL_ID, SUMMARY_PROMPT
+from model_router import DEFAULT_TIER
+from extractive import compress_text
+from token_estimator import estimate_tokens
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Context window sizes (in tokens) for the models we call
+MODEL_CONTEXT_TOKENS = {
+    "us.anthropic.claude-3-haiku-20240307-v1:0": 200000,
+    "us.anthropic.claude-3-5-haiku-20241022-v1:0": 200000,
+    "us.anthropic.claude-3-5-sonnet-20241022-v2:0": 200000,
+}
+DEFAULT_CONTEXT_TOKENS = 200000
+
+# Characters-per-token ratio assumed when the text itself isn't known
+CHARS_PER_TOKEN = 4
+
+# Tokens held back from each chunk for the prompt and the generated summary
+RESERVED_TOKENS = 4096
+
+COMBINE_PROMPT = (
+    "The following are summaries of consecutive sections of a longer document. "
+    "Combine them into a single concise and clear summary of the whole document:\n\n{text}"
+)
+
+MULTI_DOCUMENT_PROMPT = (
+    "The following are summaries of related documents, each starting with its source label in square brackets. "
+    "Combine them into a single concise and clear summary across all of the documents. "
+    "After each statement, cite the labels of the documents it comes from, for example [1] or [2][5]:\n\n{text}"
+)
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+
+def chunk_size_for_model(model_id=DEFAULT_MODEL_ID, chars_per_token=CHARS_PER_TOKEN):
+    """
+    Return the maximum chunk size in characters for a model's context window
+    """
+    context_tokens = MODEL_CONTEXT_TOKENS.get(model_id, DEFAULT_CONTEXT_TOKENS)
+    fraction = float(os.environ.get('CHUNK_CONTEXT_FRACTION', '0.25'))
+    budget_tokens = int(context_tokens * fraction) - RESERVED_TOKENS
+    return max(1, int(max(budget_tokens, 1) * chars_per_token))
+
+
+def chars_per_token(text, model_id=None):
+    """
+    Estimated characters per token for text; much lower than 4 for code, CJK or emoji
+    """
+    if not text:
+        return CHARS_PER_TOKEN
+    return len(text) / estimate_tokens(text, model_id)
+
+
+def _split_units(text, max_chars):
+    """
+    Break text into paragraph/sentence units no longer than max_chars
+    """
+    units = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        sentences = [paragraph] if len(paragraph) <= max_chars else _SENTENCE_BREAK.split(paragraph)
+        for index, sentence in enumerate(sentences):
+            # Keep the paragraph break on the last sentence so it survives reassembly
+            separator = '\n\n' if index == len(sentences) - 1 else ' '
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                units.append(sentence[:cut] + ' ')
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                units.append(sentence + separator)
+    return units
+
+
+def split_text(text, max_chars, overlap_chars=0):
+    """
+    Split text into chunks on paragraph and sentence boundaries.
+
+    Each chunk is at most max_chars long and starts with up to overlap_chars
+    of trailing context carried over from the previous chunk.
+    """
+    if max_chars <= 0:
+        raise ValueError('max_chars must be positive')
+    overlap_chars = min(overlap_chars, max_chars // 2)
+
+    chunks = []
+    current = []
+    current_length = 0
+
+    for unit in _split_units(text, max_chars - overlap_chars):
+        if current and current_length + len(unit) > max_chars:
+            chunks.append(''.join(current).strip())
+            # Carry whole trailing units forward as overlap
+            carried = []
+            carried_length = 0
+            for previous in reversed(current):
+                if carried_length + len(previous) > overlap_chars:
+                    break
+                carried.insert(0, previous)
+                carried_length += len(previous)
+            current = carried
+            current_length = carried_length
+        current.append(unit)
+        current_length += len(unit)
+
+    if current:
+        chunks.append(''.join(current).strip())
+    return chunks
+
+
+def summarize_all(texts, prompt_template, tier, max_workers):
+    """
+    Summarize texts in parallel, preserving order
+    """
+    # Compression, if any, already happened on the whole document
+    if len(texts) == 1:
+        return [summarize_text(texts[0], prompt_template, tier, 1.0)]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+        # Each chunk runs in a copy of the caller's context so metrics land on its request
+        futures = [executor.submit(contextvars.copy_context().run, summarize_text, text, prompt_template, tier, 1.0) for text in texts]
+        return [future.result() for future in futures]
+
+
+def map_reduce_summarize(text, tier=DEFAULT_TIER, model_id=DEFAULT_MODEL_ID, max_chars=None, max_workers=None, keep_ratio=None):
+    """
+    Summarize arbitrarily long text by summarizing chunks in parallel and
+    recursively combining the partial summaries into one.
+
+    keep_ratio (default EXTRACTIVE_KEEP_RATIO) compresses the whole document once
+    before it is chunked.
+    """
+    if keep_ratio is None:
+        keep_ratio = float(os.environ.get('EXTRACTIVE_KEEP_RATIO', '1.0'))
+    original_length = len(text)
+    text = compress_text(text, keep_ratio)
+    if max_chars is None:
+        # Sized in tokens, so dense text gets proportionally shorter chunks
+        max_chars = chunk_size_for_model(model_id, chars_per_token(text, model_id))
+    if max_workers is None:
+        max_workers = int(os.environ.get('MAP_REDUCE_MAX_WORKERS', '8'))
+    overlap_chars = int(max_chars * float(os.environ.get('CHUNK_OVERLAP_FRACTION', '0.05')))
+
+    if len(text) <= max_chars:
+        result = summarize_text(text, tier=tier, keep_ratio=1.0)
+        result.update({'original_length': original_length, 'chunk_count': 1, 'depth': 1})
+        return result
+
+    chunks = split_text(text, max_chars, overlap_chars)
+    logger.info('Map-reduce summarizing', extra={'original_length': original_length, 'chunk_count': len(chunks)})
+    results = summarize_all(chunks, SUMMARY_PROMPT, tier, max_workers)
+    summaries = [result['summary'] for result in results]
+    depth = 1
+
+    # Reduce: combine groups of partial summaries until a single one remains
+    while len(summaries) > 1:
+        combined = '\n\n'.join(summaries)
+        groups = split_text(combined, max_chars) if len(combined) > max_chars else [combined]
+        if len(groups) >= len(summaries):
+            # Summaries are too long to group; pair them up so the tree always shrinks
+            groups = ['\n\n'.join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        results = summarize_all(groups, COMBINE_PROMPT, tier, max_workers)
+        summaries = [result['summary'] for result in results]
+        depth += 1
+
+    summary = summaries[0]
+    return {
+        'summary': summary,
+        'original_length': original_length,
+        'summary_length': len(summary),
+        'model_id': results[0].get('model_id'),
+        'chunk_count': len(chunks),
+        'depth': depth
+    }
+
+
+def summarize_documents(documents, tier=DEFAULT_TIER, max_workers=None):
+    """
+    Summarize a set of related documents into one summary that cites them.
+
+    documents is a list of (label, text). Every document is summarized in one
+    call, all in parallel (cached ones return without calling Bedrock), and one
+    more call combines the labelled summaries, so latency is the slowest
+    document plus a single reduce step.
+    """
+    texts = [text for _, text in documents]
+    results = summarize_all(texts, SUMMARY_PROMPT, tier, max_workers or len(texts))
+    sources = [
+        {
+            'id': label,
+            'summary': result['summary'],
+            'original_length': len(text),
+            'cached': result.get('cached', False)
+        }
+        for (label, text), result in zip(documents, results)
+    ]
+
+    if len(results) == 1:
+        combined = results[0]
+    else:
+        labelled = '\n\n'.join(f"[{source['id']}] {source['summary']}" for source in sources)
+        combined = summarize_text(labelled, MULTI_DOCUMENT_PROMPT, tier, 1.0)
+    summary = combined['summary']
+    for source in sources:
+        source['cited'] = len(sources) == 1 or f"[{source['id']}]" in summary
+
+    return {
+        'summary': summary,
+        'original_length': sum(len(text) for text in texts),
+        'summary_length': len(summary),
+        'model_id': combined.get('model_id'),
+        'document_count': len(sources),
+        'cached_count': sum(1 for source in sources if source['cached']),
+        'sources': sources
+    }
@@ -0,0 +1,170 @@
+import base64
+import json
+import os
+import zlib
+
+# orjson is several times faster than the stdlib for the large text payloads
+# this API moves; JSON_CODEC=stdlib forces the fallback (e.g. to compare them)
+orjson = None
+if os.environ.get('JSON_CODEC', 'orjson') != 'stdlib':
+    try:
+        import orjson
+    except ImportError:
+        pass
+
+# Accept both gzip and zlib ("deflate") framing
+_AUTO_WBITS = 32 + zlib.MAX_WBITS
+
+GZIP = 'gzip'
+BROTLI = 'br'
+
+_UNRESOLVED = object()
+_brotli_module = _UNRESOLVED
+
+
+class UnsupportedEncoding(ValueError):
+    """
+    Raised for a Content-Encoding this service can't decode
+    """
+
+
+class BodyTooLarge(ValueError):
+    """
+    Raised when a decoded request body exceeds the configured limit
+    """
+
+
+def dumps(value, default=None):
+    """
+    Serialize to a JSON string with orjson when available
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib handles them
+            pass
+    return json.dumps(value, default=default)
+
+
+def loads(data):
+    """
+    Parse JSON from str or bytes with orjson when available
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _brotli():
+    """
+    The brotli module, imported on first use since most requests don't need it,
+    or None if it isn't installed
+    """
+    global _brotli_module
+
+    if _brotli_module is _UNRESOLVED:
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        _brotli_module = brotli
+    return _brotli_module
+
+
+def _decompress(data, encoding, max_bytes):
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        decompressor = zlib.decompressobj(_AUTO_WBITS)
+        try:
+            output = decompressor.decompress(data, max_bytes + 1) if max_bytes else decompressor.decompress(data)
+        except zlib.error as e:
+            raise ValueError(f'Invalid {encoding} body: {e}') from e
+        if max_bytes and len(output) > max_bytes:
+            raise BodyTooLarge(f'Decompressed body exceeds {max_bytes} bytes')
+        if not decompressor.eof:
+            raise ValueError(f'Truncated {encoding} body')
+        return output
+    if encoding == BROTLI:
+        brotli = _brotli()
+        if brotli is None:
+            raise UnsupportedEncoding(encoding)
+        decompressor = brotli.Decompressor()
+        try:
+            output = decompressor.process(data, output_buffer_limit=max_bytes + 1) if max_bytes else decompressor.process(data)
+        except brotli.error as e:
+            raise ValueError(f'Invalid br body: {e}') from e
+        if max_bytes and len(output) > max_bytes:
+            raise BodyTooLarge(f'Decompressed body exceeds {max_bytes} bytes')
+        if not decompressor.is_finished():
+            raise ValueError('Truncated br body')
+        return output
+    raise UnsupportedEncoding(encoding)
+
+
+def decode_body(body, is_base64=False, content_encoding=None, max_bytes=None):
+    """
+    Undo API Gateway's base64 encoding and any Content-Encoding of a request body.
+
+    Returns str or bytes ready for loads(). Raises UnsupportedEncoding,
+    BodyTooLarge, or ValueError for malformed input.
+    """
+    if not body:
+        return body
+    if is_base64:
+        try:
+            body = base64.b64decode(body, validate=True)
+        except ValueError as e:
+            raise ValueError('Invalid base64 body') from e
+    encodings = [encoding.strip().lower() for encoding in (content_encoding or '').split(',') if encoding.strip()]
+    # Encodings are listed in the order they were applied
+    for encoding in reversed(encodings):
+        if encoding == 'identity':
+            continue
+        if isinstance(body, str):
+            body = body.encode('latin-1')
+        body = _decompress(body, encoding, max_bytes)
+    return body
+
+
+def supported_encodings():
+    """
+    Response encodings in order of preference
+    """
+    return (BROTLI, GZIP) if _brotli() is not None else (GZIP,)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the response encoding from an Accept-Encoding header, or None for identity
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, parameters = part.strip().partition(';')
+        quality = 1.0
+        for parameter in parameters.split(';'):
+            key, _, value = parameter.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding):
+    """
+    Compress bytes with a level tuned for speed over ratio
+    """
+    if encoding == BROTLI:
+        return _brotli().compress(data, quality=5)
+    compressor = zlib.compressobj(5, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+document_store = None
+
+
+class DocumentConflict(Exception):
+    """
+    Raised when a document changed since it was read
+    """
+
+
+def serialize(document):
+    """
+    Encode a document as stored; non-ASCII text is kept as is rather than
+    escaped, which would take up to six times the bytes
+    """
+    return json.dumps(document, ensure_ascii=False)
+
+
+class DocumentStore(ABC):
+    """
+    Interface for persisting rolling-summary documents.
+
+    Documents are plain dicts with at least document_id and version. Every write
+    is conditional on the version that was read, so concurrent appends can't
+    overwrite each other's summaries.
+    """
+
+    # Largest serialized document the backend can hold, or None when unbounded
+    max_item_bytes = None
+
+    @abstractmethod
+    def get(self, document_id):
+        pass
+
+    @abstractmethod
+    def put(self, document, expected_version=None):
+        """
+        Store document. expected_version None means the document must not exist yet.
+        Raises DocumentConflict otherwise.
+        """
+
+
+class InMemoryDocumentStore(DocumentStore):
+    """
+    Process-local document store for tests and local development
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._documents = {}
+
+    def get(self, document_id):
+        with self._lock:
+            document = self._documents.get(document_id)
+            return json.loads(document) if document else None
+
+    def put(self, document, expected_version=None):
+        with self._lock:
+            current = self._documents.get(document['document_id'])
+            current_version = json.loads(current)['version'] if current else None
+            if current_version != expected_version:
+                raise DocumentConflict(document['document_id'])
+            self._documents[document['document_id']] = serialize(document)
+
+
+class SQLiteDocumentStore(DocumentStore):
+    """
+    SQLite-backed document store, shared by processes on the same file
+    """
+
+    def __init__(self, path=':memory:'):
+        import sqlite3
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS documents (document_id TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL)'
+        )
+        self._connection.commit()
+
+    def get(self, document_id):
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM documents WHERE document_id = ?', (document_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, document, expected_version=None):
+        with self._lock:
+            if expected_version is None:
+                cursor = self._connection.execute(
+                    'INSERT OR IGNORE INTO documents (document_id, version, data) VALUES (?, ?, ?)',
+                    (document['document_id'], document['version'], serialize(document))
+                )
+            else:
+                cursor = self._connection.execute(
+                    'UPDATE documents SET version = ?, data = ? WHERE document_id = ? AND version = ?',
+                    (document['version'], serialize(document), document['document_id'], expected_version)
+                )
+            self._connection.commit()
+        if cursor.rowcount != 1:
+            raise DocumentConflict(document['document_id'])
+
+
+class DynamoDBDocumentStore(DocumentStore):
+    """
+    DynamoDB-backed document store used in the deployed stack.
+
+    The document is kept as one JSON attribute next to a numeric version used
+    for conditional writes; documents expire ttl_seconds after their last append.
+    """
+
+    # DynamoDB's item limit, less room for the key, version and expiry attributes
+    max_item_bytes = 400 * 1024 - 1024
+
+    def __init__(self, table_name, client=None, ttl_seconds=7 * 24 * 3600):
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        if client is None:
+            import boto3
+            client = boto3.client('dynamodb')
+        self._client = client
+
+    def get(self, document_id):
+        response = self._client.get_item(TableName=self.table_name, Key={'document_id': {'S': document_id}}, ConsistentRead=True)
+        item = response.get('Item')
+        return json.loads(item['data']['S']) if item else None
+
+    def put(self, document, expected_version=None):
+        item = {
+            'document_id': {'S': document['document_id']},
+            'version': {'N': str(document['version'])},
+            'data': {'S': serialize(document)},
+            'expires_at': {'N': str(int(time.time() + self.ttl_seconds))}
+        }
+        if expected_version is None:
+            condition = {'ConditionExpression': 'attribute_not_exists(document_id)'}
+        else:
+            condition = {
+                'ConditionExpression': '#version = :expected',
+                'ExpressionAttributeNames': {'#version': 'version'},
+                'ExpressionAttributeValues': {':expected': {'N': str(expected_version)}}
+            }
+        try:
+            self._client.put_item(TableName=self.table_name, Item=item, **condition)
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                raise DocumentConflict(document['document_id']) from e
+            raise
+
+
+def get_document_store():
+    """
+    Initialize and return the configured document store.
+
+    DOCUMENT_STORE_BACKEND selects 'dynamodb', 'sqlite' or 'memory'; it defaults
+    to DynamoDB when DOCUMENTS_TABLE_NAME is set and to memory otherwise.
+    """
+    global document_store
+
+    if document_store:
+        return document_store
+
+    table_name = os.environ.get('DOCUMENTS_TABLE_NAME')
+    backend = os.environ.get('DOCUMENT_STORE_BACKEND', 'dynamodb' if table_name else 'memory')
+    if backend == 'dynamodb':
+        document_store = DynamoDBDocumentStore(table_name, ttl_seconds=int(os.environ.get('DOCUMENT_TTL_SECONDS', str(7 * 24 * 3600))))
+    elif backend == 'sqlite':
+        document_store = SQLiteDocumentStore(os.environ.get('DOCUMENT_STORE_PATH', ':memory:'))
+    elif backend == 'memory':
+        document_store = InMemoryDocumentStore()
+    else:
+        raise ValueError(f'Unknown document store backend: {backend}')
+    return document_store
@@ -0,0 +1,203 @@
+import logging
+import os
+import re
+import time
+import uuid
+from bedrock_service import summarize_text, SUMMARY_PROMPT
+from chunking import COMBINE_PROMPT, split_text, summarize_all
+from document_store import get_document_store, serialize, DocumentConflict
+from model_router import DEFAULT_TIER
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+ROLLING_PROMPT = (
+    "The following is a summary of a document so far, followed by content that has since been "
+    "appended to it. Update the summary so that it covers the whole document, concisely and clearly:\n\n{text}"
+)
+
+# End of a sentence or line; appended text is only summarized up to the last one
+_BOUNDARY = re.compile(r'[.!?]["\')\]]?\s+|\n')
+
+
+class DocumentNotFound(Exception):
+    """
+    Raised when a document id is unknown (or has expired)
+    """
+
+
+class OffsetMismatch(DocumentConflict):
+    """
+    Raised when an append's offset is not the document's current length
+    """
+
+    def __init__(self, document_id, length):
+        super().__init__(f'Document {document_id} has length {length}')
+        self.length = length
+
+
+def split_ready(pending, chunk_chars):
+    """
+    Split buffered text into the part ready to summarize and the tail kept back.
+
+    Nothing is ready until chunk_chars have accumulated, and the ready part ends
+    at the last sentence or line boundary so a sentence is never cut in two.
+    """
+    if len(pending) < chunk_chars:
+        return '', pending
+    cut = 0
+    for match in _BOUNDARY.finditer(pending):
+        cut = match.end()
+    if cut == 0 or len(pending) - cut >= chunk_chars:
+        cut = len(pending)
+    return pending[:cut], pending[cut:]
+
+
+def _rolling_input(previous_summary, new_content):
+    return f"Summary so far:\n{previous_summary}\n\nAppended content:\n{new_content}"
+
+
+def _merge(previous_summary, new_summaries, tier):
+    """
+    Fold the summaries of newly appended chunks into the rolling summary with
+    one call whose size depends only on the summaries, not on the document
+    """
+    if not previous_summary and len(new_summaries) == 1:
+        return new_summaries[0], None
+    if previous_summary:
+        result = summarize_text(_rolling_input(previous_summary, '\n\n'.join(new_summaries)), ROLLING_PROMPT, tier, 1.0)
+    else:
+        result = summarize_text('\n\n'.join(new_summaries), COMBINE_PROMPT, tier, 1.0)
+    return result['summary'], result.get('model_id')
+
+
+def _apply_append(document, text):
+    """
+    Add text to a document, summarizing only the newly completed chunks
+    """
+    chunk_chars = int(os.environ.get('DOCUMENT_CHUNK_CHARS', '4000'))
+    ready, pending = split_ready(document['pending'] + text, chunk_chars)
+    document['length'] += len(text)
+    document['pending'] = pending
+
+    # Ready text is at least chunk_chars long; splitting at twice that avoids a
+    # small leftover chunk, so chunks are one to two chunk_chars each
+    chunks = split_text(ready, 2 * chunk_chars) if ready.strip() else []
+    if not chunks:
+        return document
+
+    results = summarize_all(chunks, SUMMARY_PROMPT, document['tier'], int(os.environ.get('MAP_REDUCE_MAX_WORKERS', '8')))
+    new_summaries = [result['summary'] for result in results]
+    summary, model_id = _merge(document['summary'], new_summaries, document['tier'])
+
+    for chunk, result in zip(chunks, results):
+        document['chunks'].append({'index': document['chunk_count'], 'length': len(chunk), 'summary': result['summary']})
+        document['chunk_count'] += 1
+    # The rolling summary already covers older chunks, so only recent ones are kept
+    max_chunks = int(os.environ.get('DOCUMENT_MAX_CHUNK_SUMMARIES', '100'))
+    document['chunks'] = document['chunks'][-max_chunks:] if max_chunks > 0 else []
+    document['summary'] = summary
+    document['model_id'] = model_id or results[-1].get('model_id')
+    document['summarized_length'] = document['length'] - len(pending)
+    return document
+
+
+def _fit_item(document, store):
+    """
+    Drop the oldest chunk summaries until the document fits the store's item
+    limit; the rolling summary already covers them
+    """
+    if store.max_item_bytes is None:
+        return document
+    size = len(serialize(document).encode('utf-8'))
+    chunks = document['chunks']
+    dropped = 0
+    while size > store.max_item_bytes and dropped < len(chunks):
+        # Each list element is followed by a ', ' separator
+        size -= len(serialize(chunks[dropped]).encode('utf-8')) + 2
+        dropped += 1
+    document['chunks'] = chunks[dropped:]
+    return document
+
+
+def create_document(text='', tier=DEFAULT_TIER):
+    """
+    Create a document, summarizing any initial text. Returns the document.
+    """
+    now = time.time()
+    document = {
+        'document_id': uuid.uuid4().hex,
+        'version': 1,
+        'tier': tier,
+        'length': 0,
+        'summarized_length': 0,
+        'pending': '',
+        'summary': '',
+        'model_id': None,
+        'chunk_count': 0,
+        'chunks': [],
+        'created_at': now,
+        'updated_at': now
+    }
+    store = get_document_store()
+    if text:
+        _apply_append(document, text)
+    store.put(_fit_item(document, store))
+    return document
+
+
+def append_to_document(document_id, text, offset=None):
+    """
+    Append text to a document and update its rolling summary.
+
+    If offset is given it must equal the document's current length, which makes
+    retried appends safe. Raises DocumentNotFound, OffsetMismatch, or
+    DocumentConflict when another append won the race.
+    """
+    store = get_document_store()
+    document = store.get(document_id)
+    if document is None:
+        raise DocumentNotFound(document_id)
+    if offset is not None and offset != document['length']:
+        raise OffsetMismatch(document_id, document['length'])
+
+    expected_version = document['version']
+    _apply_append(document, text)
+    document['version'] = expected_version + 1
+    document['updated_at'] = time.time()
+    store.put(_fit_item(document, store), expected_version)
+    return document
+
+
+def describe_document(document, include_chunks=False):
+    """
+    Return the public view of a document, without its buffered text
+    """
+    view = {name: value for name, value in document.items() if name not in ('pending', 'chunks')}
+    view['pending_length'] = len(document['pending'])
+    if include_chunks:
+        view['chunks'] = document['chunks']
+    return view
+
+
+def document_summary(document_id, include_pending=True):
+    """
+    Return the document's view with its rolling summary.
+
+    With include_pending, text appended since the last completed chunk is
+    folded into the returned summary (one bounded call, not persisted, and
+    served from the summary cache until the document changes).
+    """
+    document = get_document_store().get(document_id)
+    if document is None:
+        raise DocumentNotFound(document_id)
+
+    view = describe_document(document, include_chunks=True)
+    if include_pending and document['pending'].strip():
+        if document['summary']:
+            result = summarize_text(_rolling_input(document['summary'], document['pending']), ROLLING_PROMPT, document['tier'], 1.0)
+        else:
+            result = summarize_text(document['pending'], SUMMARY_PROMPT, document['tier'], 1.0)
+        view.update(summary=result['summary'], model_id=result.get('model_id'), summarized_length=document['length'])
+    return view
@@ -0,0 +1,170 @@
+import math
+import os
+import re
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+_WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+
+DAMPING = 0.85
+ITERATIONS = 30
+
+# Below this many sentences the pure-Python scorer beats importing NumPy
+NUMPY_MIN_SENTENCES = 40
+
+
+def split_sentences(text):
+    """
+    Split text into sentences, respecting paragraph breaks
+    """
+    sentences = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        sentences.extend(sentence.strip() for sentence in _SENTENCE_BREAK.split(paragraph) if sentence.strip())
+    return sentences
+
+
+def _feature_rows(sentences):
+    """
+    Term ids for each sentence, numbered in order of first appearance
+    """
+    vocabulary = {}
+    return [
+        [vocabulary.setdefault(word, len(vocabulary)) for word in _WORD.findall(sentence.lower())]
+        for sentence in sentences
+    ]
+
+
+def _scores_numpy(np, rows):
+    """
+    TextRank over TF-IDF sentence vectors.
+
+    The sentence-term matrix is kept in coordinate form and every product is a
+    bincount, so cost is linear in the number of words rather than quadratic
+    in the number of sentences.
+    """
+    count = len(rows)
+    term_count = max((max(row) for row in rows if row), default=-1) + 1
+    row_index = np.repeat(np.arange(count), [len(row) for row in rows])
+    term_index = np.fromiter((term for row in rows for term in row), dtype=np.int64, count=len(row_index))
+    cells, frequency = np.unique(row_index * max(term_count, 1) + term_index, return_counts=True)
+    row_index, term_index = np.divmod(cells, max(term_count, 1))
+
+    document_frequency = np.bincount(term_index, minlength=term_count)
+    values = frequency * (np.log((1.0 + count) / (1.0 + document_frequency[term_index])) + 1.0)
+    norms = np.sqrt(np.bincount(row_index, weights=values * values, minlength=count))
+    values /= np.where(norms == 0, 1.0, norms)[row_index]
+
+    def similarity_times(vector):
+        # (M M^T - diag) x, where M M^T is the cosine-similarity graph
+        term_weights = np.bincount(term_index, weights=values * vector[row_index], minlength=term_count)
+        return np.bincount(row_index, weights=values * term_weights[term_index], minlength=count) - self_similarity * vector
+
+    self_similarity = np.bincount(row_index, weights=values * values, minlength=count)
+    weights = similarity_times(np.ones(count))
+    weights = np.where(weights <= 0, 1.0, weights)
+    scores = np.full(count, 1.0 / count)
+    for _ in range(ITERATIONS):
+        scores = (1.0 - DAMPING) / count + DAMPING * similarity_times(scores / weights)
+    return scores
+
+
+def _scores_python(rows):
+    """
+    The same TextRank in pure Python, for short texts (where importing NumPy
+    would cost more than it saves) and environments without NumPy
+    """
+    count = len(rows)
+    document_frequency = {}
+    for row in rows:
+        for term in set(row):
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    vectors = []
+    for row in rows:
+        vector = {}
+        for term in row:
+            vector[term] = vector.get(term, 0.0) + 1.0
+        for term in vector:
+            vector[term] *= math.log((1.0 + count) / (1.0 + document_frequency[term])) + 1.0
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        vectors.append({term: value / norm for term, value in vector.items()})
+    self_similarity = [sum(value * value for value in vector.values()) for vector in vectors]
+
+    def similarity_times(values):
+        term_weights = {}
+        for vector, value in zip(vectors, values):
+            for term, weight in vector.items():
+                term_weights[term] = term_weights.get(term, 0.0) + weight * value
+        return [
+            sum(weight * term_weights[term] for term, weight in vector.items()) - self_similarity[index] * values[index]
+            for index, vector in enumerate(vectors)
+        ]
+
+    weights = [weight if weight > 0 else 1.0 for weight in similarity_times([1.0] * count)]
+    scores = [1.0 / count] * count
+    for _ in range(ITERATIONS):
+        spread = similarity_times([score / weight for score, weight in zip(scores, weights)])
+        scores = [(1.0 - DAMPING) / count + DAMPING * value for value in spread]
+    return scores
+
+
+def score_sentences(sentences):
+    """
+    Score each sentence by how central it is to the document
+    """
+    if not sentences:
+        return []
+    rows = _feature_rows(sentences)
+    if len(sentences) < NUMPY_MIN_SENTENCES:
+        return _scores_python(rows)
+    try:
+        # Imported here so short texts and other routes don't pay for NumPy
+        import numpy as np
+    except ImportError:
+        return _scores_python(rows)
+    return [float(score) for score in _scores_numpy(np, rows)]
+
+
+def select_sentences(text, keep_ratio, min_sentences=1, max_sentences=None):
+    """
+    Keep the highest-scoring fraction of sentences, in their original order
+    """
+    sentences = split_sentences(text)
+    keep = max(min_sentences, math.ceil(len(sentences) * keep_ratio))
+    if max_sentences is not None:
+        keep = min(keep, max_sentences)
+    if keep >= len(sentences):
+        return sentences
+    scores = score_sentences(sentences)
+    ranked = sorted(range(len(sentences)), key=lambda index: (-scores[index], index))
+    return [sentences[index] for index in sorted(ranked[:keep])]
+
+
+def compress_text(text, keep_ratio):
+    """
+    Drop the least informative sentences before text is sent to the model.
+
+    Texts shorter than EXTRACTIVE_MIN_CHARS (default 2000) are returned unchanged.
+    """
+    if keep_ratio >= 1.0 or len(text) < int(os.environ.get('EXTRACTIVE_MIN_CHARS', '2000')):
+        return text
+    return ' '.join(select_sentences(text, keep_ratio, min_sentences=3))
+
+
+def extractive_summary(text, keep_ratio=None, max_sentences=None):
+    """
+    Summarize text by sentence extraction alone, without calling Bedrock
+    """
+    if keep_ratio is None:
+        keep_ratio = float(os.environ.get('EXTRACTIVE_SUMMARY_RATIO', '0.2'))
+    if max_sentences is None:
+        max_sentences = int(os.environ.get('EXTRACTIVE_MAX_SENTENCES', '10'))
+    summary = ' '.join(select_sentences(text, keep_ratio, max_sentences=max_sentences))
+    return {
+        'summary': summary,
+        'original_length': len(text),
+        'summary_length': len(summary),
+        'model_id': None,
+        'extractive': True,
+        'cached': False
+    }
@@ -0,0 +1,30 @@
+import logging
+from ingestion import process_batch
+from metrics import finish_metrics, start_metrics
+from resilience import set_invocation_deadline
+from structured_logging import bind_request, configure_logging, reset_request
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+configure_logging()
+
+def handler(event, context):
+    """
+    Lambda handler for the SQS ingestion queue, reporting partial batch failures
+    """
+    records = event.get('Records', [])
+    token = bind_request(request_id=getattr(context, 'aws_request_id', None))
+    recorder, metrics_token = start_metrics()
+    recorder.set_dimension('Route', 'SQS ingest')
+    try:
+        set_invocation_deadline(context)
+        with recorder.phase('Total'):
+            response = process_batch(records)
+        logger.info('Processed ingestion batch', extra={
+            'messages': len(records), 'retried': len(response['batchItemFailures'])
+        })
+        return response
+    finally:
+        finish_metrics(recorder, metrics_token)
+        reset_request(token)
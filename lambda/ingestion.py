@@ -0,0 +1,249 @@
+import contextvars
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from bedrock_service import get_bedrock_client
+from chunking import map_reduce_summarize
+from job_store import get_job_store, PENDING, RUNNING, SUCCEEDED, FAILED
+from metrics import record_metric
+from model_router import DEFAULT_TIER
+from resilience import error_code
+from s3_input import SourceNotAllowed, SourceNotFound, SourceTooLarge, read_source
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+sqs_client = None
+ingest_executor = None
+
+# SQS limits for SendMessageBatch: entries per call, and bytes per message and per call
+MAX_BATCH_ENTRIES = 10
+MAX_MESSAGE_BYTES = 256 * 1024
+
+# Retrying these can't succeed, so the item is recorded as failed and the message deleted
+PERMANENT_ERRORS = (ValueError, SourceNotAllowed, SourceNotFound, SourceTooLarge)
+PERMANENT_ERROR_CODES = {'ValidationException', 'AccessDeniedException'}
+
+# Items share the jobs table with API jobs; the prefix keeps client-chosen
+# item ids from overwriting them
+INGEST_JOB_PREFIX = 'ingest:'
+
+
+def get_sqs_client():
+    """
+    Initialize and return the SQS client
+    """
+    global sqs_client
+
+    if sqs_client:
+        return sqs_client
+
+    import boto3
+    from botocore.config import Config
+
+    options = {}
+    # Point at a local stand-in (tools/sqs_emulator.py) for offline testing
+    if os.environ.get('SQS_ENDPOINT_URL'):
+        options['endpoint_url'] = os.environ['SQS_ENDPOINT_URL']
+
+    sqs_client = boto3.client(
+        'sqs',
+        region_name=os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION'),
+        config=Config(
+            max_pool_connections=int(os.environ.get('SQS_MAX_CONCURRENCY', '8')),
+            connect_timeout=float(os.environ.get('SQS_CONNECT_TIMEOUT', '2')),
+            read_timeout=float(os.environ.get('SQS_READ_TIMEOUT', '30')),
+            tcp_keepalive=True,
+            retries={'mode': 'standard', 'total_max_attempts': 3}
+        ),
+        **options
+    )
+    return sqs_client
+
+
+def get_ingest_executor():
+    """
+    Initialize and return the thread pool that summarizes the items of a batch
+    """
+    global ingest_executor
+
+    if ingest_executor:
+        return ingest_executor
+
+    max_workers = int(os.environ.get('INGEST_MAX_WORKERS', '8'))
+    ingest_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest')
+    return ingest_executor
+
+
+def make_message(document):
+    """
+    Build the queue message for a document: a dict with text or an s3:// source,
+    and optionally item_id (generated if absent) and tier
+    """
+    if not isinstance(document, dict) or bool(document.get('text')) == bool(document.get('source')):
+        raise ValueError('Each document needs either text or source')
+    message = {'item_id': str(document.get('item_id') or uuid.uuid4().hex)}
+    for name in ('text', 'source', 'tier'):
+        if document.get(name):
+            message[name] = document[name]
+    return message
+
+
+def _pack_batches(messages):
+    """
+    Group encoded messages into SendMessageBatch calls within SQS's count and size limits
+    """
+    batch, batch_bytes = [], 0
+    for message, body in messages:
+        size = len(body.encode('utf-8'))
+        if batch and (len(batch) == MAX_BATCH_ENTRIES or batch_bytes + size > MAX_MESSAGE_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append((message, body))
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def _send_batch(queue_url, batch, max_attempts=3):
+    """
+    Send one batch, resending entries SQS failed on its side. Returns (sent, failed).
+    """
+    pending = {str(index): (message, body) for index, (message, body) in enumerate(batch)}
+    sent, failed = [], []
+    for attempt in range(max_attempts):
+        response = get_sqs_client().send_message_batch(
+            QueueUrl=queue_url,
+            Entries=[{'Id': entry_id, 'MessageBody': body} for entry_id, (_, body) in pending.items()]
+        )
+        for entry in response.get('Successful', []):
+            sent.append(pending.pop(entry['Id'])[0]['item_id'])
+        for entry in response.get('Failed', []):
+            if entry.get('SenderFault') or attempt == max_attempts - 1:
+                item_id = pending.pop(entry['Id'])[0]['item_id']
+                failed.append({'item_id': item_id, 'error': f"{entry.get('Code')}: {entry.get('Message')}"})
+        if not pending:
+            break
+        time.sleep(0.1 * 2 ** attempt)
+    return sent, failed
+
+
+def enqueue_documents(documents, queue_url=None, max_workers=4):
+    """
+    Send documents to the ingestion queue in batches.
+
+    Returns {'sent': [item_id, ...], 'failed': [{'item_id', 'error'}, ...]}; raises
+    ValueError for a document without text or source.
+    """
+    queue_url = queue_url or os.environ['INGEST_QUEUE_URL']
+    sent, failed, messages = [], [], []
+    for document in documents:
+        message = make_message(document)
+        body = json.dumps(message, separators=(',', ':'))
+        if len(body.encode('utf-8')) > MAX_MESSAGE_BYTES:
+            failed.append({'item_id': message['item_id'], 'error': 'Too large for a queue message; upload it and send its source'})
+        else:
+            messages.append((message, body))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch_sent, batch_failed in executor.map(lambda batch: _send_batch(queue_url, batch), _pack_batches(messages)):
+            sent.extend(batch_sent)
+            failed.extend(batch_failed)
+    return {'sent': sent, 'failed': failed}
+
+
+def ingest_job_id(item_id):
+    """
+    The job id an item's result is stored under, for GET /jobs/{id}
+    """
+    return INGEST_JOB_PREFIX + item_id
+
+
+def is_permanent(error):
+    """
+    Whether redelivering the message could not help
+    """
+    return isinstance(error, PERMANENT_ERRORS) or error_code(error) in PERMANENT_ERROR_CODES
+
+
+def process_record(record):
+    """
+    Summarize one SQS message and store the result under its item_id.
+    Returns the item's final status; raises when the message should be redelivered.
+    """
+    try:
+        message = json.loads(record['body'])
+        message = make_message(message)
+    except ValueError as e:
+        # Nothing to record it under; a redelivery would fail the same way
+        logger.error("Dropping malformed message %s: %s", record.get('messageId'), e)
+        record_metric('IngestMalformed', 1)
+        return FAILED
+
+    item_id = message['item_id']
+    job_id = ingest_job_id(item_id)
+    store = get_job_store()
+    item = store.get(job_id)
+    if item is not None and item['status'] == SUCCEEDED:
+        # SQS delivers at least once
+        record_metric('IngestDuplicates', 1)
+        return SUCCEEDED
+    if item is None:
+        now = time.time()
+        store.create({'job_id': job_id, 'status': RUNNING, 'mode': 'ingest', 'created_at': now, 'updated_at': now})
+    else:
+        store.update(job_id, status=RUNNING)
+
+    try:
+        if 'source' in message:
+            text = read_source(message['source'], int(os.environ.get('S3_MAX_OBJECT_BYTES', str(8 * 1024 * 1024))))
+        else:
+            text = message['text']
+        # Sources can be far longer than one model call takes
+        result = map_reduce_summarize(text, tier=message.get('tier', DEFAULT_TIER))
+    except Exception as e:
+        if is_permanent(e):
+            logger.error("Item %s failed permanently: %s", item_id, e)
+            store.update(job_id, status=FAILED, error=str(e))
+            return FAILED
+        # Pending until the last delivery; after that SQS moves the message to the dead-letter queue
+        attempts = int(record.get('attributes', {}).get('ApproximateReceiveCount', '1'))
+        final = attempts >= int(os.environ.get('INGEST_MAX_RECEIVE_COUNT', '3'))
+        store.update(job_id, status=FAILED if final else PENDING, error=str(e), attempts=attempts)
+        raise
+
+    store.update(job_id, status=SUCCEEDED, result=result, input_length=len(text))
+    return SUCCEEDED
+
+
+def process_batch(records):
+    """
+    Summarize a batch of SQS records concurrently and return the Lambda
+    partial-batch response: only messages listed in batchItemFailures are retried
+    """
+    # Build the shared client up front so workers don't race to create it
+    get_bedrock_client()
+    executor = get_ingest_executor()
+    # Run each item in a copy of the caller's context so metrics land on the batch
+    futures = [(record['messageId'], executor.submit(contextvars.copy_context().run, process_record, record))
+               for record in records]
+
+    failures = []
+    statuses = {SUCCEEDED: 0, FAILED: 0}
+    for message_id, future in futures:
+        try:
+            statuses[future.result()] += 1
+        except Exception as e:
+            logger.warning("Message %s will be retried: %s", message_id, e)
+            failures.append({'itemIdentifier': message_id})
+
+    record_metric('IngestMessages', len(records))
+    record_metric('IngestSucceeded', statuses[SUCCEEDED])
+    record_metric('IngestFailed', statuses[FAILED])
+    record_metric('IngestRetried', len(failures))
+    return {'batchItemFailures': failures}
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+job_store = None
+
+# Job statuses
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+# Fields serialized as JSON because backends only store flat values
+_JSON_FIELDS = ('result',)
+
+
+class JobStore(ABC):
+    """
+    Interface for persisting summarization jobs.
+
+    Jobs are plain dicts with at least job_id, status, created_at and updated_at.
+    """
+
+    # Largest item the backend can hold, or None when unbounded
+    max_item_bytes = None
+
+    @abstractmethod
+    def create(self, job):
+        pass
+
+    @abstractmethod
+    def get(self, job_id):
+        pass
+
+    @abstractmethod
+    def update(self, job_id, **fields):
+        pass
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Process-local job store for tests and local development
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def create(self, job):
+        with self._lock:
+            self._jobs[job['job_id']] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields, updated_at=time.time())
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed job store, shared by processes on the same file
+    """
+
+    def __init__(self, path=':memory:'):
+        import sqlite3
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, data TEXT NOT NULL)')
+        self._connection.commit()
+
+    def create(self, job):
+        with self._lock:
+            self._connection.execute('INSERT INTO jobs (job_id, data) VALUES (?, ?)', (job['job_id'], json.dumps(job)))
+            self._connection.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            job = json.loads(row[0])
+            job.update(fields, updated_at=time.time())
+            self._connection.execute('UPDATE jobs SET data = ? WHERE job_id = ?', (json.dumps(job), job_id))
+            self._connection.commit()
+
+
+class DynamoDBJobStore(JobStore):
+    """
+    DynamoDB-backed job store used in the deployed stack
+    """
+
+    max_item_bytes = 400 * 1024
+
+    def __init__(self, table_name, client=None, ttl_seconds=7 * 24 * 3600):
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        if client is None:
+            import boto3
+            client = boto3.client('dynamodb')
+        self._client = client
+
+    @staticmethod
+    def _to_attribute(value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return {'N': repr(value)}
+        return {'S': value}
+
+    @staticmethod
+    def _from_attribute(attribute):
+        if 'N' in attribute:
+            number = attribute['N']
+            return float(number) if '.' in number or 'e' in number else int(number)
+        return attribute['S']
+
+    def _serialize(self, fields):
+        item = {}
+        for name, value in fields.items():
+            if value is None:
+                continue
+            if name in _JSON_FIELDS:
+                value = json.dumps(value)
+            item[name] = self._to_attribute(value)
+        return item
+
+    def create(self, job):
+        item = self._serialize(job)
+        item['expires_at'] = {'N': str(int(time.time() + self.ttl_seconds))}
+        self._client.put_item(TableName=self.table_name, Item=item)
+
+    def get(self, job_id):
+        response = self._client.get_item(TableName=self.table_name, Key={'job_id': {'S': job_id}}, ConsistentRead=True)
+        item = response.get('Item')
+        if not item:
+            return None
+        job = {name: self._from_attribute(value) for name, value in item.items() if name != 'expires_at'}
+        for name in _JSON_FIELDS:
+            if name in job:
+                job[name] = json.loads(job[name])
+        return job
+
+    def update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        item = self._serialize(fields)
+        names = {f'#f{index}': name for index, name in enumerate(item)}
+        values = {f':v{index}': value for index, value in enumerate(item.values())}
+        assignments = ', '.join(f'#f{index} = :v{index}' for index in range(len(item)))
+        self._client.update_item(
+            TableName=self.table_name,
+            Key={'job_id': {'S': job_id}},
+            UpdateExpression=f'SET {assignments}',
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values
+        )
+
+
+def get_job_store():
+    """
+    Initialize and return the configured job store.
+
+    JOB_STORE_BACKEND selects 'dynamodb', 'sqlite' or 'memory'; it defaults to
+    DynamoDB when JOBS_TABLE_NAME is set and to memory otherwise.
+    """
+    global job_store
+
+    if job_store:
+        return job_store
+
+    table_name = os.environ.get('JOBS_TABLE_NAME')
+    backend = os.environ.get('JOB_STORE_BACKEND', 'dynamodb' if table_name else 'memory')
+    if backend == 'dynamodb':
+        job_store = DynamoDBJobStore(table_name)
+    elif backend == 'sqlite':
+        job_store = SQLiteJobStore(os.environ.get('JOB_STORE_PATH', ':memory:'))
+    elif backend == 'memory':
+        job_store = InMemoryJobStore()
+    else:
+        raise ValueError(f'Unknown job store backend: {backend}')
+    return job_store
@@ -0,0 +1,21 @@
+import logging
+from jobs import run_job
+from structured_logging import bind_request, configure_logging, reset_request
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+configure_logging()
+
+def handler(event, context):
+    """
+    Lambda handler for the background job worker
+    """
+    job_id = event['job_id']
+    token = bind_request(request_id=getattr(context, 'aws_request_id', None), job_id=job_id)
+    try:
+        logger.info('Running job')
+        job = run_job(job_id)
+        return {'job_id': job_id, 'status': job['status'] if job else 'missing'}
+    finally:
+        reset_request(token)
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import time
+import uuid
+from bedrock_service import summarize_text
+from chunking import map_reduce_summarize
+from job_store import get_job_store, PENDING, RUNNING, SUCCEEDED, FAILED
+from s3_input import get_s3_client, read_source
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+lambda_client = None
+
+# Room left in a job item for its other fields and the result when the input is stored inline
+INLINE_HEADROOM_BYTES = 64 * 1024
+
+
+class JobInputTooLarge(Exception):
+    """
+    Raised when the input doesn't fit the job store and there is no bucket to offload it to
+    """
+
+
+def get_lambda_client():
+    """
+    Initialize and return Lambda client
+    """
+    global lambda_client
+
+    if lambda_client:
+        return lambda_client
+
+    import boto3
+    lambda_client = boto3.client('lambda')
+    return lambda_client
+
+
+def dispatch_job(job_id):
+    """
+    Hand a job to the background worker with an asynchronous invocation
+    """
+    get_lambda_client().invoke(
+        FunctionName=os.environ['JOB_WORKER_FUNCTION_NAME'],
+        InvocationType='Event',
+        Payload=json.dumps({'job_id': job_id}).encode('utf-8')
+    )
+
+
+def store_input(job, text_to_summarize, store):
+    """
+    Put the input on the job, or in the input bucket under jobs/<job_id> when it
+    would push the item over the store's size limit (400 KB for DynamoDB)
+    """
+    job['input_length'] = len(text_to_summarize)
+    size = len(text_to_summarize.encode('utf-8'))
+    if store.max_item_bytes is None or size <= store.max_item_bytes - INLINE_HEADROOM_BYTES:
+        job['input'] = text_to_summarize
+        return
+
+    bucket = os.environ.get('INPUT_BUCKET_NAME')
+    if not bucket:
+        raise JobInputTooLarge(f'Job input is {size} bytes; the job store holds {store.max_item_bytes}')
+    key = f"jobs/{job['job_id']}"
+    get_s3_client().put_object(Bucket=bucket, Key=key, Body=text_to_summarize.encode('utf-8'),
+                               ContentType='text/plain; charset=utf-8')
+    job['input_source'] = f's3://{bucket}/{key}'
+    job['input_bytes'] = size
+
+
+def load_input(job):
+    """
+    Return a job's input text, wherever store_input put it
+    """
+    if 'input_source' in job:
+        return read_source(job['input_source'], job['input_bytes'])
+    return job['input']
+
+
+def submit_job(text_to_summarize, mode='map_reduce'):
+    """
+    Record a pending job and dispatch it to the worker. Returns the job.
+    Raises JobInputTooLarge if the input can't be stored.
+    """
+    now = time.time()
+    job = {
+        'job_id': uuid.uuid4().hex,
+        'status': PENDING,
+        'mode': mode,
+        'created_at': now,
+        'updated_at': now
+    }
+    store = get_job_store()
+    store_input(job, text_to_summarize, store)
+    store.create(job)
+
+    try:
+        dispatch_job(job['job_id'])
+    except Exception as e:
+        logger.error("Error dispatching job %s: %s", job['job_id'], e)
+        store.update(job['job_id'], status=FAILED, error='Failed to start job')
+        raise
+
+    return job
+
+
+def run_job(job_id):
+    """
+    Execute a job and record its result or error
+    """
+    store = get_job_store()
+    job = store.get(job_id)
+    if job is None:
+        logger.error("Job %s not found", job_id)
+        return None
+    if job['status'] in (SUCCEEDED, FAILED):
+        # Async invocations can be delivered more than once
+        return job
+
+    store.update(job_id, status=RUNNING)
+    try:
+        text_to_summarize = load_input(job)
+        if job['mode'] == 'map_reduce':
+            result = map_reduce_summarize(text_to_summarize)
+        else:
+            result = summarize_text(text_to_summarize)
+    except Exception as e:
+        logger.error("Error running job %s: %s", job_id, e)
+        store.update(job_id, status=FAILED, error=str(e))
+    else:
+        store.update(job_id, status=SUCCEEDED, result=result)
+    return store.get(job_id)
+
+
+def describe_job(job):
+    """
+    Return the public view of a job, without its input text or where it is stored
+    """
+    view = {name: value for name, value in job.items() if name not in ('input', 'input_source', 'input_bytes')}
+    view.setdefault('input_length', len(job.get('input', '')))
+    return view
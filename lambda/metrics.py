@@ -0,0 +1,194 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from codec import dumps
+
+# Global variables
+metrics_sink = None
+cold_start = True
+
+# Recorder for the request being handled; worker threads inherit it via copy_context
+current_metrics = contextvars.ContextVar('current_metrics', default=None)
+
+MILLISECONDS = 'Milliseconds'
+COUNT = 'Count'
+
+
+class StdoutMetricsSink:
+    """
+    Write EMF records to stdout, where the Lambda log agent turns them into metrics
+    """
+
+    def emit(self, record):
+        print(dumps(record), flush=True)
+
+
+class MemoryMetricsSink:
+    """
+    Keep EMF records in memory for tests and local runs
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class MetricsRecorder:
+    """
+    Collect one request's metrics and emit them as a single EMF record
+    """
+
+    def __init__(self, namespace='SummarizationApi', clock=time.perf_counter):
+        self.namespace = namespace
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.dimensions = {}
+        self.properties = {}
+        self.values = {}
+        self.units = {}
+
+    def add(self, name, value, unit=COUNT):
+        """
+        Add to a metric; repeated calls (e.g. one per Bedrock call) accumulate
+        """
+        if value is None:
+            return
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def set_dimension(self, name, value):
+        with self._lock:
+            self.dimensions[name] = str(value)
+
+    def set_property(self, name, value):
+        with self._lock:
+            self.properties[name] = value
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a block as the `<name>Ms` metric
+        """
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.add(f'{name}Ms', round((self._clock() - started) * 1000.0, 3), MILLISECONDS)
+
+    def summary(self):
+        """
+        Metrics suitable for returning to the caller
+        """
+        with self._lock:
+            return {
+                'timings_ms': {name[:-2]: value for name, value in self.values.items() if self.units[name] == MILLISECONDS},
+                'counts': {name: value for name, value in self.values.items() if self.units[name] == COUNT},
+                **self.properties
+            }
+
+    def to_emf(self, timestamp=None):
+        """
+        Build the CloudWatch Embedded Metric Format record
+        """
+        with self._lock:
+            dimension_sets = [sorted(self.dimensions)] if self.dimensions else [[]]
+            return {
+                '_aws': {
+                    'Timestamp': int((timestamp if timestamp is not None else time.time()) * 1000),
+                    'CloudWatchMetrics': [{
+                        'Namespace': self.namespace,
+                        'Dimensions': dimension_sets,
+                        'Metrics': [{'Name': name, 'Unit': self.units[name]} for name in sorted(self.values)]
+                    }]
+                },
+                **self.properties,
+                **self.dimensions,
+                **self.values
+            }
+
+
+def metrics_enabled():
+    return os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+
+
+def get_metrics_sink():
+    """
+    Initialize and return the EMF sink (stdout unless a test installed another)
+    """
+    global metrics_sink
+
+    if metrics_sink:
+        return metrics_sink
+
+    metrics_sink = StdoutMetricsSink()
+    return metrics_sink
+
+
+def start_metrics():
+    """
+    Start recording metrics for a request and mark whether it is a cold start
+    """
+    global cold_start
+
+    recorder = MetricsRecorder(os.environ.get('METRICS_NAMESPACE', 'SummarizationApi'))
+    recorder.add('ColdStart', 1 if cold_start else 0)
+    cold_start = False
+    return recorder, current_metrics.set(recorder)
+
+
+def finish_metrics(recorder, token):
+    """
+    Stop recording and emit the request's EMF record
+    """
+    current_metrics.reset(token)
+    if metrics_enabled():
+        get_metrics_sink().emit(recorder.to_emf())
+
+
+def record_metric(name, value, unit=COUNT):
+    """
+    Add to a metric of the current request, if one is being recorded
+    """
+    recorder = current_metrics.get()
+    if recorder is not None:
+        recorder.add(name, value, unit)
+
+
+def record_property(name, value):
+    recorder = current_metrics.get()
+    if recorder is not None:
+        recorder.set_property(name, value)
+
+
+def current_metrics_summary():
+    """
+    Timings and usage recorded so far for the current request, for returning to the caller
+    """
+    recorder = current_metrics.get()
+    return recorder.summary() if recorder is not None else None
+
+
+def record_error(error):
+    """
+    Count an error and note its class
+    """
+    record_metric('Errors', 1)
+    record_property('ErrorClass', type(error).__name__)
+
+
+@contextmanager
+def record_phase(name):
+    """
+    Time a block for the current request; a no-op outside a request
+    """
+    recorder = current_metrics.get()
+    if recorder is None:
+        yield
+        return
+    with recorder.phase(name):
+        yield
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import logging
+import math
+import os
+from codec import BodyTooLarge, UnsupportedEncoding, compress, decode_body, loads, negotiate_encoding
+from metrics import finish_metrics, record_error, record_phase, start_metrics
+from rate_limiter import RateLimitExceeded
+from resilience import CircuitOpenError, is_retryable
+from router import HttpError, json_response
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Read once per container, like the handler's request limits
+MAX_REQUEST_BODY_BYTES = int(os.environ.get('MAX_REQUEST_BODY_BYTES', str(16 * 1024 * 1024)))
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+
+def metrics_middleware(request, call_next):
+    """
+    Record a per-request EMF record with the Route dimension, the Total phase
+    and the response status
+    """
+    recorder, token = start_metrics()
+    recorder.set_dimension('Route', request.route_name)
+    try:
+        with recorder.phase('Total'):
+            response = call_next(request)
+        recorder.set_property('StatusCode', response['statusCode'])
+        return response
+    finally:
+        finish_metrics(recorder, token)
+
+
+def error_middleware(request, call_next):
+    """
+    Map exceptions to responses: HttpError as raised, quota and availability
+    errors to 429/503 with Retry-After, and anything else to 500 with the
+    route's `error` option (or a generic message without details)
+    """
+    try:
+        return call_next(request)
+    except HttpError as e:
+        return e.to_response()
+    except RateLimitExceeded as e:
+        logger.warning("Rate limited in %s: %s", request.route_name, e)
+        record_error(e)
+        return json_response(429, {'error': 'Too many requests', 'details': str(e)},
+                             {'Retry-After': str(max(1, math.ceil(e.retry_after)))})
+    except Exception as e:
+        logger.error("Error in %s: %s", request.route_name, e)
+        record_error(e)
+        if isinstance(e, CircuitOpenError):
+            return json_response(503, {'error': 'Summarization service is temporarily unavailable', 'details': str(e)},
+                                 {'Retry-After': str(max(1, int(e.retry_after + 0.5)))})
+        if is_retryable(e):
+            return json_response(503, {'error': 'Summarization service is temporarily unavailable', 'details': str(e)},
+                                 {'Retry-After': '1'})
+        message = request.route.options.get('error') if request.route else None
+        if message is None:
+            return json_response(500, {'error': 'Internal server error'})
+        return json_response(500, {'error': message, 'details': str(e)})
+
+
+def json_body_middleware(request, call_next):
+    """
+    Parse the JSON object body of routes registered with json_body=True,
+    undoing API Gateway base64 encoding and gzip/br Content-Encoding first
+    """
+    if request.route is not None and request.route.options.get('json_body'):
+        with record_phase('Parse'):
+            try:
+                raw = decode_body(request.event.get('body'), request.event.get('isBase64Encoded', False),
+                                  request.header('Content-Encoding'), MAX_REQUEST_BODY_BYTES)
+            except UnsupportedEncoding as e:
+                raise HttpError(415, f'Unsupported Content-Encoding: {e}')
+            except BodyTooLarge as e:
+                raise HttpError(413, str(e))
+            except ValueError as e:
+                raise HttpError(400, f'Request body could not be decoded: {e}')
+            try:
+                body = loads(raw or '{}')
+            except ValueError:
+                raise HttpError(400, 'Request body must be valid JSON')
+        if not isinstance(body, dict):
+            raise HttpError(400, 'Request body must be a JSON object')
+        request.body = body
+    return call_next(request)
+
+
+def conditional_get_middleware(request, call_next):
+    """
+    Add the route's Cache-Control, and for routes registered with etag=True an
+    ETag, answering 304 Not Modified when it matches If-None-Match so polling
+    clients don't download unchanged bodies again
+    """
+    response = call_next(request)
+    if request.route is None or response['statusCode'] != 200:
+        return response
+    options = request.route.options
+    if options.get('cache_control'):
+        response['headers'].setdefault('Cache-Control', options['cache_control'])
+    if options.get('etag'):
+        # Weak, so it still matches after the response is compressed
+        etag = 'W/"%s"' % hashlib.blake2b(response['body'].encode('utf-8'), digest_size=16).hexdigest()
+        response['headers']['ETag'] = etag
+        candidates = [tag.strip().replace('W/', '', 1) for tag in (request.header('If-None-Match') or '').split(',')]
+        if etag[2:] in candidates or '*' in candidates:
+            return {'statusCode': 304, 'headers': response['headers'], 'body': ''}
+    return response
+
+
+def compression_middleware(request, call_next):
+    """
+    Compress response bodies of COMPRESSION_MIN_BYTES or more with the best
+    encoding the client accepts (br, then gzip), returned base64-encoded as
+    API Gateway requires for binary bodies
+    """
+    response = call_next(request)
+    body = response.get('body')
+    if not body or response.get('isBase64Encoded') or len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    response['headers']['Vary'] = 'Accept-Encoding'
+    encoding = negotiate_encoding(request.header('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    with record_phase('Encode'):
+        encoded = base64.b64encode(compress(body.encode('utf-8'), encoding)).decode('ascii')
+    # Base64 adds a third; incompressible bodies are better sent as they are
+    if len(encoded) >= len(body):
+        return response
+    response['headers']['Content-Encoding'] = encoding
+    response['body'] = encoded
+    response['isBase64Encoded'] = True
+    return response
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+model_router = None
+
+DEFAULT_TIER = 'balanced'
+
+# Ordered by preference: the first eligible, healthy model serves the request
+# and the rest form the fallback list. An entry is eligible for a request when
+# it serves the requested tier and the estimated input fits max_input_tokens.
+# Entries whose min_input_tokens the input doesn't reach are only fallbacks, and
+# a model may appear once per size band.
+DEFAULT_MODEL_TABLE = [
+    {
+        'model_id': 'us.anthropic.claude-3-haiku-20240307-v1:0',
+        'tiers': ['fast'],
+        'max_input_tokens': 8000
+    },
+    {
+        # Short inputs in the default tier don't need a larger, slower model
+        'model_id': 'us.anthropic.claude-3-haiku-20240307-v1:0',
+        'tiers': ['balanced'],
+        'max_input_tokens': 1000
+    },
+    {
+        'model_id': 'us.anthropic.claude-3-5-haiku-20241022-v1:0',
+        'tiers': ['fast', 'balanced'],
+        'max_input_tokens': 180000
+    },
+    {
+        'model_id': 'us.anthropic.claude-3-5-sonnet-20241022-v2:0',
+        'tiers': ['balanced', 'quality'],
+        'max_input_tokens': 180000
+    },
+]
+
+# Latency objective per tier in milliseconds; slower models are demoted
+DEFAULT_TIER_LATENCY_SLO_MS = {
+    'fast': 3000,
+    'balanced': 10000,
+    'quality': 30000,
+}
+
+
+class ModelHealth:
+    """
+    Exponentially weighted latency and error rate for one model.
+
+    Both fade with a half-life while the model is idle, so a demoted model that
+    only gets last-resort traffic is tried first again once the evidence is stale.
+    """
+
+    def __init__(self, alpha, half_life_s, now):
+        self.alpha = alpha
+        self.half_life_s = half_life_s
+        self.latency_ms = None
+        self.latency_samples = 0.0
+        self.error_rate = 0.0
+        self.calls = 0
+        self.updated_at = now
+
+    def decay(self, now):
+        if self.half_life_s:
+            factor = 0.5 ** (max(0.0, now - self.updated_at) / self.half_life_s)
+            self.error_rate *= factor
+            self.latency_samples *= factor
+        self.updated_at = now
+
+    def observe(self, latency_ms, success, now):
+        self.decay(now)
+        self.calls += 1
+        self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+        if success and latency_ms is not None:
+            # A running mean until there are 1/alpha samples (or after they've faded),
+            # so the first call doesn't stand in for the whole average
+            self.latency_samples += 1
+            weight = max(self.alpha, 1.0 / self.latency_samples)
+            if self.latency_ms is None:
+                self.latency_ms = latency_ms
+            else:
+                self.latency_ms += weight * (latency_ms - self.latency_ms)
+
+
+class ModelRouter:
+    """
+    Picks an ordered list of models for a request from a routing table,
+    demoting models whose recent latency or error rate is out of bounds
+    """
+
+    def __init__(self, table=None, tier_latency_slo_ms=None, max_error_rate=0.5, alpha=0.2,
+                 min_latency_samples=3, half_life_s=60, clock=time.monotonic):
+        self.table = table or DEFAULT_MODEL_TABLE
+        self.tier_latency_slo_ms = tier_latency_slo_ms or DEFAULT_TIER_LATENCY_SLO_MS
+        self.max_error_rate = max_error_rate
+        self.alpha = alpha
+        # A single slow call shouldn't demote a model
+        self.min_latency_samples = min_latency_samples
+        self.half_life_s = half_life_s
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._health = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a router from MODEL_ROUTING_TABLE / MODEL_TIER_SLO_MS JSON overrides
+        and the MODEL_MAX_ERROR_RATE / MODEL_HEALTH_HALF_LIFE_S settings
+        """
+        table = os.environ.get('MODEL_ROUTING_TABLE')
+        slos = os.environ.get('MODEL_TIER_SLO_MS')
+        return cls(
+            table=json.loads(table) if table else None,
+            tier_latency_slo_ms=json.loads(slos) if slos else None,
+            max_error_rate=float(os.environ.get('MODEL_MAX_ERROR_RATE', '0.5')),
+            half_life_s=float(os.environ.get('MODEL_HEALTH_HALF_LIFE_S', '60'))
+        )
+
+    @property
+    def tiers(self):
+        return {tier for entry in self.table for tier in entry['tiers']}
+
+    def max_input_tokens(self, tier=DEFAULT_TIER):
+        """
+        The largest input any model in tier accepts
+        """
+        return max(
+            (entry.get('max_input_tokens', float('inf')) for entry in self.table if tier in entry['tiers']),
+            default=0
+        )
+
+    def _is_healthy(self, model_id, tier, now):
+        health = self._health.get(model_id)
+        if health is None:
+            return True
+        health.decay(now)
+        if health.error_rate > self.max_error_rate:
+            return False
+        slo = self.tier_latency_slo_ms.get(tier)
+        # Half a sample of slack, so the fading between back-to-back calls doesn't matter
+        if slo is None or health.latency_samples < self.min_latency_samples - 0.5:
+            return True
+        return health.latency_ms <= slo
+
+    def route(self, input_tokens, tier=DEFAULT_TIER):
+        """
+        Return model ids to try, in order. Raises ValueError for unknown tiers
+        or inputs no model can take.
+        """
+        if tier not in self.tiers:
+            raise ValueError(f'Unknown tier: {tier}')
+
+        entries = [
+            entry for entry in self.table
+            if tier in entry['tiers'] and input_tokens <= entry.get('max_input_tokens', float('inf'))
+        ]
+        if not entries:
+            raise ValueError(f'No model in tier {tier} accepts {input_tokens} input tokens')
+        # Models sized for this input first; those meant for larger inputs can still take it
+        in_band = [entry for entry in entries if input_tokens >= entry.get('min_input_tokens', 0)]
+        eligible = list(dict.fromkeys(
+            entry['model_id'] for entry in in_band + [entry for entry in entries if entry not in in_band]
+        ))
+
+        now = self.clock()
+        with self._lock:
+            healthy = [model_id for model_id in eligible if self._is_healthy(model_id, tier, now)]
+        # Degraded models stay on the list as a last resort
+        return healthy + [model_id for model_id in eligible if model_id not in healthy]
+
+    def observe(self, model_id, latency_ms, success):
+        """
+        Record the outcome of a call to model_id
+        """
+        now = self.clock()
+        with self._lock:
+            health = self._health.get(model_id)
+            if health is None:
+                health = self._health[model_id] = ModelHealth(self.alpha, self.half_life_s, now)
+            health.observe(latency_ms, success, now)
+
+    def stats(self):
+        with self._lock:
+            return {
+                model_id: {
+                    'calls': health.calls,
+                    'latency_ms': health.latency_ms,
+                    'error_rate': health.error_rate
+                }
+                for model_id, health in self._health.items()
+            }
+
+
+def get_model_router():
+    """
+    Initialize and return the container-wide model router
+    """
+    global model_router
+
+    if model_router:
+        return model_router
+
+    model_router = ModelRouter.from_env()
+    return model_router
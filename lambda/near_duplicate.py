@@ -0,0 +1,217 @@
+import os
+import random
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+# Global variables
+near_duplicate_index = None
+
+_WORD = re.compile(r'\w+')
+
+# Largest prime below 2^32; with coefficients below 2^31 every a * x + b fits in 64 bits
+_PRIME = 4294967291
+_MAX_COEFFICIENT = 1 << 31
+
+# Below this many shingles plain Python beats importing NumPy
+NUMPY_MIN_SHINGLES = 64
+
+
+def shingles(text, size=5):
+    """
+    Hash the overlapping word n-grams of normalized text to 32-bit ints
+    """
+    words = _WORD.findall(unicodedata.normalize('NFKC', text).lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[index:index + size]).encode('utf-8')) for index in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures from a fixed family of universal hash functions
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.coefficients = [(rng.randrange(1, _MAX_COEFFICIENT), rng.randrange(0, _MAX_COEFFICIENT)) for _ in range(num_perm)]
+        self._arrays = None
+
+    def signature(self, values):
+        """
+        Return the MinHash signature (a tuple of num_perm ints) of a set of hashes
+        """
+        if not values:
+            return (_PRIME,) * self.num_perm
+        if len(values) >= NUMPY_MIN_SHINGLES:
+            try:
+                # Imported here so short texts and other routes don't pay for NumPy
+                import numpy as np
+            except ImportError:
+                pass
+            else:
+                return self._signature_numpy(np, values)
+        return tuple(min((a * value + b) % _PRIME for value in values) for a, b in self.coefficients)
+
+    def _signature_numpy(self, np, values):
+        if self._arrays is None:
+            self._arrays = (
+                np.array([a for a, _ in self.coefficients], dtype=np.uint64)[:, None],
+                np.array([b for _, b in self.coefficients], dtype=np.uint64)[:, None]
+            )
+        a, b = self._arrays
+        hashed = (a * np.fromiter(values, dtype=np.uint64, count=len(values))[None, :] + b) % np.uint64(_PRIME)
+        return tuple(int(value) for value in hashed.min(axis=1))
+
+
+def estimate_similarity(first, second):
+    """
+    Estimate Jaccard similarity from two MinHash signatures
+    """
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures for reusing summaries of near-identical texts.
+
+    Signatures are split into `bands` bands; texts sharing any band are candidates
+    and are reused only if their estimated similarity reaches `threshold`.
+    Entries are scoped (e.g. by model and prompt) and evicted least recently used.
+    """
+
+    def __init__(self, num_perm=128, bands=16, threshold=0.8, max_entries=4096, min_shingles=20):
+        if num_perm % bands:
+            raise ValueError('num_perm must be divisible by bands')
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.min_shingles = min_shingles
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+        self.candidates = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create an index configured from environment variables
+        """
+        return cls(
+            num_perm=int(os.environ.get('NEAR_DUPLICATE_NUM_PERM', '128')),
+            bands=int(os.environ.get('NEAR_DUPLICATE_BANDS', '16')),
+            threshold=float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', '0.8')),
+            max_entries=int(os.environ.get('NEAR_DUPLICATE_MAX_ENTRIES', '4096')),
+            min_shingles=int(os.environ.get('NEAR_DUPLICATE_MIN_SHINGLES', '20'))
+        )
+
+    def fingerprint(self, text):
+        """
+        Return the text's signature, or None if it is too short to compare safely
+        """
+        values = shingles(text)
+        if len(values) < self.min_shingles:
+            return None
+        return self.hasher.signature(values)
+
+    def _band_keys(self, signature, scope):
+        return [(scope, band, hash(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def lookup(self, signature, scope=''):
+        """
+        Return (value, similarity) for the most similar stored entry at or above
+        the threshold, or None
+        """
+        with self._lock:
+            self.lookups += 1
+            candidate_ids = set()
+            for key in self._band_keys(signature, scope):
+                candidate_ids.update(self._buckets.get(key, ()))
+            self.candidates += len(candidate_ids)
+
+            best = None
+            for entry_id in candidate_ids:
+                stored_signature, value, _ = self._entries[entry_id]
+                similarity = estimate_similarity(signature, stored_signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (entry_id, similarity, value)
+            if best is None:
+                return None
+            self._entries.move_to_end(best[0])
+            self.hits += 1
+            return best[2], best[1]
+
+    def add(self, signature, value, scope=''):
+        """
+        Store a value under a signature, evicting the least recently used entry if full
+        """
+        if self.max_entries <= 0:
+            return
+        keys = self._band_keys(signature, scope)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (signature, value, keys)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, entry_id):
+        """
+        Drop an entry and its bucket memberships. Caller holds the lock.
+        """
+        _, _, keys = self._entries.pop(entry_id)
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        """
+        Return counters for observability
+        """
+        with self._lock:
+            return {
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+                'candidates': self.candidates,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'threshold': self.threshold
+            }
+
+
+def near_duplicates_enabled():
+    return os.environ.get('NEAR_DUPLICATE_ENABLED', 'false').lower() == 'true'
+
+
+def get_near_duplicate_index():
+    """
+    Initialize and return the per-container near-duplicate index
+    """
+    global near_duplicate_index
+
+    if near_duplicate_index:
+        return near_duplicate_index
+
+    near_duplicate_index = NearDuplicateIndex.from_env()
+    return near_duplicate_index
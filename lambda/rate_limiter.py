@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+rate_limiter = None
+
+# Output tokens reserved up front when the caller doesn't cap generation
+DEFAULT_OUTPUT_TOKENS = 512
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a request would exceed the model's quota for longer than we are willing to wait
+    """
+
+    def __init__(self, model_id, retry_after):
+        super().__init__(f'Rate limit exceeded for {model_id}; retry after {retry_after:.1f}s')
+        self.model_id = model_id
+        self.retry_after = retry_after
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets held in process memory; limits a single container
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def take(self, key, amount, capacity, refill_per_second, force=False):
+        """
+        Remove amount tokens from a bucket. Returns 0 on success, otherwise the
+        seconds until enough tokens will be available (nothing is taken).
+        A negative amount refunds tokens; force takes them even if it overdraws.
+        """
+        with self._lock:
+            now = self._clock()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            if amount > tokens and not force and amount > 0:
+                self._buckets[key] = (tokens, now)
+                return (amount - tokens) / refill_per_second
+            self._buckets[key] = (min(capacity, tokens - amount), now)
+            return 0
+
+
+class DynamoDBRateLimitBackend:
+    """
+    Token buckets stored in DynamoDB so concurrent containers share one quota.
+
+    Updates use optimistic concurrency on a version attribute.
+    """
+
+    def __init__(self, table_name, client=None, clock=time.time, max_conflicts=5):
+        self.table_name = table_name
+        self._clock = clock
+        self.max_conflicts = max_conflicts
+        self._client = client
+
+    @property
+    def client(self):
+        # Created on first use so building the limiter (e.g. for /health stats) doesn't import boto3
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('dynamodb')
+        return self._client
+
+    def take(self, key, amount, capacity, refill_per_second, force=False):
+        for _ in range(self.max_conflicts):
+            now = self._clock()
+            response = self.client.get_item(
+                TableName=self.table_name,
+                Key={'bucket_key': {'S': key}},
+                ConsistentRead=True
+            )
+            item = response.get('Item')
+            if item:
+                tokens = float(item['tokens']['N'])
+                updated_at = float(item['updated_at']['N'])
+                version = int(item['version']['N'])
+            else:
+                tokens, updated_at, version = capacity, now, 0
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+            if amount > tokens and not force and amount > 0:
+                return (amount - tokens) / refill_per_second
+
+            try:
+                self.client.put_item(
+                    TableName=self.table_name,
+                    Item={
+                        'bucket_key': {'S': key},
+                        'tokens': {'N': repr(min(capacity, tokens - amount))},
+                        'updated_at': {'N': repr(now)},
+                        'version': {'N': str(version + 1)}
+                    },
+                    ConditionExpression='attribute_not_exists(bucket_key) OR version = :version',
+                    ExpressionAttributeValues={':version': {'N': str(version)}}
+                )
+                return 0
+            except Exception as e:
+                if getattr(e, 'response', {}).get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+        # Heavy contention; ask the caller to come back shortly
+        return 0.05
+
+
+class RateLimiter:
+    """
+    Client-side limiter tracking requests and tokens per minute for each model
+    """
+
+    def __init__(self, backend, quotas=None, default_quota=None, max_wait_seconds=2.0, sleep=time.sleep, clock=time.monotonic):
+        self.backend = backend
+        self.quotas = quotas or {}
+        self.default_quota = default_quota or {'requests_per_minute': 1000, 'tokens_per_minute': 2000000}
+        self.max_wait_seconds = max_wait_seconds
+        self._sleep = sleep
+        self._clock = clock
+        self._stats_lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'rejected': 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a limiter from environment variables.
+
+        BEDROCK_QUOTAS is a JSON object of model id to requests_per_minute and
+        tokens_per_minute; other models use BEDROCK_REQUESTS_PER_MINUTE and
+        BEDROCK_TOKENS_PER_MINUTE.
+        """
+        table_name = os.environ.get('RATE_LIMIT_TABLE_NAME')
+        backend_name = os.environ.get('RATE_LIMIT_BACKEND', 'dynamodb' if table_name else 'memory')
+        if backend_name == 'dynamodb':
+            backend = DynamoDBRateLimitBackend(table_name)
+        elif backend_name == 'memory':
+            backend = InMemoryRateLimitBackend()
+        else:
+            raise ValueError(f'Unknown rate limit backend: {backend_name}')
+
+        return cls(
+            backend,
+            quotas=json.loads(os.environ.get('BEDROCK_QUOTAS', '{}')),
+            default_quota={
+                'requests_per_minute': int(os.environ.get('BEDROCK_REQUESTS_PER_MINUTE', '1000')),
+                'tokens_per_minute': int(os.environ.get('BEDROCK_TOKENS_PER_MINUTE', '2000000'))
+            },
+            max_wait_seconds=float(os.environ.get('RATE_LIMIT_MAX_WAIT_MS', '2000')) / 1000.0
+        )
+
+    def _quota(self, model_id):
+        return self.quotas.get(model_id, self.default_quota)
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def acquire(self, model_id, input_tokens, output_tokens=DEFAULT_OUTPUT_TOKENS):
+        """
+        Reserve one request and the estimated tokens for a call to model_id,
+        waiting up to max_wait_seconds. Returns the number of tokens reserved.
+        """
+        quota = self._quota(model_id)
+        requests_per_minute = quota['requests_per_minute']
+        tokens_per_minute = quota['tokens_per_minute']
+        # A single call can never need more than a full bucket
+        tokens = min(input_tokens + output_tokens, tokens_per_minute)
+
+        deadline = self._clock() + self.max_wait_seconds
+        waited = False
+        while True:
+            wait = self.backend.take(f'{model_id}#requests', 1, requests_per_minute, requests_per_minute / 60.0)
+            if wait == 0:
+                wait = self.backend.take(f'{model_id}#tokens', tokens, tokens_per_minute, tokens_per_minute / 60.0)
+                if wait == 0:
+                    self._count('acquired')
+                    if waited:
+                        self._count('waited')
+                    return tokens
+                # Give the request slot back while we wait for tokens
+                self.backend.take(f'{model_id}#requests', -1, requests_per_minute, requests_per_minute / 60.0)
+
+            if self._clock() + wait > deadline:
+                self._count('rejected')
+                raise RateLimitExceeded(model_id, wait)
+            waited = True
+            self._count('wait_seconds', wait)
+            self._sleep(wait)
+
+    def reconcile(self, model_id, reserved_tokens, usage):
+        """
+        Correct a reservation with the token usage Bedrock reported
+        """
+        if not usage:
+            return
+        actual = usage.get('inputTokens', 0) + usage.get('outputTokens', 0)
+        tokens_per_minute = self._quota(model_id)['tokens_per_minute']
+        delta = actual - reserved_tokens
+        if delta:
+            self.backend.take(f'{model_id}#tokens', delta, tokens_per_minute, tokens_per_minute / 60.0, force=True)
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+def get_rate_limiter():
+    """
+    Initialize and return the configured rate limiter
+    """
+    global rate_limiter
+
+    if rate_limiter:
+        return rate_limiter
+
+    rate_limiter = RateLimiter.from_env()
+    return rate_limiter
@@ -0,0 +1,272 @@
+import logging
+import os
+import random
+import threading
+import time
+from metrics import record_metric
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+circuit_breakers = {}
+_breakers_lock = threading.Lock()
+invocation_deadline = None
+
+# Bedrock error codes worth retrying; anything else fails immediately
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'InternalServerException',
+    'ModelNotReadyException',
+    'ModelTimeoutException',
+}
+
+# Error codes that mean "slow down" rather than "broken"
+THROTTLING_ERROR_CODES = {'ThrottlingException', 'TooManyRequestsException'}
+
+# Transport-level botocore exceptions that are safe to retry
+RETRYABLE_EXCEPTION_NAMES = {
+    'EndpointConnectionError',
+    'ConnectionClosedError',
+    'ReadTimeoutError',
+    'ConnectTimeoutError',
+}
+
+# Time kept free at the end of an invocation so the handler can still respond
+DEADLINE_SAFETY_SECONDS = 1.0
+
+_stats_lock = threading.Lock()
+_stats = {
+    'calls': 0,
+    'retries': 0,
+    'retries_exhausted': 0,
+    'deadline_exceeded': 0,
+    'short_circuited': 0,
+}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling Bedrock while the circuit breaker is open
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f'Bedrock circuit breaker is open; retry after {retry_after:.1f}s')
+        self.retry_after = retry_after
+
+
+def error_code(error):
+    """
+    Return the AWS error code of an exception, or None
+    """
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+def is_retryable(error):
+    """
+    Classify whether an error is transient and worth retrying
+    """
+    if error_code(error) in RETRYABLE_ERROR_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_EXCEPTION_NAMES
+
+
+def is_throttling(error):
+    """
+    Return True if the error is a throttling error
+    """
+    return error_code(error) in THROTTLING_ERROR_CODES
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+class CircuitBreaker:
+    """
+    Per-container, per-model circuit breaker.
+
+    Opens after failure_threshold consecutive transient failures, rejects calls
+    for reset_timeout seconds, then lets a single probe through (half-open).
+    Transitions are counted as CircuitOpened / CircuitClosed request metrics.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.open_count = 0
+        self._probe_in_flight = False
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a breaker configured from environment variables
+        """
+        return cls(
+            failure_threshold=int(os.environ.get('BREAKER_FAILURE_THRESHOLD', '5')),
+            reset_timeout=float(os.environ.get('BREAKER_RESET_SECONDS', '30'))
+        )
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if the call should be shed
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self.opened_at + self.reset_timeout - self._clock()
+                if remaining > 0:
+                    raise CircuitOpenError(remaining)
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.reset_timeout)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                record_metric('CircuitClosed', 1)
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """
+        End a call whose outcome says nothing about the service's health, e.g. a
+        client error or throttling; the breaker neither trips nor closes
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.open_count += 1
+                    record_metric('CircuitOpened', 1)
+                    logger.warning("Bedrock circuit breaker opened after %d failures", self.consecutive_failures)
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'open_count': self.open_count
+            }
+
+
+def get_circuit_breaker(model_id='default'):
+    """
+    Initialize and return the container-wide circuit breaker for a model
+    """
+    with _breakers_lock:
+        breaker = circuit_breakers.get(model_id)
+        if breaker is None:
+            breaker = circuit_breakers[model_id] = CircuitBreaker.from_env()
+        return breaker
+
+
+def set_invocation_deadline(context):
+    """
+    Record when the current Lambda invocation times out so retries never outlive it
+    """
+    global invocation_deadline
+
+    if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+        invocation_deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000.0
+    else:
+        invocation_deadline = None
+
+
+def call_with_retries(operation, model_id='default', max_attempts=None, sleep=time.sleep, rng=random.uniform):
+    """
+    Call operation() through the model's circuit breaker, retrying transient
+    errors with exponential backoff and full jitter bounded by the invocation deadline
+    """
+    if max_attempts is None:
+        max_attempts = int(os.environ.get('BEDROCK_MAX_ATTEMPTS', '4'))
+    base_delay = float(os.environ.get('BEDROCK_BACKOFF_BASE_MS', '200')) / 1000.0
+    max_delay = float(os.environ.get('BEDROCK_BACKOFF_MAX_MS', '5000')) / 1000.0
+    breaker = get_circuit_breaker(model_id)
+
+    _count('calls')
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            _count('short_circuited')
+            record_metric('BedrockShortCircuited', 1)
+            raise
+
+        try:
+            result = operation()
+        except Exception as e:
+            if not is_retryable(e):
+                # Client-side errors say nothing about Bedrock's health
+                breaker.release()
+                raise
+            if is_throttling(e):
+                # Backing off is the fix; shedding every call would only lose capacity
+                breaker.release()
+                record_metric('BedrockThrottles', 1)
+            else:
+                breaker.record_failure()
+            attempt += 1
+            if attempt >= max_attempts:
+                _count('retries_exhausted')
+                raise
+            delay = rng(0, min(max_delay, base_delay * (2 ** attempt)))
+            if invocation_deadline is not None and time.monotonic() + delay > invocation_deadline - DEADLINE_SAFETY_SECONDS:
+                _count('deadline_exceeded')
+                raise
+            _count('retries')
+            record_metric('BedrockRetries', 1)
+            logger.warning("Retrying Bedrock call after %s (%s) in %.2fs", type(e).__name__, error_code(e), delay)
+            sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+def get_resilience_stats():
+    """
+    Return retry counters and circuit breaker state per model
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    with _breakers_lock:
+        breakers = dict(circuit_breakers)
+    stats['circuit_breakers'] = {model_id: breaker.stats() for model_id, breaker in breakers.items()}
+    return stats
+
+
+def reset_resilience_state():
+    """
+    Reset counters and the circuit breakers
+    """
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+    with _breakers_lock:
+        circuit_breakers.clear()
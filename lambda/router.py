@@ -0,0 +1,214 @@
+from types import MappingProxyType
+from codec import dumps
+
+# Headers sent with every JSON response; copied per response, never mutated
+DEFAULT_HEADERS = MappingProxyType({
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+})
+
+
+class HttpError(Exception):
+    """
+    Raised by route handlers and middleware to answer with an error response.
+
+    The body is {'error': error, **fields}.
+    """
+
+    def __init__(self, status_code, error, headers=None, **fields):
+        super().__init__(error)
+        self.status_code = status_code
+        self.error = error
+        self.headers = headers
+        self.fields = fields
+
+    def to_response(self):
+        return json_response(self.status_code, dict({'error': self.error}, **self.fields), self.headers)
+
+
+def json_response(status_code, body, headers=None):
+    """
+    Build an API Gateway response with a JSON body and the default headers
+    """
+    response_headers = dict(DEFAULT_HEADERS)
+    if headers:
+        response_headers.update(headers)
+    return {
+        'statusCode': status_code,
+        'headers': response_headers,
+        'body': dumps(body)
+    }
+
+
+class Request:
+    """
+    An API Gateway HTTP API (payload v2) request and the route it matched
+    """
+    __slots__ = ('event', 'context', 'method', 'path', 'route', 'params', 'allowed_methods', 'body')
+
+    def __init__(self, event, context=None):
+        http = event.get('requestContext', {}).get('http', {})
+        self.event = event
+        self.context = context
+        self.method = http.get('method')
+        self.path = http.get('path') or event.get('rawPath') or ''
+        self.route = None
+        self.params = {}
+        self.allowed_methods = ()
+        # Parsed JSON body, set by the body-parsing middleware
+        self.body = None
+
+    @property
+    def route_name(self):
+        """
+        Low-cardinality name for logs and metric dimensions
+        """
+        return self.route.name if self.route else 'unmatched'
+
+    @property
+    def query(self):
+        return self.event.get('queryStringParameters') or {}
+
+    def header(self, name, default=None):
+        """
+        Case-insensitive request header lookup
+        """
+        headers = self.event.get('headers') or {}
+        value = headers.get(name.lower())
+        if value is None:
+            lowered = name.lower()
+            value = next((value for key, value in headers.items() if key.lower() == lowered), default)
+        return value
+
+
+class Route:
+    """
+    A handler registered for a method and a path pattern such as /jobs/{id}.
+
+    options are free-form settings read by middleware (e.g. json_body).
+    """
+    __slots__ = ('method', 'pattern', 'handler', 'name', 'options')
+
+    def __init__(self, method, pattern, handler, options):
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.name = f'{method} {pattern}'
+        self.options = MappingProxyType(dict(options))
+
+
+class _Node:
+    __slots__ = ('literals', 'param_name', 'param', 'methods')
+
+    def __init__(self):
+        self.literals = {}
+        self.param_name = None
+        self.param = None
+        self.methods = {}
+
+
+class Router:
+    """
+    Route table with path parameters and a middleware chain.
+
+    Static paths are found with one dict lookup and parameterized paths by
+    walking a segment tree, so matching cost depends on the path, not on the
+    number of routes. Middleware are callables `middleware(request, call_next)`
+    composed once, when they are registered.
+    """
+
+    def __init__(self):
+        self._static = {}
+        self._tree = _Node()
+        self._middleware = []
+        self._chain = self._call_route
+
+    def add(self, method, pattern, handler, **options):
+        route = Route(method, pattern, handler, options)
+        if '{' not in pattern:
+            methods = self._static.setdefault(pattern, {})
+        else:
+            node = self._tree
+            for segment in pattern.strip('/').split('/'):
+                if segment.startswith('{') and segment.endswith('}'):
+                    if node.param is None:
+                        node.param_name, node.param = segment[1:-1], _Node()
+                    elif node.param_name != segment[1:-1]:
+                        raise ValueError(f'Conflicting path parameter in {pattern}')
+                    node = node.param
+                else:
+                    node = node.literals.setdefault(segment, _Node())
+            methods = node.methods
+        if method in methods:
+            raise ValueError(f'Duplicate route: {route.name}')
+        methods[method] = route
+        return route
+
+    def route(self, method, pattern, **options):
+        """
+        Decorator registering a handler(request) for method and pattern
+        """
+        def register(handler):
+            self.add(method, pattern, handler, **options)
+            return handler
+        return register
+
+    def use(self, middleware):
+        """
+        Append a middleware; the first registered runs outermost
+        """
+        self._middleware.append(middleware)
+        chain = self._call_route
+        for outer in reversed(self._middleware):
+            chain = _wrap(outer, chain)
+        self._chain = chain
+
+    def _match_tree(self, node, segments, index, params):
+        if index == len(segments):
+            return node.methods or None
+        segment = segments[index]
+        child = node.literals.get(segment)
+        if child is not None:
+            methods = self._match_tree(child, segments, index + 1, params)
+            if methods:
+                return methods
+        if node.param is not None and segment:
+            methods = self._match_tree(node.param, segments, index + 1, params)
+            if methods:
+                params[node.param_name] = segment
+                return methods
+        return None
+
+    def match(self, method, path):
+        """
+        Return (route or None, path parameters, methods allowed on the path)
+        """
+        params = {}
+        methods = self._static.get(path)
+        if methods is None and path.startswith('/'):
+            methods = self._match_tree(self._tree, path[1:].split('/'), 0, params)
+        if not methods:
+            return None, {}, ()
+        return methods.get(method), params, tuple(methods)
+
+    def dispatch(self, request):
+        """
+        Match the request and run it through the middleware chain
+        """
+        request.route, request.params, request.allowed_methods = self.match(request.method, request.path)
+        try:
+            return self._chain(request)
+        except HttpError as e:
+            return e.to_response()
+
+    @staticmethod
+    def _call_route(request):
+        if request.route is None:
+            if request.allowed_methods:
+                raise HttpError(405, 'Method not allowed', {'Allow': ', '.join(sorted(request.allowed_methods))})
+            raise HttpError(404, 'Endpoint not found')
+        return request.route.handler(request)
+
+
+def _wrap(middleware, call_next):
+    return lambda request: middleware(request, call_next)
@@ -0,0 +1,3 @@
+#!/bin/sh
+# Entry point for the streaming function, started by the Lambda Web Adapter
+exec python3 streaming.py
@@ -0,0 +1,186 @@
+import codecs
+import contextvars
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from metrics import record_metric, record_phase
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+s3_client = None
+
+S3_SCHEME = 's3://'
+
+
+class InvalidSource(ValueError):
+    """
+    Raised for a malformed s3:// reference or an object that isn't UTF-8 text
+    """
+
+
+class SourceNotAllowed(Exception):
+    """
+    Raised when the referenced bucket isn't one the service may read
+    """
+
+
+class SourceNotFound(Exception):
+    """
+    Raised when the referenced object doesn't exist
+    """
+
+
+class SourceTooLarge(Exception):
+    """
+    Raised when the referenced object is larger than allowed
+    """
+
+
+def get_s3_client():
+    """
+    Initialize and return the S3 client
+    """
+    global s3_client
+
+    if s3_client:
+        return s3_client
+
+    # Imported here so requests with inline text don't pay for boto3
+    import boto3
+    from botocore.config import Config
+
+    options = {}
+    s3_options = {}
+    # Point at a local stand-in (tools/s3_emulator.py) for offline testing
+    if os.environ.get('S3_ENDPOINT_URL'):
+        options['endpoint_url'] = os.environ['S3_ENDPOINT_URL']
+        s3_options['addressing_style'] = 'path'
+
+    s3_client = boto3.client(
+        's3',
+        region_name=os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION'),
+        config=Config(
+            max_pool_connections=int(os.environ.get('S3_MAX_CONCURRENCY', '8')),
+            connect_timeout=float(os.environ.get('S3_CONNECT_TIMEOUT', '2')),
+            read_timeout=float(os.environ.get('S3_READ_TIMEOUT', '30')),
+            tcp_keepalive=True,
+            retries={'mode': 'standard', 'total_max_attempts': 3},
+            s3=s3_options or None
+        ),
+        **options
+    )
+    return s3_client
+
+
+def allowed_buckets():
+    """
+    Buckets sources may be read from: the stack's input bucket plus S3_ALLOWED_BUCKETS
+    """
+    buckets = {bucket.strip() for bucket in os.environ.get('S3_ALLOWED_BUCKETS', '').split(',') if bucket.strip()}
+    if os.environ.get('INPUT_BUCKET_NAME'):
+        buckets.add(os.environ['INPUT_BUCKET_NAME'])
+    return buckets
+
+
+def parse_source(source):
+    """
+    Split an s3://bucket/key reference into (bucket, key), checking the bucket is allowed
+    """
+    if not isinstance(source, str) or not source.startswith(S3_SCHEME):
+        raise InvalidSource('source must be an s3://bucket/key reference')
+    bucket, _, key = source[len(S3_SCHEME):].partition('/')
+    if not bucket or not key:
+        raise InvalidSource('source must be an s3://bucket/key reference')
+    if bucket not in allowed_buckets():
+        raise SourceNotAllowed(bucket)
+    return bucket, key
+
+
+def _error_code(error):
+    return getattr(error, 'response', {}).get('Error', {}).get('Code')
+
+
+def byte_ranges(size, range_bytes):
+    """
+    Split [0, size) into inclusive (start, end) ranges of at most range_bytes
+    """
+    return [(start, min(start + range_bytes, size) - 1) for start in range(0, size, range_bytes)]
+
+
+def read_source(source, max_bytes):
+    """
+    Read a UTF-8 text object referenced as s3://bucket/key.
+
+    Objects over S3_RANGE_BYTES (default 1 MiB) are fetched as parallel ranged
+    GETs pinned to the ETag seen by HEAD, and decoded incrementally in order,
+    so a multi-byte character split across ranges is reassembled.
+    """
+    bucket, key = parse_source(source)
+    client = get_s3_client()
+
+    with record_phase('Fetch'):
+        try:
+            head = client.head_object(Bucket=bucket, Key=key)
+        except Exception as e:
+            if _error_code(e) in ('404', 'NoSuchKey', 'NotFound'):
+                raise SourceNotFound(source) from e
+            if _error_code(e) in ('403', 'AccessDenied'):
+                raise SourceNotAllowed(bucket) from e
+            raise
+        size = head['ContentLength']
+        if size > max_bytes:
+            raise SourceTooLarge(f'Source object is {size} bytes; the limit is {max_bytes}')
+        record_metric('SourceBytes', size)
+        if size == 0:
+            return ''
+
+        def fetch(byte_range):
+            response = client.get_object(Bucket=bucket, Key=key, IfMatch=head['ETag'], Range='bytes=%d-%d' % byte_range)
+            return response['Body'].read()
+
+        ranges = byte_ranges(size, int(os.environ.get('S3_RANGE_BYTES', str(1024 * 1024))))
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        try:
+            if len(ranges) == 1:
+                parts.append(decoder.decode(fetch(ranges[0]), final=True))
+            else:
+                workers = min(int(os.environ.get('S3_MAX_CONCURRENCY', '8')), len(ranges))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # map yields in range order while later ranges are still downloading
+                    futures = executor.map(lambda byte_range: contextvars.copy_context().run(fetch, byte_range), ranges)
+                    for index, data in enumerate(futures):
+                        parts.append(decoder.decode(data, final=index == len(ranges) - 1))
+        except UnicodeDecodeError as e:
+            raise InvalidSource('source object is not UTF-8 text') from e
+        except Exception as e:
+            if _error_code(e) in ('412', 'PreconditionFailed'):
+                raise InvalidSource('source object changed while it was being read') from e
+            raise
+    return ''.join(parts)
+
+
+def create_upload():
+    """
+    Reserve a key in the input bucket and return a presigned PUT URL for it
+    """
+    bucket = os.environ.get('INPUT_BUCKET_NAME')
+    if not bucket:
+        raise RuntimeError('INPUT_BUCKET_NAME is not configured')
+    key = f"{os.environ.get('S3_UPLOAD_PREFIX', 'uploads/')}{uuid.uuid4().hex}"
+    expires_in = int(os.environ.get('S3_UPLOAD_EXPIRES_SECONDS', '900'))
+    url = get_s3_client().generate_presigned_url(
+        'put_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=expires_in
+    )
+    return {
+        'upload_url': url,
+        'method': 'PUT',
+        'source': f'{S3_SCHEME}{bucket}/{key}',
+        'expires_in': expires_in
+    }
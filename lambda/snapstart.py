@@ -0,0 +1,126 @@
+import logging
+import os
+import random
+import time
+import bedrock_service
+import codec
+import document_store
+import job_store
+import jobs
+import rate_limiter
+import s3_input
+from chunking import split_text
+from extractive import NUMPY_MIN_SENTENCES, extractive_summary
+from model_router import get_model_router
+from near_duplicate import get_near_duplicate_index, near_duplicates_enabled
+from summary_cache import get_summary_cache
+from token_estimator import get_token_estimator
+
+try:
+    # Provided by the Lambda Python runtime (3.12 and later); absent elsewhere
+    from snapshot_restore_py import register_after_restore, register_before_snapshot
+except ImportError:
+    register_after_restore = register_before_snapshot = None
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Enough sentences to take the NumPy path in extractive scoring
+PRIME_TEXT = ' '.join(
+    f'Section {index} of the priming document describes item {index % 7} in plain English.'
+    for index in range(NUMPY_MIN_SENTENCES + 5)
+)
+
+
+def snapstart_init():
+    """
+    Whether this init phase will be snapshotted by SnapStart
+    """
+    return os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'snap-start'
+
+
+def _build_clients():
+    """
+    Create every AWS client the function uses. Constructors only; nothing is sent.
+    """
+    bedrock_service.get_bedrock_client()
+    if os.environ.get('INPUT_BUCKET_NAME'):
+        s3_input.get_s3_client()
+    if os.environ.get('JOB_WORKER_FUNCTION_NAME'):
+        jobs.get_lambda_client()
+    job_store.get_job_store()
+    document_store.get_document_store()
+    backend = rate_limiter.get_rate_limiter().backend
+    if isinstance(backend, rate_limiter.DynamoDBRateLimitBackend):
+        backend.client
+
+
+def prime():
+    """
+    Before the snapshot: import lazily loaded dependencies and run each hot path
+    once, so restored environments start with them in memory.
+
+    No network calls and no cache entries: connections and credentials would be
+    stale after restore, and cached state would be shared by every clone.
+    """
+    started = time.perf_counter()
+    _build_clients()
+    get_model_router()
+    get_summary_cache()
+    get_token_estimator().raw_estimate(PRIME_TEXT)
+    extractive_summary(PRIME_TEXT)
+    split_text(PRIME_TEXT, 500, 50)
+    if near_duplicates_enabled():
+        get_near_duplicate_index().fingerprint(PRIME_TEXT)
+
+    payload = codec.dumps({'text': PRIME_TEXT, 'values': [1, 2.5, None, True]}).encode('utf-8')
+    for encoding in codec.supported_encodings():
+        codec.loads(codec.decode_body(codec.compress(payload, encoding), content_encoding=encoding))
+    logger.info('Primed for snapshot', extra={'duration_ms': round((time.perf_counter() - started) * 1000, 3)})
+
+
+def _refresh_default_session():
+    """
+    Replace boto3's default session so credentials are resolved again, keeping
+    the loaded service models
+    """
+    import boto3
+    import botocore.session
+
+    session = botocore.session.get_session()
+    if boto3.DEFAULT_SESSION is not None:
+        session.register_component('data_loader', boto3.DEFAULT_SESSION._session.get_component('data_loader'))
+    boto3.setup_default_session(botocore_session=session)
+
+
+def refresh_after_restore():
+    """
+    After restore: reseed randomness, rebuild clients with fresh credentials and
+    connection pools, and open a connection to Bedrock before the first request.
+    """
+    started = time.perf_counter()
+    # Every clone starts from the same generator state; retry jitter and log sampling must diverge
+    random.seed()
+    _refresh_default_session()
+    bedrock_service.bedrock_client = None
+    s3_input.s3_client = None
+    jobs.lambda_client = None
+    job_store.job_store = None
+    document_store.document_store = None
+    rate_limiter.rate_limiter = None
+    _build_clients()
+    bedrock_service.warm_bedrock_connection()
+    logger.info('Restored from snapshot', extra={'duration_ms': round((time.perf_counter() - started) * 1000, 3)})
+
+
+def register_hooks():
+    """
+    Register the SnapStart runtime hooks when this init will be snapshotted.
+    Returns whether they were registered.
+    """
+    if register_before_snapshot is None or not snapstart_init():
+        return False
+    register_before_snapshot(prime)
+    register_after_restore(refresh_after_restore)
+    return True
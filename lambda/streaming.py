@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from bedrock_service import stream_summary
+from structured_logging import configure_logging
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+configure_logging()
+
+NDJSON = 'ndjson'
+SSE = 'sse'
+
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    SSE: 'text/event-stream',
+}
+
+
+def encode_event(event, stream_format):
+    """
+    Encode one event as an NDJSON line or a server-sent event
+    """
+    data = json.dumps(event)
+    if stream_format == SSE:
+        return f"event: {event['type']}\ndata: {data}\n\n".encode('utf-8')
+    return f"{data}\n".encode('utf-8')
+
+
+def iter_summary_events(text_to_summarize):
+    """
+    Yield delta events as summary text arrives, then a final done event
+    carrying the length metadata (or an error event if Bedrock fails)
+    """
+    summary_length = 0
+    try:
+        for fragment in stream_summary(text_to_summarize):
+            summary_length += len(fragment)
+            yield {'type': 'delta', 'text': fragment}
+    except Exception as e:
+        yield {'type': 'error', 'error': 'Failed to summarize text', 'details': str(e)}
+        return
+
+    yield {
+        'type': 'done',
+        'original_length': len(text_to_summarize),
+        'summary_length': summary_length
+    }
+
+
+class StreamingRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler served behind the Lambda Web Adapter in response streaming mode
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.info(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.split('?')[0] == '/health':
+            self._send_json(200, {'status': 'healthy', 'message': 'API is running'})
+        else:
+            self._send_json(404, {'error': 'Endpoint not found'})
+
+    def do_POST(self):
+        path, _, query = self.path.partition('?')
+        # Always drain the body so a kept-alive connection stays in sync
+        raw_body = self.rfile.read(int(self.headers.get('Content-Length', '0')))
+        if path != '/summarize/stream':
+            self._send_json(404, {'error': 'Endpoint not found'})
+            return
+
+        try:
+            body = json.loads(raw_body or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': 'Invalid JSON body'})
+            return
+
+        text_to_summarize = body.get('text', '')
+        if not text_to_summarize:
+            self._send_json(400, {'error': 'Missing required field: text'})
+            return
+
+        max_input_length = int(os.environ.get('MAX_TEXT_LENGTH', '1000'))
+        if len(text_to_summarize) > max_input_length:
+            self._send_json(400, {'error': f'Text exceeds maximum length of {max_input_length} characters'})
+            return
+
+        accept = self.headers.get('Accept', '')
+        stream_format = SSE if 'format=sse' in query or 'text/event-stream' in accept else NDJSON
+
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPES[stream_format])
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        for event in iter_summary_events(text_to_summarize):
+            self._write_chunk(encode_event(event, stream_format))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def create_server(port=None):
+    """
+    Create the streaming HTTP server on the port the Lambda Web Adapter forwards to
+    """
+    if port is None:
+        port = int(os.environ.get('PORT', '8080'))
+    return ThreadingHTTPServer(('127.0.0.1', port), StreamingRequestHandler)
+
+
+if __name__ == '__main__':
+    create_server().serve_forever()
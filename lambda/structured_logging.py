@@ -0,0 +1,105 @@
+import contextvars
+import hashlib
+import logging
+import os
+import random
+import time
+from codec import dumps
+
+# Request-scoped fields (request id, route) added to every record
+request_context = contextvars.ContextVar('request_context', default={})
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line, with request context and extra fields
+    """
+
+    def format(self, record):
+        entry = {
+            'timestamp': round(record.created, 3),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name,
+        }
+        entry.update(request_context.get())
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return dumps(entry, default=str)
+
+
+def configure_logging():
+    """
+    Install the JSON formatter on the root handlers and apply LOG_LEVEL.
+
+    LOG_FORMAT selects 'json' or 'text'; it defaults to JSON inside Lambda and
+    leaves local/test logging untouched otherwise.
+    """
+    root = logging.getLogger()
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+
+    log_format = os.environ.get('LOG_FORMAT', 'json' if os.environ.get('AWS_LAMBDA_FUNCTION_NAME') else 'text')
+    if log_format != 'json':
+        return
+    if not root.handlers:
+        root.addHandler(logging.StreamHandler())
+    for log_handler in root.handlers:
+        log_handler.setFormatter(JsonFormatter())
+
+
+def bind_request(**fields):
+    """
+    Set the request-scoped fields; returns a token for reset_request
+    """
+    return request_context.set({name: value for name, value in fields.items() if value is not None})
+
+
+def reset_request(token):
+    request_context.reset(token)
+
+
+def describe_payload(text):
+    """
+    Summarize a payload for logging by size and digest, never its content
+    """
+    if text is None:
+        return None
+    data = text.encode('utf-8') if isinstance(text, str) else text
+    return {'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()[:16]}
+
+
+def truncate(text, max_chars=None):
+    """
+    Cut text to LOG_MAX_FIELD_CHARS (default 256), noting how much was dropped
+    """
+    if max_chars is None:
+        max_chars = int(os.environ.get('LOG_MAX_FIELD_CHARS', '256'))
+    if text is None or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}...[{len(text) - max_chars} more chars]"
+
+
+def should_log_body(logger, rng=random.random):
+    """
+    Decide whether to log a (truncated) body at debug level.
+
+    Cheap when debug logging is off; otherwise samples LOG_BODY_SAMPLE_RATE
+    (default 0) of requests.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    rate = float(os.environ.get('LOG_BODY_SAMPLE_RATE', '0'))
+    return rate > 0 and rng() < rate
+
+
+def elapsed_ms(started):
+    """
+    Milliseconds since a time.perf_counter() reading
+    """
+    return round((time.perf_counter() - started) * 1000.0, 2)
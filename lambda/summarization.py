@@ -1,120 +1,421 @@
 import json
 import logging
 import os
-from bedrock_service import summarize_text
+import time
+from collections import namedtuple
+from bedrock_service import summarize_text, summarize_batch
+from chunking import map_reduce_summarize, summarize_documents
+from extractive import extractive_summary
+from summary_cache import get_summary_cache
+from near_duplicate import get_near_duplicate_index
+from jobs import JobInputTooLarge, submit_job, describe_job
+from job_store import get_job_store
+from documents import DocumentNotFound, OffsetMismatch, append_to_document, create_document, describe_document, document_summary
+from document_store import DocumentConflict
+from s3_input import InvalidSource, SourceNotAllowed, SourceNotFound, SourceTooLarge, create_upload, read_source
+from resilience import CircuitOpenError, get_resilience_stats, is_retryable, set_invocation_deadline
+from rate_limiter import RateLimitExceeded, get_rate_limiter
+from model_router import DEFAULT_TIER, get_model_router
+from token_estimator import estimate_tokens, get_token_estimator
+from metrics import current_metrics_summary, record_error, record_phase
+from middleware import compression_middleware, conditional_get_middleware, error_middleware, json_body_middleware, metrics_middleware
+from router import HttpError, Request, Router, json_response
+from snapstart import register_hooks
+from structured_logging import bind_request, configure_logging, describe_payload, elapsed_ms, reset_request, should_log_body, truncate
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
+configure_logging()
+
+Config = namedtuple('Config', [
+    'max_text_length',
+    'max_document_length',
+    'max_batch_size',
+    'max_multi_documents',
+    'max_append_length',
+    'max_source_bytes',
+    'input_token_limits',
+    'extractive_fallback'
+])
+
+
+def parse_token_limits(value):
+    """
+    Parse INPUT_TOKEN_LIMITS: a JSON object mapping route names (e.g.
+    "POST /summarize") to a token limit for every tier, or to an object of
+    limits per tier where "*" is the default
+    """
+    limits = {}
+    for route, tiers in json.loads(value or '{}').items():
+        limits[route] = dict(tiers) if isinstance(tiers, dict) else {'*': tiers}
+    return limits
+
+
+def load_config():
+    """
+    Read request limits from the environment once per container
+    """
+    return Config(
+        max_text_length=int(os.environ.get('MAX_TEXT_LENGTH', '1000')),
+        max_document_length=int(os.environ.get('MAX_DOCUMENT_LENGTH', '2000000')),
+        max_batch_size=int(os.environ.get('MAX_BATCH_SIZE', '100')),
+        # Bounded so the labelled per-document summaries fit a single combine call
+        max_multi_documents=int(os.environ.get('MAX_MULTI_DOCUMENTS', '16')),
+        max_append_length=int(os.environ.get('DOCUMENT_MAX_APPEND_LENGTH', '200000')),
+        max_source_bytes=int(os.environ.get('S3_MAX_OBJECT_BYTES', str(8 * 1024 * 1024))),
+        input_token_limits=parse_token_limits(os.environ.get('INPUT_TOKEN_LIMITS')),
+        extractive_fallback=os.environ.get('EXTRACTIVE_FALLBACK', 'false').lower() == 'true'
+    )
+
+
+config = load_config()
+router = Router()
+
 
 def handler(event, context):
     """
     Lambda handler for the API
     """
-    logger.info(f"Received event: {json.dumps(event)}")
-    
+    started = time.perf_counter()
+    request = Request(event, context)
+    token = bind_request(
+        request_id=getattr(context, 'aws_request_id', None) or event.get('requestContext', {}).get('requestId'),
+        method=request.method,
+        route=request.path
+    )
     try:
-        # Parse HTTP request
-        http_method = event['requestContext']['http']['method']
-        path = event['requestContext']['http']['path']
-        
-        # Health check endpoint
-        if http_method == 'GET' and path == '/health':
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'status': 'healthy',
-                    'message': 'API is running'
-                })
-            }
-        
-        # Summarize endpoint
-        if http_method == 'POST' and path == '/summarize':
-            try:
-                # Parse request body
-                body = json.loads(event.get('body', '{}'))
-                text_to_summarize = body.get('text', '')
-                
-                if not text_to_summarize:
-                    return {
-                        'statusCode': 400,
-                        'headers': {
-                            'Content-Type': 'application/json',
-                            'Access-Control-Allow-Origin': '*'
-                        },
-                        'body': json.dumps({
-                            'error': 'Missing required field: text'
-                        })
-                    }
-                
-                # Validate input length to prevent abuse
-                max_input_length = int(os.environ.get('MAX_TEXT_LENGTH', '1000'))
-                if len(text_to_summarize) > max_input_length:
-                    return {
-                        'statusCode': 400,
-                        'headers': {
-                            'Content-Type': 'application/json',
-                            'Access-Control-Allow-Origin': '*'
-                        },
-                        'body': json.dumps({
-                            'error': f'Text exceeds maximum length of {max_input_length} characters'
-                        })
-                    }
-                
-                # Call summarization function
-                result = summarize_text(text_to_summarize)
-                
-                return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({
-                        'success': True,
-                        'data': result
-                    })
-                }
-                
-            except Exception as e:
-                logger.error(f"Error in summarize endpoint: {str(e)}")
-                return {
-                    'statusCode': 500,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({
-                        'error': 'Failed to summarize text',
-                        'details': str(e)
-                    })
-                }
-        
-        # 404 for other endpoints
-        return {
-            'statusCode': 404,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Endpoint not found'
+        set_invocation_deadline(context)
+        if should_log_body(logger):
+            # The digest identifies the whole body when the logged part is truncated
+            logger.debug('Request body', extra={
+                'body': truncate(event.get('body')),
+                'payload': describe_payload(event.get('body'))
             })
-        }
-        
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'error': 'Internal server error'
+
+        response = router.dispatch(request)
+
+        # Sizes and timings only; bodies can be megabytes
+        if logger.isEnabledFor(logging.INFO):
+            logger.info('Request completed', extra={
+                'status': response['statusCode'],
+                'duration_ms': elapsed_ms(started),
+                'request_length': len(event.get('body') or ''),
+                'response_length': len(response.get('body') or '')
             })
+        return response
+    finally:
+        reset_request(token)
+
+
+def extractive_fallback_allowed(error):
+    """
+    Whether to answer with an extractive summary instead of failing.
+
+    Only when EXTRACTIVE_FALLBACK=true and Bedrock is unavailable or out of quota,
+    never for errors caused by the request itself.
+    """
+    if not config.extractive_fallback:
+        return False
+    return isinstance(error, (CircuitOpenError, RateLimitExceeded)) or is_retryable(error)
+
+
+def require_text(text, max_length):
+    """
+    Validate a text field, raising HttpError(400) if it is missing or too long
+    """
+    if not isinstance(text, str) or not text:
+        raise HttpError(400, 'Missing required field: text')
+    if len(text) > max_length:
+        raise HttpError(400, f'Text exceeds maximum length of {max_length} characters')
+    return text
+
+
+def require_tokens(request, text, tier=None, single_call=True):
+    """
+    Admit text by its estimated token count, raising HttpError(400) if it is over
+    the limit configured for the route and tier.
+
+    Text sent to the model in one call (single_call) must also fit the largest
+    model in the tier; chunked modes are limited only by configuration.
+    """
+    tier = tier or DEFAULT_TIER
+    tiers = config.input_token_limits.get(request.route_name, {})
+    limit = tiers.get(tier, tiers.get('*'))
+    if single_call:
+        capacity = get_model_router().max_input_tokens(tier)
+        limit = capacity if limit is None else min(limit, capacity)
+    if limit is None or limit == float('inf'):
+        return text
+    estimated = estimate_tokens(text)
+    if estimated > limit:
+        raise HttpError(400, f'Text exceeds maximum of {limit} tokens', estimated_tokens=estimated, max_tokens=limit)
+    return text
+
+
+def fetch_source(source):
+    """
+    Read the text behind an s3://bucket/key reference, mapping failures to HTTP errors
+    """
+    try:
+        return read_source(source, config.max_source_bytes)
+    except InvalidSource as e:
+        raise HttpError(400, str(e))
+    except SourceNotAllowed:
+        raise HttpError(403, 'Access to the source object is not allowed')
+    except SourceNotFound:
+        raise HttpError(404, 'Source object not found')
+    except SourceTooLarge:
+        raise HttpError(413, f'Source object exceeds maximum size of {config.max_source_bytes} bytes')
+
+
+def require_tier(tier):
+    if tier is not None and (not isinstance(tier, str) or tier not in get_model_router().tiers):
+        raise HttpError(400, f'Unsupported tier: {tier}')
+    return tier
+
+
+@router.route('GET', '/health', cache_control='no-store')
+def health(request):
+    return json_response(200, {
+        'status': 'healthy',
+        'message': 'API is running',
+        'cache': get_summary_cache().stats(),
+        'near_duplicates': get_near_duplicate_index().stats(),
+        'bedrock': get_resilience_stats(),
+        'rate_limiter': get_rate_limiter().stats(),
+        'models': get_model_router().stats(),
+        'tokens': get_token_estimator().stats()
+    })
+
+
+@router.route('POST', '/summarize', json_body=True, error='Failed to summarize text')
+def summarize(request):
+    body = request.body
+    source = body.get('source')
+    # Objects referenced by source are usually long, so they default to map_reduce
+    mode = body.get('mode', 'map_reduce' if source else 'default')
+    if source and body.get('text'):
+        raise HttpError(400, 'Provide either text or source, not both')
+    if not source and not body.get('text'):
+        raise HttpError(400, 'Missing required field: text')
+    if mode not in ('default', 'map_reduce', 'fast'):
+        raise HttpError(400, f'Unsupported mode: {mode}')
+
+    keep_ratio = body.get('keep_ratio')
+    if keep_ratio is not None and (isinstance(keep_ratio, bool) or not isinstance(keep_ratio, (int, float)) or not 0 < keep_ratio <= 1):
+        raise HttpError(400, 'keep_ratio must be a number greater than 0 and at most 1')
+    tier = require_tier(body.get('tier'))
+
+    text = fetch_source(source) if source else body['text']
+    # Validate input length to prevent abuse
+    text_to_summarize = require_text(text, config.max_document_length if mode in ('map_reduce', 'fast') else config.max_text_length)
+    if mode != 'fast':
+        require_tokens(request, text_to_summarize, tier, single_call=mode == 'default')
+
+    options = {'tier': tier} if tier is not None else {}
+    if keep_ratio is not None:
+        options['keep_ratio'] = keep_ratio
+    with record_phase('Summarize'):
+        if mode == 'fast':
+            # Sentence extraction only; never calls Bedrock
+            result = extractive_summary(text_to_summarize, keep_ratio)
+        else:
+            try:
+                if mode == 'map_reduce':
+                    result = map_reduce_summarize(text_to_summarize, **options)
+                else:
+                    result = summarize_text(text_to_summarize, **options)
+            except Exception as e:
+                if not extractive_fallback_allowed(e):
+                    raise
+                logger.warning("Bedrock unavailable, returning extractive summary: %s", e)
+                record_error(e)
+                result = dict(extractive_summary(text_to_summarize), degraded=True)
+
+    if body.get('include_metrics'):
+        result = dict(result, metrics=current_metrics_summary())
+
+    with record_phase('Serialize'):
+        return json_response(200, {'success': True, 'data': result})
+
+
+@router.route('POST', '/uploads', error='Failed to create upload')
+def create_upload_endpoint(request):
+    # The client PUTs the text to upload_url, then summarizes it with {"source": ...}
+    data = dict(create_upload(), max_bytes=config.max_source_bytes)
+    return json_response(201, {'success': True, 'data': data})
+
+
+@router.route('POST', '/summarize/batch', json_body=True, error='Failed to summarize batch')
+def summarize_batch_endpoint(request):
+    texts = request.body.get('texts')
+    if not isinstance(texts, list) or not texts:
+        raise HttpError(400, 'Missing required field: texts')
+    if len(texts) > config.max_batch_size:
+        raise HttpError(400, f'Batch exceeds maximum size of {config.max_batch_size} texts')
+
+    # Reject invalid items individually so the rest of the batch still runs
+    results = [None] * len(texts)
+    valid_indexes = []
+    for index, text in enumerate(texts):
+        try:
+            require_tokens(request, require_text(text, config.max_text_length))
+        except HttpError as e:
+            results[index] = {'index': index, 'success': False, 'error': e.error}
+        else:
+            valid_indexes.append(index)
+
+    if valid_indexes:
+        with record_phase('Summarize'):
+            batch_results = summarize_batch([texts[index] for index in valid_indexes])
+        for index, item in zip(valid_indexes, batch_results):
+            item['index'] = index
+            results[index] = item
+
+    succeeded = sum(1 for item in results if item['success'])
+    data = {
+        'results': results,
+        'succeeded': succeeded,
+        'failed': len(results) - succeeded
+    }
+    if request.body.get('include_metrics'):
+        data['metrics'] = current_metrics_summary()
+
+    with record_phase('Serialize'):
+        return json_response(200, {'success': succeeded == len(results), 'data': data})
+
+
+def require_documents(request, documents, tier):
+    """
+    Validate the documents of a multi-document request, returning (label, text)
+    pairs. Documents are strings or {"id": ..., "text": ...}; ids default to
+    their 1-based position.
+    """
+    if not isinstance(documents, list) or not documents:
+        raise HttpError(400, 'Missing required field: documents')
+    if len(documents) > config.max_multi_documents:
+        raise HttpError(400, f'Request exceeds maximum of {config.max_multi_documents} documents')
+
+    labelled = []
+    for index, document in enumerate(documents):
+        if isinstance(document, str):
+            document = {'text': document}
+        if not isinstance(document, dict):
+            raise HttpError(400, 'Each document must be a string or an object with text', index=index)
+        label = document.get('id', str(index + 1))
+        if not isinstance(label, str) or not label or len(label) > 100 or '[' in label or ']' in label:
+            raise HttpError(400, 'Document id must be a string of 1 to 100 characters without brackets', index=index)
+        try:
+            # Each document is summarized in one call
+            text = require_tokens(request, require_text(document.get('text'), config.max_text_length), tier)
+        except HttpError as e:
+            e.fields['index'] = index
+            raise
+        labelled.append((label, text))
+
+    if len({label for label, _ in labelled}) != len(labelled):
+        raise HttpError(400, 'Document ids must be unique')
+    return labelled
+
+
+@router.route('POST', '/summarize/multi', json_body=True, error='Failed to summarize documents')
+def summarize_multi_endpoint(request):
+    tier = require_tier(request.body.get('tier'))
+    documents = require_documents(request, request.body.get('documents'), tier)
+
+    with record_phase('Summarize'):
+        result = summarize_documents(documents, **({'tier': tier} if tier is not None else {}))
+    if request.body.get('include_metrics'):
+        result = dict(result, metrics=current_metrics_summary())
+
+    with record_phase('Serialize'):
+        return json_response(200, {'success': True, 'data': result})
+
+
+@router.route('POST', '/jobs', json_body=True, error='Failed to submit job')
+def submit_job_endpoint(request):
+    mode = request.body.get('mode', 'map_reduce')
+    if not request.body.get('text'):
+        raise HttpError(400, 'Missing required field: text')
+    if mode not in ('default', 'map_reduce'):
+        raise HttpError(400, f'Unsupported mode: {mode}')
+    text_to_summarize = require_text(request.body['text'], config.max_document_length if mode == 'map_reduce' else config.max_text_length)
+    require_tokens(request, text_to_summarize, single_call=mode == 'default')
+
+    try:
+        job = submit_job(text_to_summarize, mode)
+    except JobInputTooLarge as e:
+        raise HttpError(413, str(e))
+    return json_response(202, {
+        'success': True,
+        'data': {
+            'job_id': job['job_id'],
+            'status': job['status']
         }
+    }, {'Location': f"/jobs/{job['job_id']}"})
+
+
+# Job status reads only the job store, never Bedrock
+@router.route('GET', '/jobs/{id}', cache_control='no-cache', etag=True)
+def job_status(request):
+    job = get_job_store().get(request.params['id'])
+    if job is None:
+        raise HttpError(404, 'Job not found')
+    return json_response(200, {'success': True, 'data': describe_job(job)})
+
+
+@router.route('POST', '/documents', json_body=True, error='Failed to create document')
+def create_document_endpoint(request):
+    text = request.body.get('text', '')
+    if not isinstance(text, str):
+        raise HttpError(400, 'Missing required field: text')
+    tier = require_tier(request.body.get('tier'))
+    if text:
+        require_tokens(request, require_text(text, config.max_append_length), tier, single_call=False)
+
+    with record_phase('Summarize'):
+        document = create_document(text, **({'tier': tier} if tier is not None else {}))
+    return json_response(201, {'success': True, 'data': describe_document(document)},
+                         {'Location': f"/documents/{document['document_id']}"})
+
+
+@router.route('POST', '/documents/{id}/append', json_body=True, error='Failed to update document')
+def append_document_endpoint(request):
+    text = require_tokens(request, require_text(request.body.get('text', ''), config.max_append_length), single_call=False)
+    offset = request.body.get('offset')
+    if offset is not None and (isinstance(offset, bool) or not isinstance(offset, int) or offset < 0):
+        raise HttpError(400, 'offset must be a non-negative integer')
+
+    try:
+        with record_phase('Summarize'):
+            document = append_to_document(request.params['id'], text, offset)
+    except DocumentNotFound:
+        raise HttpError(404, 'Document not found')
+    except OffsetMismatch as e:
+        raise HttpError(409, 'Offset does not match the document length', length=e.length)
+    except DocumentConflict:
+        raise HttpError(409, 'Document was modified by another request; retry the append')
+    return json_response(200, {'success': True, 'data': describe_document(document)})
+
+
+@router.route('GET', '/documents/{id}/summary', cache_control='no-cache', etag=True, error='Failed to summarize document')
+def document_summary_endpoint(request):
+    include_pending = request.query.get('include_pending', 'true').lower() != 'false'
+    try:
+        with record_phase('Summarize'):
+            data = document_summary(request.params['id'], include_pending)
+    except DocumentNotFound:
+        raise HttpError(404, 'Document not found')
+    return json_response(200, {'success': True, 'data': data})
+
+
+# Outermost first
+router.use(metrics_middleware)
+router.use(compression_middleware)
+router.use(conditional_get_middleware)
+router.use(error_middleware)
+router.use(json_body_middleware)
+
+# With SnapStart, prime before the snapshot and reconnect after each restore
+register_hooks()
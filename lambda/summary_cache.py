@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+summary_cache = None
+
+
+def normalize_text(text):
+    """
+    Normalize text so trivially different copies share a cache entry
+    """
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def make_cache_key(text, model_id, prompt_template):
+    """
+    Build a content-addressed key from the normalized text, model and prompt
+    """
+    digest = hashlib.sha256()
+    for part in (normalize_text(text), model_id, prompt_template):
+        encoded = part.encode('utf-8')
+        # Length-prefix each part so boundaries can't be forged by the content
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _entry_size(key, value):
+    """
+    Approximate the memory held by a cache entry in bytes
+    """
+    size = len(key)
+    for item in value.values():
+        size += len(item.encode('utf-8')) if isinstance(item, str) else 8
+    return size
+
+
+class SummaryCache:
+    """
+    Thread-safe LRU cache of summaries bounded by entry count, bytes and TTL,
+    with single-flight deduplication of concurrent misses.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024, ttl_seconds=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create a cache sized from environment variables
+        """
+        return cls(
+            max_entries=int(os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', '1024')),
+            max_bytes=int(os.environ.get('SUMMARY_CACHE_MAX_BYTES', str(16 * 1024 * 1024))),
+            ttl_seconds=float(os.environ.get('SUMMARY_CACHE_TTL_SECONDS', '3600'))
+        )
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _lookup(self, key):
+        """
+        Return a live entry's value, dropping it if expired. Caller holds the lock.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Store a value, evicting least recently used entries to stay within bounds
+        """
+        size = _entry_size(key, value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, self._clock() + self.ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Return (value, cached) for key, calling compute() on a miss.
+
+        Concurrent misses for the same key wait on a single in-flight call
+        instead of each invoking compute().
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value, True
+            future = self._in_flight.get(key)
+            if future is None:
+                self.misses += 1
+                future = Future()
+                self._in_flight[key] = future
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value, False
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self):
+        """
+        Drop all entries and reset counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.coalesced = 0
+            self.evictions = self.expirations = 0
+
+    def stats(self):
+        """
+        Return hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
+
+
+def get_summary_cache():
+    """
+    Initialize and return the container-wide summary cache
+    """
+    global summary_cache
+
+    if summary_cache:
+        return summary_cache
+
+    summary_cache = SummaryCache.from_env()
+    return summary_cache
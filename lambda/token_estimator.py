@@ -0,0 +1,209 @@
+import json
+import logging
+import math
+import os
+import string
+import threading
+
+# Configure logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Global variables
+token_estimator = None
+
+# Expected tokens per UTF-8 byte class. English prose averages about four
+# characters per token, but code is dense in punctuation, CJK ideographs are
+# usually a token each and emoji several, so a flat characters-per-token ratio
+# undercounts exactly the inputs that overflow.
+DEFAULT_WEIGHTS = {
+    'letter': 0.25,
+    'digit': 0.4,
+    'space': 0.15,
+    'punctuation': 0.8,
+    # Lead bytes of multi-byte characters, by encoded length
+    'two_byte': 0.6,
+    'three_byte': 1.1,
+    'four_byte': 2.0,
+}
+
+
+def _build_class_table():
+    # Map every byte to a one-byte class code so a single translate() pass
+    # classifies the whole text and count() tallies each class in C
+    table = bytearray(b'p' * 256)
+    for char in string.ascii_letters:
+        table[ord(char)] = ord('l')
+    for char in string.digits:
+        table[ord(char)] = ord('d')
+    for char in string.whitespace:
+        table[ord(char)] = ord('s')
+    for byte in range(0x80, 0x100):
+        if byte < 0xC0:
+            table[byte] = ord('c')
+        elif byte < 0xE0:
+            table[byte] = ord('2')
+        elif byte < 0xF0:
+            table[byte] = ord('3')
+        else:
+            table[byte] = ord('4')
+    return bytes(table)
+
+
+# Texts longer than this are estimated from evenly spaced windows, which keeps
+# the cost of estimating a multi-megabyte document to a few milliseconds
+SAMPLE_THRESHOLD_CHARS = 256 * 1024
+SAMPLE_WINDOWS = 64
+SAMPLE_WINDOW_CHARS = 4096
+
+_CLASS_TABLE = _build_class_table()
+_CLASS_CODES = {
+    'letter': b'l',
+    'digit': b'd',
+    'space': b's',
+    'punctuation': b'p',
+    'two_byte': b'2',
+    'three_byte': b'3',
+    'four_byte': b'4',
+}
+
+
+def count_character_classes(text):
+    """
+    Count the characters of text in each class of DEFAULT_WEIGHTS
+    """
+    classes = text.encode('utf-8', 'surrogatepass').translate(_CLASS_TABLE)
+    if len(classes) == len(text):
+        # Pure ASCII: no multi-byte classes, and letters are whatever is left
+        counts = {name: classes.count(_CLASS_CODES[name]) for name in ('digit', 'space', 'punctuation')}
+        counts['letter'] = len(classes) - sum(counts.values())
+        counts.update(two_byte=0, three_byte=0, four_byte=0)
+        return counts
+    return {name: classes.count(code) for name, code in _CLASS_CODES.items()}
+
+
+def _sample(text):
+    """
+    Evenly spaced windows of a long text, and the factor scaling their counts to the whole
+    """
+    step = len(text) // SAMPLE_WINDOWS
+    sample = ''.join(text[index * step:index * step + SAMPLE_WINDOW_CHARS] for index in range(SAMPLE_WINDOWS))
+    return sample, len(text) / len(sample)
+
+
+class TokenEstimator:
+    """
+    Tokenizer-free token estimate, calibrated against reported usage.
+
+    The raw estimate weights each character class; a per-model scale, an
+    exponentially weighted mean of actual/raw input tokens, corrects it for the
+    model's tokenizer and the Converse message framing. Models with no
+    observations yet use the scale learned across all models.
+    """
+
+    def __init__(self, weights=None, alpha=0.1, min_scale=0.25, max_scale=4.0):
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.alpha = alpha
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self._lock = threading.Lock()
+        self._global = {'scale': 1.0, 'observations': 0, 'error': None}
+        self._models = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Create an estimator from TOKEN_ESTIMATOR_WEIGHTS (JSON) and TOKEN_ESTIMATOR_ALPHA
+        """
+        weights = os.environ.get('TOKEN_ESTIMATOR_WEIGHTS')
+        return cls(
+            weights=json.loads(weights) if weights else None,
+            alpha=float(os.environ.get('TOKEN_ESTIMATOR_ALPHA', '0.1'))
+        )
+
+    def raw_estimate(self, text):
+        """
+        Uncalibrated token estimate for text, as a float
+        """
+        if not text:
+            return 0.0
+        factor = 1.0
+        if len(text) > SAMPLE_THRESHOLD_CHARS:
+            text, factor = _sample(text)
+        counts = count_character_classes(text)
+        return factor * sum(self.weights[name] * count for name, count in counts.items())
+
+    def scale(self, model_id=None):
+        with self._lock:
+            state = self._models.get(model_id) or self._global
+            return state['scale']
+
+    def calibrate(self, raw, model_id=None):
+        """
+        Turn a raw estimate into whole tokens with the model's learned scale
+        """
+        return max(1, math.ceil(raw * self.scale(model_id)))
+
+    def estimate(self, text, model_id=None):
+        """
+        Estimated input tokens for text sent to model_id
+        """
+        return self.calibrate(self.raw_estimate(text), model_id)
+
+    def observe(self, model_id, raw, actual_tokens):
+        """
+        Update the scale for model_id with the input tokens Bedrock reported for a prompt
+        whose raw estimate was raw
+        """
+        if not raw or not actual_tokens:
+            return
+        ratio = min(self.max_scale, max(self.min_scale, actual_tokens / raw))
+        with self._lock:
+            states = [self._global]
+            if model_id is not None:
+                # Until its first observation a model is estimated with the overall scale
+                states.append(self._models.setdefault(model_id, {'scale': self._global['scale'], 'observations': 0, 'error': None}))
+            for state in states:
+                # Relative error of the estimate we would have made before this observation
+                error = abs(raw * state['scale'] - actual_tokens) / actual_tokens
+                state['error'] = error if state['error'] is None else state['error'] + self.alpha * (error - state['error'])
+                # The first observation replaces the prior; later ones are averaged in
+                if state['observations'] == 0:
+                    state['scale'] = ratio
+                else:
+                    state['scale'] += self.alpha * (ratio - state['scale'])
+                state['observations'] += 1
+
+    def stats(self):
+        def view(state):
+            return {
+                'observations': state['observations'],
+                'scale': round(state['scale'], 4),
+                'mean_relative_error': None if state['error'] is None else round(state['error'], 4)
+            }
+
+        with self._lock:
+            return {
+                'overall': view(self._global),
+                'models': {model_id: view(state) for model_id, state in self._models.items()}
+            }
+
+
+def get_token_estimator():
+    """
+    Initialize and return the container-wide token estimator
+    """
+    global token_estimator
+
+    if token_estimator:
+        return token_estimator
+
+    token_estimator = TokenEstimator.from_env()
+    return token_estimator
+
+
+def estimate_tokens(text, model_id=None):
+    """
+    Estimate the number of tokens in text without a tokenizer
+    """
+    return get_token_estimator().estimate(text, model_id)
@@ -0,0 +1,128 @@
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import boto3
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import the emulator tool
+spec = importlib.util.spec_from_file_location("bedrock_emulator", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "bedrock_emulator.py"))
+bedrock_emulator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bedrock_emulator)
+
+import bedrock_service
+
+MODEL_ID = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+MESSAGES = [{'role': 'user', 'content': [{'text': 'Summarize:\n\n' + 'The quick brown fox jumps over the lazy dog. ' * 10}]}]
+
+
+@pytest.fixture
+def emulator():
+    server, endpoint_url = bedrock_emulator.start_emulator(seed=1)
+    yield server, endpoint_url
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(endpoint_url):
+    return boto3.client(
+        'bedrock-runtime',
+        region_name='us-east-1',
+        endpoint_url=endpoint_url,
+        aws_access_key_id='test',
+        aws_secret_access_key='test',
+        config=Config(retries={'total_max_attempts': 1})
+    )
+
+
+class TestBedrockEmulator:
+    """Test suite for the local Bedrock Converse emulator, driven through botocore."""
+
+    def test_converse(self, emulator):
+        """Test that botocore parses a Converse response from the emulator."""
+        server, endpoint_url = emulator
+
+        response = make_client(endpoint_url).converse(modelId=MODEL_ID, messages=MESSAGES)
+
+        assert response['output']['message']['content'][0]['text'].startswith('The quick brown fox')
+        assert response['stopReason'] == 'end_turn'
+        assert response['usage']['inputTokens'] > response['usage']['outputTokens'] > 0
+        assert server.state.stats['requests'] == 1
+
+    def test_converse_stream(self, emulator):
+        """Test that the event-stream encoding is decoded by botocore."""
+        _, endpoint_url = emulator
+
+        response = make_client(endpoint_url).converse_stream(modelId=MODEL_ID, messages=MESSAGES)
+        events = list(response['stream'])
+
+        text = ''.join(event['contentBlockDelta']['delta']['text'] for event in events if 'contentBlockDelta' in event)
+        assert text.startswith('The quick brown fox')
+        assert list(events[0]) == ['messageStart']
+        assert events[-1]['metadata']['usage']['outputTokens'] > 0
+
+    def test_connections_are_reused(self, emulator):
+        """Test that sequential calls share one pooled keep-alive connection."""
+        server, endpoint_url = emulator
+        client = make_client(endpoint_url)
+
+        for _ in range(3):
+            client.converse(modelId=MODEL_ID, messages=MESSAGES)
+
+        assert server.state.stats['connections'] == 1
+
+    def test_injected_throttling(self, emulator):
+        """Test that injected throttles surface as ThrottlingException."""
+        server, endpoint_url = emulator
+        server.state.throttle_rate = 1.0
+
+        with pytest.raises(ClientError) as excinfo:
+            make_client(endpoint_url).converse(modelId=MODEL_ID, messages=MESSAGES)
+
+        assert excinfo.value.response['Error']['Code'] == 'ThrottlingException'
+        assert excinfo.value.response['ResponseMetadata']['HTTPStatusCode'] == 429
+
+    def test_injected_errors(self, emulator):
+        """Test that the configured error type is returned at the error rate."""
+        server, endpoint_url = emulator
+        server.state.error_rate = 1.0
+        server.state.error_type = 'ServiceUnavailableException'
+
+        with pytest.raises(ClientError) as excinfo:
+            make_client(endpoint_url).converse(modelId=MODEL_ID, messages=MESSAGES)
+
+        assert excinfo.value.response['Error']['Code'] == 'ServiceUnavailableException'
+
+    def test_latency_distributions(self):
+        """Test that latency specs are parsed and sampled."""
+        assert bedrock_emulator.LatencyDistribution('constant:25').sample() == 25
+        assert 10 <= bedrock_emulator.LatencyDistribution('uniform:10:20').sample() <= 20
+        assert bedrock_emulator.LatencyDistribution('lognormal:100:0.5').sample() > 0
+        with pytest.raises(ValueError):
+            bedrock_emulator.LatencyDistribution('gamma:1')
+
+    def test_bedrock_service_against_emulator(self, emulator):
+        """Test the service end to end over HTTP via BEDROCK_ENDPOINT_URL."""
+        _, endpoint_url = emulator
+        environment = {
+            'BEDROCK_ENDPOINT_URL': endpoint_url,
+            'AWS_ACCESS_KEY_ID': 'test',
+            'AWS_SECRET_ACCESS_KEY': 'test',
+            'SUMMARY_CACHE_ENABLED': 'false',
+            'RATE_LIMIT_ENABLED': 'false'
+        }
+        with patch.dict(os.environ, environment):
+            bedrock_service.bedrock_client = None
+            try:
+                result = bedrock_service.summarize_text('The quick brown fox jumps over the lazy dog. ' * 10)
+                streamed = ''.join(bedrock_service.stream_summary('The quick brown fox jumps over the lazy dog. ' * 10))
+            finally:
+                bedrock_service.bedrock_client = None
+
+        assert result['summary'].startswith('The quick brown fox')
+        assert streamed == result['summary']
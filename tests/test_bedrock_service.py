@@ -2,8 +2,9 @@ import json
 import pytest
 import sys
 import os
+import time
 import importlib.util
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 from botocore.exceptions import ClientError
 
 # Add the lambda directory to Python path so modules can be imported
@@ -24,6 +25,12 @@ class TestBedrockService:
     def setup_method(self):
         """Reset global variables before each test."""
         bedrock_service_module.bedrock_client = None
+        bedrock_service_module.get_summary_cache().clear()
+        sys.modules['resilience'].reset_resilience_state()
+        sys.modules['rate_limiter'].rate_limiter = None
+        sys.modules['model_router'].model_router = None
+        sys.modules['near_duplicate'].near_duplicate_index = None
+        sys.modules['token_estimator'].token_estimator = None
 
     @patch('boto3.client')
     @patch.dict(os.environ, {'AWS_REGION': 'us-west-2'})
@@ -37,7 +44,8 @@ class TestBedrockService:
         assert result == mock_client
         mock_boto_client.assert_called_once_with(
             service_name='bedrock-runtime',
-            region_name='us-west-2'
+            region_name='us-west-2',
+            config=ANY
         )
         assert bedrock_service_module.bedrock_client == mock_client
 
@@ -63,9 +71,46 @@ class TestBedrockService:
         
         mock_boto_client.assert_called_once_with(
             service_name='bedrock-runtime',
-            region_name='us-east-2'
+            region_name='us-east-2',
+            config=ANY
         )
 
+    @patch('boto3.client')
+    @patch.dict(os.environ, {'BATCH_MAX_WORKERS': '32', 'BEDROCK_READ_TIMEOUT': '90'})
+    def test_get_bedrock_client_tuned_config(self, mock_boto_client):
+        """Test that the client is built with a pool sized to fan-out, timeouts, keepalive and adaptive retries."""
+        get_bedrock_client()
+
+        config = mock_boto_client.call_args.kwargs['config']
+        assert config.max_pool_connections == 32
+        assert config.connect_timeout == 2
+        assert config.read_timeout == 90
+        assert config.tcp_keepalive is True
+        assert config.retries == {'mode': 'adaptive', 'total_max_attempts': 1}
+
+    @patch('boto3.client')
+    def test_warm_bedrock_connection_uses_client_pool(self, mock_boto_client):
+        """Test that pre-warming sends a request through the client's connection pool."""
+        mock_client = MagicMock()
+        mock_client.meta.endpoint_url = 'https://bedrock-runtime.us-east-2.amazonaws.com'
+        mock_boto_client.return_value = mock_client
+
+        assert bedrock_service_module.warm_bedrock_connection() is True
+
+        request = mock_client._endpoint.http_session.send.call_args[0][0]
+        assert request.method == 'GET'
+        assert request.url == 'https://bedrock-runtime.us-east-2.amazonaws.com/'
+
+    @patch('boto3.client')
+    def test_warm_bedrock_connection_ignores_errors(self, mock_boto_client):
+        """Test that a failed pre-warm never breaks initialization."""
+        mock_client = MagicMock()
+        mock_client.meta.endpoint_url = 'https://bedrock-runtime.us-east-2.amazonaws.com'
+        mock_client._endpoint.http_session.send.side_effect = Exception('Network unreachable')
+        mock_boto_client.return_value = mock_client
+
+        assert bedrock_service_module.warm_bedrock_connection() is False
+
     @patch('boto3.client')
     def test_summarize_text_success(self, mock_get_client):
         """Test successful text summarization."""
@@ -89,13 +134,14 @@ class TestBedrockService:
         assert result['summary_length'] == len('This is a summary.')
         
         mock_client.converse.assert_called_once_with(
-            modelId="us.anthropic.claude-3-5-haiku-20241022-v1:0",
+            modelId="us.anthropic.claude-3-haiku-20240307-v1:0",
             messages=[{
                 "role": "user",
                 "content": [{
                     "text": f"Please summarize the following text in a concise and clear manner:\n\n{text}"
                 }]
-            }]
+            }],
+            inferenceConfig={'maxTokens': 256}
         )
 
     @patch('boto3.client')
@@ -171,3 +217,298 @@ class TestBedrockService:
         assert result['summary'] == 'Summary with émojis 🚀 and spëcial chars!'
         assert result['original_length'] == len(text)
         assert result['summary_length'] == len('Summary with émojis 🚀 and spëcial chars!')
+
+    @patch('boto3.client')
+    def test_summarize_text_serves_repeats_from_cache(self, mock_get_client):
+        """Test that repeated texts are summarized once and then served from the cache."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'Cached summary.'}]}}
+        }
+
+        first = summarize_text("The same article.")
+        second = summarize_text("  The same   article. ")
+
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['summary'] == 'Cached summary.'
+        assert second['original_length'] == len("  The same   article. ")
+        mock_client.converse.assert_called_once()
+
+    @patch('boto3.client')
+    @patch.dict(os.environ, {'SUMMARY_CACHE_ENABLED': 'false'})
+    def test_summarize_text_cache_disabled(self, mock_get_client):
+        """Test that the cache can be disabled through the environment."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'Summary.'}]}}
+        }
+
+        summarize_text("Uncached text.")
+        summarize_text("Uncached text.")
+
+        assert mock_client.converse.call_count == 2
+
+    @patch('boto3.client')
+    def test_summarize_batch_preserves_order_and_errors(self, mock_get_client):
+        """Test that batch results keep input order and report per-item errors."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        def converse(modelId, messages, inferenceConfig=None):
+            text = messages[0]['content'][0]['text']
+            if 'bad' in text:
+                raise Exception('Bedrock failed')
+            return {'output': {'message': {'content': [{'text': text[-5:]}]}}}
+
+        mock_client.converse.side_effect = converse
+
+        results = bedrock_service_module.summarize_batch(['one 1', 'bad 2', 'three'])
+
+        assert [item['index'] for item in results] == [0, 1, 2]
+        assert results[0]['data']['summary'] == 'one 1'
+        assert results[1] == {'index': 1, 'success': False, 'error': 'Bedrock failed'}
+        assert results[2]['data']['summary'] == 'three'
+        mock_get_client.assert_called_once()
+
+    @patch('boto3.client')
+    def test_summarize_batch_runs_items_concurrently(self, mock_get_client):
+        """Test that one slow item does not serialize the batch."""
+        import time
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        def converse(modelId, messages, inferenceConfig=None):
+            time.sleep(0.2)
+            return {'output': {'message': {'content': [{'text': 'summary'}]}}}
+
+        mock_client.converse.side_effect = converse
+
+        start = time.monotonic()
+        results = bedrock_service_module.summarize_batch([f'text {i}' for i in range(8)])
+        elapsed = time.monotonic() - start
+
+        assert all(item['success'] for item in results)
+        assert elapsed < 0.2 * 4
+
+    @patch('boto3.client')
+    def test_stream_summary_yields_deltas(self, mock_get_client):
+        """Test that stream_summary yields text fragments from ConverseStream."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse_stream.return_value = {
+            'stream': [
+                {'messageStart': {'role': 'assistant'}},
+                {'contentBlockDelta': {'delta': {'text': 'Streamed '}, 'contentBlockIndex': 0}},
+                {'contentBlockDelta': {'delta': {'text': 'summary.'}, 'contentBlockIndex': 0}},
+                {'messageStop': {'stopReason': 'end_turn'}},
+                {'metadata': {'usage': {'inputTokens': 10, 'outputTokens': 3}}}
+            ]
+        }
+
+        fragments = list(bedrock_service_module.stream_summary("Text to stream"))
+
+        assert fragments == ['Streamed ', 'summary.']
+        mock_client.converse_stream.assert_called_once()
+
+        # The completed summary is cached for later requests
+        assert summarize_text("Text to stream")['summary'] == 'Streamed summary.'
+        mock_client.converse.assert_not_called()
+
+    @patch('boto3.client')
+    @patch.dict(os.environ, {'EXTRACTIVE_KEEP_RATIO': '0.5', 'EXTRACTIVE_MIN_CHARS': '100'})
+    def test_stream_summary_shares_cache_with_compressed_text(self, mock_get_client):
+        """Test that streamed and whole summaries of a compressed text share one cache entry."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse_stream.return_value = {
+            'stream': [{'contentBlockDelta': {'delta': {'text': 'Streamed summary.'}, 'contentBlockIndex': 0}}]
+        }
+        text = ' '.join(f'Sentence {index} covers topic {index % 4} of the quarterly report.' for index in range(20))
+
+        assert ''.join(bedrock_service_module.stream_summary(text)) == 'Streamed summary.'
+
+        # Only the compressed text was sent
+        prompt = mock_client.converse_stream.call_args.kwargs['messages'][0]['content'][0]['text']
+        assert len(prompt) < len(text)
+        assert summarize_text(text)['summary'] == 'Streamed summary.'
+        mock_client.converse.assert_not_called()
+
+    @patch('boto3.client')
+    @patch.dict(os.environ, {'BEDROCK_BACKOFF_BASE_MS': '1', 'BEDROCK_BACKOFF_MAX_MS': '1'})
+    def test_summarize_text_retries_throttling(self, mock_get_client):
+        """Test that throttled Converse calls are retried."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        throttled = ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'Converse')
+        mock_client.converse.side_effect = [
+            throttled,
+            {'output': {'message': {'content': [{'text': 'Summary after retry.'}]}}}
+        ]
+
+        result = summarize_text("Throttled text")
+
+        assert result['summary'] == 'Summary after retry.'
+        assert mock_client.converse.call_count == 2
+
+    @patch('boto3.client')
+    def test_summarize_text_does_not_retry_access_denied(self, mock_get_client):
+        """Test that non-retryable errors fail on the first attempt."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        error_response = {'Error': {'Code': 'AccessDeniedException', 'Message': 'Access denied'}}
+        mock_client.converse.side_effect = ClientError(error_response, 'Converse')
+
+        with pytest.raises(ClientError):
+            summarize_text("Denied text")
+
+        assert mock_client.converse.call_count == 1
+
+    @patch('boto3.client')
+    @patch.dict(os.environ, {'BEDROCK_REQUESTS_PER_MINUTE': '1', 'RATE_LIMIT_MAX_WAIT_MS': '0'})
+    def test_summarize_text_rate_limited_before_calling_bedrock(self, mock_get_client):
+        """Test that requests over quota are refused without a Bedrock round trip."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'Summary.'}]}},
+            'usage': {'inputTokens': 20, 'outputTokens': 5}
+        }
+
+        metrics = sys.modules['metrics']
+        recorder = metrics.MetricsRecorder('Test')
+        token = metrics.current_metrics.set(recorder)
+        try:
+            summarize_text("First text")
+            # Later texts fall back through the tier, each model with its own quota
+            assert summarize_text("Second text")['model_id'] == 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+            assert summarize_text("Third text")['model_id'] == 'us.anthropic.claude-3-5-sonnet-20241022-v2:0'
+            with pytest.raises(sys.modules['rate_limiter'].RateLimitExceeded):
+                summarize_text("Fourth text")
+        finally:
+            metrics.current_metrics.reset(token)
+
+        assert mock_client.converse.call_count == 3
+        # Quota fallbacks move traffic to costlier models, so they're counted
+        assert recorder.values['QuotaFallbacks'] == 5
+        assert recorder.values['ModelFallbacks'] == 5
+
+    @patch('boto3.client')
+    @patch.dict(os.environ, {'BEDROCK_BACKOFF_BASE_MS': '1', 'BEDROCK_BACKOFF_MAX_MS': '1'})
+    def test_summarize_text_falls_back_to_next_model(self, mock_get_client):
+        """Test that a throttled primary model falls back and reports the serving model."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        def converse(modelId, messages, inferenceConfig=None):
+            if modelId == 'us.anthropic.claude-3-haiku-20240307-v1:0':
+                raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'Converse')
+            return {'output': {'message': {'content': [{'text': 'Fallback summary.'}]}}}
+
+        mock_client.converse.side_effect = converse
+
+        result = summarize_text("Text for fallback")
+
+        assert result['summary'] == 'Fallback summary.'
+        assert result['model_id'] == 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+        models = [call.kwargs['modelId'] for call in mock_client.converse.call_args_list]
+        assert models == [
+            'us.anthropic.claude-3-haiku-20240307-v1:0',
+            'us.anthropic.claude-3-haiku-20240307-v1:0',
+            'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+        ]
+
+    def test_fallback_times_only_the_bedrock_call(self):
+        """Test that waits before the Bedrock call don't count toward the model's latency."""
+        def call(model_id, max_attempts, timing):
+            time.sleep(0.2)
+            return bedrock_service_module._timed(lambda: 'response', timing)()
+
+        assert bedrock_service_module._call_with_fallback(['model'], call) == ('model', 'response')
+        assert sys.modules['model_router'].get_model_router().stats()['model']['latency_ms'] < 100
+
+    @patch('boto3.client')
+    def test_summarize_text_routes_by_tier(self, mock_get_client):
+        """Test that the fast tier routes small inputs to the fastest model."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {'output': {'message': {'content': [{'text': 'Fast.'}]}}}
+
+        result = summarize_text("Short text", tier='fast')
+
+        assert result['model_id'] == 'us.anthropic.claude-3-haiku-20240307-v1:0'
+        assert mock_client.converse.call_args.kwargs['modelId'] == 'us.anthropic.claude-3-haiku-20240307-v1:0'
+
+    @patch('boto3.client')
+    def test_summarize_text_does_not_fall_back_on_validation_error(self, mock_get_client):
+        """Test that non-retryable errors are raised without trying other models."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.side_effect = ClientError({'Error': {'Code': 'ValidationException', 'Message': 'Bad input'}}, 'Converse')
+
+        with pytest.raises(ClientError):
+            summarize_text("Invalid text")
+
+        assert mock_client.converse.call_count == 1
+
+    @patch.dict(os.environ, {'AWS_LAMBDA_FUNCTION_NAME': 'fn', 'AWS_LAMBDA_INITIALIZATION_TYPE': 'on-demand'}, clear=True)
+    def test_should_prewarm_skips_on_demand_init(self):
+        """Test that on-demand cold starts do not pay for the boto3 import at init."""
+        assert bedrock_service_module.should_prewarm() is False
+
+    @patch.dict(os.environ, {'AWS_LAMBDA_FUNCTION_NAME': 'fn', 'AWS_LAMBDA_INITIALIZATION_TYPE': 'provisioned-concurrency'}, clear=True)
+    def test_should_prewarm_for_provisioned_concurrency(self):
+        """Test that init off the request path warms the Bedrock connection."""
+        assert bedrock_service_module.should_prewarm() is True
+
+    @patch.dict(os.environ, {'AWS_LAMBDA_FUNCTION_NAME': 'fn', 'AWS_LAMBDA_INITIALIZATION_TYPE': 'snap-start'}, clear=True)
+    def test_should_prewarm_skips_snap_start_init(self):
+        """Test that a connection is not opened into the snapshot; the restore hook opens it instead."""
+        assert bedrock_service_module.should_prewarm() is False
+
+    @patch.dict(os.environ, {'AWS_LAMBDA_FUNCTION_NAME': 'fn', 'AWS_LAMBDA_INITIALIZATION_TYPE': 'on-demand', 'BEDROCK_PREWARM': 'true'}, clear=True)
+    def test_should_prewarm_override(self):
+        """Test that BEDROCK_PREWARM=true forces the pre-warm for any init type."""
+        assert bedrock_service_module.should_prewarm() is True
+
+    @patch.dict(os.environ, {'BEDROCK_PREWARM': 'true'}, clear=True)
+    def test_should_prewarm_only_inside_lambda(self):
+        """Test that local imports never open a connection."""
+        assert bedrock_service_module.should_prewarm() is False
+
+    @patch.dict(os.environ, {'EXTRACTIVE_MIN_CHARS': '100'})
+    @patch('boto3.client')
+    def test_summarize_text_compresses_before_prompt(self, mock_get_client):
+        """Test that keep_ratio sends only the most central sentences to Bedrock."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {'output': {'message': {'content': [{'text': 'Summary.'}]}}}
+        text = ("Bedrock summarizes text for the API. The API sends text to Bedrock. "
+                "Unrelated trivia about penguins. Bedrock returns the summary to the API.")
+
+        result = summarize_text(text, keep_ratio=0.5)
+
+        prompt = mock_client.converse.call_args.kwargs['messages'][0]['content'][0]['text']
+        assert 'penguins' not in prompt
+        assert result['original_length'] == len(text)
+
+    @patch.dict(os.environ, {'NEAR_DUPLICATE_ENABLED': 'true'})
+    @patch('boto3.client')
+    def test_summarize_text_reuses_near_duplicate_summary(self, mock_get_client):
+        """Test that a near-identical text reuses the stored summary instead of calling Bedrock."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {'output': {'message': {'content': [{'text': 'Article summary.'}]}}}
+        article = ' '.join(f'Sentence number {index} of the article about regional energy prices.' for index in range(20))
+
+        first = summarize_text(article + ' Tracking id 12345.')
+        second = summarize_text(article + ' Tracking id 67890.')
+
+        assert mock_client.converse.call_count == 1
+        assert second['summary'] == first['summary']
+        assert second['near_duplicate_similarity'] >= 0.8
+        assert 'near_duplicate_similarity' not in first
@@ -0,0 +1,69 @@
+import json
+import logging
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import the benchmark tool
+spec = importlib.util.spec_from_file_location("benchmark", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "benchmark.py"))
+benchmark = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(benchmark)
+
+import bedrock_service
+import metrics
+
+
+class TestBenchmark:
+    """Test suite for the handler benchmark harness."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+
+        assert benchmark.percentile(values, 0.5) == 50
+        assert benchmark.percentile(values, 0.99) == 99
+        assert benchmark.percentile([], 0.5) is None
+
+    def test_make_event(self):
+        """Test that generated events look like API Gateway v2 requests."""
+        rng = benchmark.random.Random(1)
+
+        event = benchmark.make_event('map_reduce', 5000, rng)
+
+        assert event['version'] == '2.0'
+        assert event['requestContext']['http'] == {'method': 'POST', 'path': '/summarize'}
+        body = json.loads(event['body'])
+        assert body['mode'] == 'map_reduce'
+        assert abs(len(body['text']) - 5000) < 50
+        assert 'body' not in benchmark.make_event('health', 100, rng)
+
+    def test_parse_weights(self):
+        """Test route mix parsing."""
+        assert benchmark.parse_weights('summarize:3,health') == {'summarize': 3.0, 'health': 1.0}
+
+    @patch.dict(os.environ, {'RATE_LIMIT_ENABLED': 'false'})
+    def test_run_benchmark_with_stub_backend(self, tmp_path):
+        """Test a small end-to-end run produces comparable, machine-readable results."""
+        level = logging.getLogger().level
+        output = tmp_path / 'results.json'
+        try:
+            benchmark.main(['--requests', '10', '--warmup', '2', '--concurrency', '1,2',
+                            '--sizes', '300,3000', '--output', str(output)])
+        finally:
+            bedrock_service.bedrock_client = None
+            metrics.metrics_sink = None
+            logging.getLogger().setLevel(level)
+
+        results = json.loads(output.read_text())
+        assert [item['concurrency'] for item in results['levels']] == [1, 2]
+        for item in results['levels']:
+            assert item['requests'] == 10
+            assert item['status_codes'] == {'200': 10}
+            assert item['throughput_rps'] > 0
+            assert item['latency_ms']['p50'] <= item['latency_ms']['p99']
+            assert item['cpu_ms_per_request'] >= 0
+        assert 'vs' in benchmark.compare(results, results)
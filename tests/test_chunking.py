@@ -0,0 +1,191 @@
+import pytest
+import sys
+import os
+import threading
+import time
+import importlib.util
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so chunking can import bedrock_service
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import chunking module
+spec = importlib.util.spec_from_file_location("chunking", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "chunking.py"))
+chunking_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(chunking_module)
+
+split_text = chunking_module.split_text
+map_reduce_summarize = chunking_module.map_reduce_summarize
+
+
+def fake_summarize(text, prompt_template=None, tier=None, keep_ratio=None):
+    """Return a short deterministic summary of the text."""
+    summary = f"S({len(text)})"
+    return {'summary': summary, 'original_length': len(text), 'summary_length': len(summary)}
+
+
+class TestSplitText:
+    """Test suite for splitting text into chunks."""
+
+    def test_short_text_is_single_chunk(self):
+        """Test that text shorter than the limit is returned as one chunk."""
+        assert split_text("One sentence. Two sentences.", 100) == ["One sentence. Two sentences."]
+
+    def test_chunks_respect_max_chars(self):
+        """Test that every chunk fits in the requested size."""
+        text = " ".join(f"Sentence number {i} is here." for i in range(200))
+        chunks = split_text(text, 120, overlap_chars=30)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 120 for chunk in chunks)
+
+    def test_chunks_split_on_sentence_boundaries(self):
+        """Test that chunks end at sentence boundaries when possible."""
+        text = " ".join(f"Sentence number {i} is here." for i in range(50))
+        chunks = split_text(text, 100)
+
+        assert all(chunk.endswith('.') for chunk in chunks)
+
+    def test_chunks_prefer_paragraph_boundaries(self):
+        """Test that short paragraphs are packed together and kept intact."""
+        text = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+        chunks = split_text(text, 40)
+
+        assert chunks == ["First paragraph.\n\nSecond paragraph.", "Third paragraph."]
+
+    def test_chunks_overlap(self):
+        """Test that each chunk begins with the tail of the previous chunk."""
+        text = " ".join(f"Sentence {i}." for i in range(40))
+        chunks = split_text(text, 60, overlap_chars=20)
+
+        for previous, current in zip(chunks, chunks[1:]):
+            first_sentence = current.split('.')[0] + '.'
+            assert first_sentence in previous
+
+    def test_all_content_is_covered(self):
+        """Test that no sentence is dropped while chunking."""
+        sentences = [f"Sentence {i}." for i in range(100)]
+        chunks = split_text(" ".join(sentences), 80, overlap_chars=15)
+        joined = " ".join(chunks)
+
+        assert all(sentence in joined for sentence in sentences)
+
+    def test_oversized_sentence_is_hard_split(self):
+        """Test that a single sentence longer than the limit is still split."""
+        chunks = split_text("word " * 100, 50)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 50 for chunk in chunks)
+
+    def test_invalid_max_chars(self):
+        """Test that a non-positive chunk size is rejected."""
+        with pytest.raises(ValueError):
+            split_text("text", 0)
+
+
+class TestMapReduceSummarize:
+    """Test suite for map-reduce summarization."""
+
+    def test_short_text_uses_single_call(self):
+        """Test that text within one chunk is summarized directly."""
+        with patch.object(chunking_module, 'summarize_text', side_effect=fake_summarize) as mock_summarize:
+            result = map_reduce_summarize("Short text.", max_chars=100)
+
+        mock_summarize.assert_called_once_with("Short text.", tier='balanced', keep_ratio=1.0)
+        assert result['chunk_count'] == 1
+        assert result['depth'] == 1
+
+    def test_long_text_is_reduced_to_one_summary(self):
+        """Test that long text is chunked, summarized and reduced."""
+        text = " ".join(f"Sentence number {i} is here." for i in range(500))
+
+        with patch.object(chunking_module, 'summarize_text', side_effect=fake_summarize) as mock_summarize:
+            result = map_reduce_summarize(text, max_chars=500, max_workers=4)
+
+        assert result['chunk_count'] > 1
+        assert result['depth'] >= 2
+        assert result['original_length'] == len(text)
+        assert result['summary'].startswith('S(')
+        assert mock_summarize.call_count > result['chunk_count']
+        # The last call combines partial summaries
+        assert mock_summarize.call_args[0][1] == chunking_module.COMBINE_PROMPT
+
+    def test_chunks_are_summarized_in_parallel(self):
+        """Test that chunk summaries run concurrently on the thread pool."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_summarize(text, prompt_template=None, tier=None, keep_ratio=None):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return fake_summarize(text)
+
+        text = " ".join(f"Sentence number {i} is here." for i in range(40))
+        with patch.object(chunking_module, 'summarize_text', side_effect=slow_summarize):
+            map_reduce_summarize(text, max_chars=200, max_workers=4)
+
+        assert max(peak) > 1
+        assert max(peak) <= 4
+
+    @patch.dict(os.environ, {'CHUNK_CONTEXT_FRACTION': '0.5'})
+    def test_chunk_size_is_driven_by_context_window(self):
+        """Test that chunk size scales with the model's context window."""
+        chunking_module.MODEL_CONTEXT_TOKENS['test-model'] = 20000
+
+        try:
+            size = chunking_module.chunk_size_for_model('test-model')
+        finally:
+            del chunking_module.MODEL_CONTEXT_TOKENS['test-model']
+
+        assert size == (10000 - chunking_module.RESERVED_TOKENS) * chunking_module.CHARS_PER_TOKEN
+
+
+class TestSummarizeDocuments:
+    """Test suite for multi-document summarization."""
+
+    def test_documents_are_combined_with_labels(self):
+        """Test that per-document summaries are labelled and reduced in one call."""
+        def citing_summarize(text, prompt_template=None, tier=None, keep_ratio=None):
+            if prompt_template == chunking_module.MULTI_DOCUMENT_PROMPT:
+                return {'summary': 'Outage [INC-1] paged on-call [INC-2].', 'model_id': 'model', 'cached': False}
+            return dict(fake_summarize(text), cached=text == 'cached one')
+
+        documents = [('INC-1', 'Database failover.'), ('INC-2', 'cached one'), ('INC-3', 'Unrelated.')]
+        with patch.object(chunking_module, 'summarize_text', side_effect=citing_summarize) as mock_summarize:
+            result = chunking_module.summarize_documents(documents, tier='fast')
+
+        assert mock_summarize.call_count == 4
+        reduce_text, reduce_prompt = mock_summarize.call_args[0][:2]
+        assert reduce_prompt == chunking_module.MULTI_DOCUMENT_PROMPT
+        assert reduce_text == '[INC-1] S(18)\n\n[INC-2] S(10)\n\n[INC-3] S(10)'
+        assert result['summary'] == 'Outage [INC-1] paged on-call [INC-2].'
+        assert result['document_count'] == 3
+        assert result['cached_count'] == 1
+        assert [source['cited'] for source in result['sources']] == [True, True, False]
+
+    def test_single_document_skips_reduce(self):
+        with patch.object(chunking_module, 'summarize_text', side_effect=fake_summarize) as mock_summarize:
+            result = chunking_module.summarize_documents([('1', 'Only one.')])
+
+        mock_summarize.assert_called_once()
+        assert result['summary'] == 'S(9)'
+        assert result['sources'][0]['cited'] is True
+
+    def test_latency_is_slowest_document_plus_reduce(self):
+        """Test that all documents are summarized at once rather than in rounds."""
+        def slow_summarize(text, prompt_template=None, tier=None, keep_ratio=None):
+            time.sleep(0.1)
+            return fake_summarize(text)
+
+        documents = [(str(index), f'Document {index}.') for index in range(12)]
+        started = time.perf_counter()
+        with patch.object(chunking_module, 'summarize_text', side_effect=slow_summarize):
+            chunking_module.summarize_documents(documents)
+
+        # One parallel map round and one reduce call, well short of 12 sequential calls
+        assert time.perf_counter() - started < 0.6
@@ -0,0 +1,126 @@
+import base64
+import gzip
+import json
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import codec
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+
+def summarize_event(body, headers=None, is_base64=False):
+    """Build a POST /summarize API Gateway event."""
+    return {
+        'requestContext': {'http': {'method': 'POST', 'path': '/summarize'}},
+        'headers': headers or {},
+        'body': body,
+        'isBase64Encoded': is_base64
+    }
+
+
+class TestCodec:
+    """Test suite for JSON serialization and body encodings."""
+
+    def test_dumps_round_trips_like_stdlib(self):
+        """Test that the codec produces the same values as the json module."""
+        value = {'text': 'café ☃', 'numbers': [1, 2.5, None, True], 1: 'non-string key'}
+
+        assert json.loads(codec.dumps(value)) == json.loads(json.dumps(value))
+        assert codec.loads(codec.dumps({'big': 2 ** 70})) == {'big': 2 ** 70}
+
+    def test_stdlib_fallback(self):
+        """Test that the codec works without orjson."""
+        with patch.object(codec, 'orjson', None):
+            assert codec.loads(codec.dumps({'a': [1, 2]})) == {'a': [1, 2]}
+
+    def test_decode_base64_gzip(self):
+        """Test that base64 and gzip are both undone."""
+        payload = base64.b64encode(gzip.compress(b'{"text": "hello"}')).decode('ascii')
+
+        assert codec.decode_body(payload, True, 'gzip') == b'{"text": "hello"}'
+
+    def test_decode_brotli(self):
+        """Test br request bodies."""
+        brotli = pytest.importorskip('brotli')
+
+        assert codec.decode_body(brotli.compress(b'{"a": 1}'), False, 'br') == b'{"a": 1}'
+
+    def test_decompression_is_bounded(self):
+        """Test that a small body can't expand past the limit."""
+        bomb = gzip.compress(b'0' * 1_000_000)
+
+        with pytest.raises(codec.BodyTooLarge):
+            codec.decode_body(bomb, False, 'gzip', max_bytes=10_000)
+
+    def test_rejects_unknown_and_corrupt_encodings(self):
+        """Test unsupported and malformed bodies."""
+        with pytest.raises(codec.UnsupportedEncoding):
+            codec.decode_body(b'data', False, 'compress')
+        with pytest.raises(ValueError):
+            codec.decode_body(b'not gzip', False, 'gzip')
+
+    def test_negotiate_encoding(self):
+        """Test Accept-Encoding parsing with quality values."""
+        with patch.object(codec, '_brotli_module', None):
+            assert codec.negotiate_encoding('gzip, deflate, br') == 'gzip'
+        assert codec.negotiate_encoding('gzip;q=0.5, identity') == 'gzip'
+        assert codec.negotiate_encoding('gzip;q=0') is None
+        assert codec.negotiate_encoding('identity') is None
+        assert codec.negotiate_encoding(None) is None
+        if codec._brotli() is not None:
+            assert codec.negotiate_encoding('gzip, br') == 'br'
+            assert codec.negotiate_encoding('*') == 'br'
+
+
+class TestHandlerEncodings:
+    """Test suite for compressed requests and responses through the handler."""
+
+    def test_gzip_request_body(self):
+        """Test that a base64 gzip body from API Gateway is decoded."""
+        body = base64.b64encode(gzip.compress(json.dumps({'text': 'Some text'}).encode('utf-8'))).decode('ascii')
+
+        with patch.object(summarization_module, 'summarize_text', return_value={'summary': 'Short.'}) as mock_summarize:
+            response = handler(summarize_event(body, {'content-encoding': 'gzip'}, is_base64=True), None)
+
+        assert response['statusCode'] == 200
+        mock_summarize.assert_called_once_with('Some text')
+
+    def test_unsupported_request_encoding_returns_415(self):
+        """Test that unknown Content-Encodings are rejected."""
+        response = handler(summarize_event('{}', {'content-encoding': 'compress'}), None)
+
+        assert response['statusCode'] == 415
+
+    def test_large_response_is_compressed(self):
+        """Test that responses are gzip-compressed when the client accepts it."""
+        summary = 'A long summary sentence. ' * 200
+
+        with patch.object(summarization_module, 'summarize_text', return_value={'summary': summary}):
+            response = handler(summarize_event(json.dumps({'text': 'Some text'}), {'accept-encoding': 'gzip'}), None)
+
+        assert response['isBase64Encoded'] is True
+        assert response['headers']['Content-Encoding'] == 'gzip'
+        assert response['headers']['Vary'] == 'Accept-Encoding'
+        assert json.loads(gzip.decompress(base64.b64decode(response['body'])))['data']['summary'] == summary
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        """Test that small bodies and clients without Accept-Encoding get identity."""
+        with patch.object(summarization_module, 'summarize_text', return_value={'summary': 'Short.'}):
+            response = handler(summarize_event(json.dumps({'text': 'Some text'}), {'accept-encoding': 'gzip'}), None)
+        assert 'Content-Encoding' not in response['headers']
+
+        with patch.object(summarization_module, 'summarize_text', return_value={'summary': 'Long. ' * 500}):
+            response = handler(summarize_event(json.dumps({'text': 'Some text'})), None)
+        assert 'Content-Encoding' not in response['headers']
+        assert json.loads(response['body'])['success'] is True
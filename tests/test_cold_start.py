@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+import os
+import importlib.util
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(REPO_ROOT, "lambda")
+
+# Import the import-time report tool
+spec = importlib.util.spec_from_file_location("import_time", os.path.join(REPO_ROOT, "tools", "import_time.py"))
+import_time = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(import_time)
+
+SAMPLE_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        450 |     json.decoder
+import time:       200 |        650 |   json
+import time:      1000 |       1770 | summarization
+"""
+
+
+class TestColdStart:
+    """Test suite for the handler's import-time footprint."""
+
+    def test_parse_importtime(self):
+        """Test that -X importtime lines are parsed with their nesting depth."""
+        entries = import_time.parse_importtime(SAMPLE_OUTPUT)
+
+        assert entries == [
+            ('_io', 120, 120, 1),
+            ('json.decoder', 300, 450, 2),
+            ('json', 200, 650, 1),
+            ('summarization', 1000, 1770, 0)
+        ]
+
+    def test_health_check_does_not_import_boto3(self):
+        """Test that importing the handler and serving /health never loads boto3."""
+        script = (
+            "import json, sys, summarization\n"
+            "response = summarization.handler({"
+            "'requestContext': {'http': {'method': 'GET', 'path': '/health'}}}, None)\n"
+            "print(json.dumps({'status': response['statusCode'], "
+            "'loaded': sorted(m for m in ('boto3', 'botocore', 'sqlite3') if m in sys.modules)}))\n"
+        )
+        env = {key: value for key, value in os.environ.items() if not key.startswith('AWS_')}
+        # As configured by the deployed stack
+        env.update({
+            'AWS_REGION': 'us-east-1',
+            'JOBS_TABLE_NAME': 'jobs',
+            'JOB_WORKER_FUNCTION_NAME': 'job-worker',
+            'DOCUMENTS_TABLE_NAME': 'documents',
+            'RATE_LIMIT_TABLE_NAME': 'rate-limits',
+            'INPUT_BUCKET_NAME': 'inputs'
+        })
+        result = subprocess.run([sys.executable, "-c", script], cwd=LAMBDA_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        assert report == {'status': 200, 'loaded': []}
@@ -0,0 +1,220 @@
+import json
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch, MagicMock
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import chunking as chunking_module
+import document_store as document_store_module
+import documents as documents_module
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """Install a local document store backend for the duration of a test."""
+    if request.param == 'sqlite':
+        backend = document_store_module.SQLiteDocumentStore(str(tmp_path / 'documents.db'))
+    else:
+        backend = document_store_module.InMemoryDocumentStore()
+    with patch.object(document_store_module, 'document_store', backend):
+        yield backend
+
+
+@pytest.fixture
+def bedrock():
+    """Record every summarize_text call and answer with a short fixed-size summary."""
+    calls = []
+
+    def fake_summarize(text, prompt_template=None, tier=None, keep_ratio=None):
+        calls.append(text)
+        return {'summary': f'Summary {len(calls)}.', 'model_id': 'test-model'}
+
+    with patch.object(documents_module, 'summarize_text', side_effect=fake_summarize), \
+            patch.object(chunking_module, 'summarize_text', side_effect=fake_summarize), \
+            patch.dict(os.environ, {'DOCUMENT_CHUNK_CHARS': '1000'}):
+        yield calls
+
+
+def sentences(count, start=0):
+    return ' '.join(f'Speaker {index % 3} said line number {index} of the meeting transcript.' for index in range(start, start + count)) + ' '
+
+
+def document_event(method, path, payload=None, query=None):
+    """Build a /documents API Gateway event."""
+    event = {'requestContext': {'http': {'method': method, 'path': path}}}
+    if payload is not None:
+        event['body'] = json.dumps(payload)
+    if query is not None:
+        event['queryStringParameters'] = query
+    return event
+
+
+class TestDocumentStores:
+    """Test suite for the document store backends."""
+
+    def test_put_requires_expected_version(self, store):
+        """Test that writes are conditional on the version that was read."""
+        store.put({'document_id': 'abc', 'version': 1, 'summary': ''})
+        store.put({'document_id': 'abc', 'version': 2, 'summary': 'new'}, expected_version=1)
+
+        with pytest.raises(document_store_module.DocumentConflict):
+            store.put({'document_id': 'abc', 'version': 2, 'summary': 'stale'}, expected_version=1)
+        with pytest.raises(document_store_module.DocumentConflict):
+            store.put({'document_id': 'abc', 'version': 1, 'summary': 'duplicate'})
+        assert store.get('abc')['summary'] == 'new'
+        assert store.get('missing') is None
+
+    def test_dynamodb_conditional_put(self):
+        """Test that the DynamoDB store maps failed conditions to DocumentConflict."""
+        client = MagicMock()
+        backend = document_store_module.DynamoDBDocumentStore('documents', client=client)
+
+        backend.put({'document_id': 'abc', 'version': 3}, expected_version=2)
+        kwargs = client.put_item.call_args.kwargs
+        assert kwargs['ConditionExpression'] == '#version = :expected'
+        assert kwargs['ExpressionAttributeValues'] == {':expected': {'N': '2'}}
+        assert kwargs['Item']['version'] == {'N': '3'}
+
+        backend.put({'document_id': 'abc', 'version': 4, 'summary': 'Résumé'}, expected_version=3)
+        assert 'Résumé' in client.put_item.call_args.kwargs['Item']['data']['S']
+
+        error = Exception('condition failed')
+        error.response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+        client.put_item.side_effect = error
+        with pytest.raises(document_store_module.DocumentConflict):
+            backend.put({'document_id': 'abc', 'version': 1})
+
+
+class TestRollingSummaries:
+    """Test suite for incremental document summaries."""
+
+    def test_split_ready_keeps_incomplete_tail(self):
+        """Test that only text up to the last sentence boundary is summarized."""
+        assert documents_module.split_ready('Short text.', 100) == ('', 'Short text.')
+
+        ready, pending = documents_module.split_ready('First sentence. Second sentence. Partial', 10)
+        assert ready == 'First sentence. Second sentence. '
+        assert pending == 'Partial'
+
+    def test_small_appends_are_buffered(self, store, bedrock):
+        """Test that appends below the chunk size don't call Bedrock."""
+        document = documents_module.create_document()
+        document = documents_module.append_to_document(document['document_id'], 'Hello everyone. ')
+
+        assert bedrock == []
+        assert document['length'] == len('Hello everyone. ')
+        assert document['summarized_length'] == 0
+
+    def test_append_cost_does_not_grow_with_document(self, store, bedrock):
+        """Test that each append summarizes only new content plus the rolling summary."""
+        document_id = documents_module.create_document()['document_id']
+        call_sizes = []
+        for update in range(10):
+            calls_before = len(bedrock)
+            documents_module.append_to_document(document_id, sentences(20, update * 20))
+            call_sizes.append(sum(len(text) for text in bedrock[calls_before:]))
+
+        document = store.get(document_id)
+        assert document['chunk_count'] >= 10
+        assert document['summarized_length'] + len(document['pending']) == document['length']
+        # Input sent per update stays flat while the document grows tenfold
+        assert max(call_sizes[1:]) <= 2 * min(call_sizes[1:])
+
+    def test_rolling_summary_merges_previous_summary(self, store, bedrock):
+        """Test that later chunks are merged with the previous rolling summary."""
+        document = documents_module.create_document(sentences(20))
+        assert document['summary'] == 'Summary 1.'
+
+        document = documents_module.append_to_document(document['document_id'], sentences(20, 20))
+
+        assert bedrock[-1].startswith('Summary so far:\nSummary 1.')
+        assert document['summary'] == f'Summary {len(bedrock)}.'
+        assert document['version'] == 2
+
+    def test_old_chunk_summaries_are_dropped_to_fit_item_limit(self, store, bedrock):
+        """Test that a document stays within the store's item limit as chunks accumulate."""
+        def long_summary(text, prompt_template=None, tier=None, keep_ratio=None):
+            bedrock.append(text)
+            return {'summary': f'Résumé {len(bedrock)}: ' + 'Überblick über die Sitzung. ' * 20, 'model_id': 'test-model'}
+
+        with patch.object(store, 'max_item_bytes', 4000), \
+                patch.object(documents_module, 'summarize_text', side_effect=long_summary), \
+                patch.object(chunking_module, 'summarize_text', side_effect=long_summary):
+            document_id = documents_module.create_document()['document_id']
+            for update in range(10):
+                documents_module.append_to_document(document_id, sentences(20, update * 20))
+
+        document = store.get(document_id)
+        assert len(document_store_module.serialize(document).encode('utf-8')) <= 4000
+        assert 0 < len(document['chunks']) < document['chunk_count']
+        # The most recent chunks are the ones kept
+        assert document['chunks'][-1]['index'] == document['chunk_count'] - 1
+
+    def test_offset_mismatch(self, store, bedrock):
+        """Test that a retried append with a stale offset is rejected."""
+        document = documents_module.create_document('Hello. ')
+
+        with pytest.raises(documents_module.OffsetMismatch) as error:
+            documents_module.append_to_document(document['document_id'], 'Again. ', offset=0)
+        assert error.value.length == len('Hello. ')
+
+
+class TestDocumentsApi:
+    """Test suite for the /documents endpoints."""
+
+    def test_create_append_and_read_summary(self, store, bedrock):
+        """Test the full create, append and read flow through the handler."""
+        response = handler(document_event('POST', '/documents', {'text': sentences(20)}), None)
+        assert response['statusCode'] == 201
+        document_id = json.loads(response['body'])['data']['document_id']
+        assert response['headers']['Location'] == f'/documents/{document_id}'
+
+        response = handler(document_event('POST', f'/documents/{document_id}/append', {'text': 'And one more thing', 'offset': len(sentences(20))}), None)
+        assert response['statusCode'] == 200
+        data = json.loads(response['body'])['data']
+        assert data['pending_length'] > 0
+        assert 'pending' not in data
+
+        calls_before = len(bedrock)
+        response = handler(document_event('GET', f'/documents/{document_id}/summary', query={'include_pending': 'false'}), None)
+        assert len(bedrock) == calls_before
+        assert json.loads(response['body'])['data']['summary'] == 'Summary 1.'
+
+        data = json.loads(handler(document_event('GET', f'/documents/{document_id}/summary'), None)['body'])['data']
+        assert data['summarized_length'] == data['length']
+        assert 'And one more thing' in bedrock[-1]
+
+    def test_append_with_stale_offset_returns_409(self, store, bedrock):
+        """Test that an offset that doesn't match the document length returns 409."""
+        document_id = documents_module.create_document('Hello. ')['document_id']
+
+        response = handler(document_event('POST', f'/documents/{document_id}/append', {'text': 'Hi.', 'offset': 0}), None)
+
+        assert response['statusCode'] == 409
+        assert json.loads(response['body'])['length'] == len('Hello. ')
+
+    def test_unknown_document_returns_404(self, store):
+        """Test that an unknown document id returns 404."""
+        response = handler(document_event('POST', '/documents/missing/append', {'text': 'Hi.'}), None)
+
+        assert response['statusCode'] == 404
+        assert json.loads(response['body'])['error'] == 'Document not found'
+
+    def test_append_requires_text(self, store):
+        """Test that appends need non-empty text."""
+        document_id = documents_module.create_document()['document_id']
+
+        response = handler(document_event('POST', f'/documents/{document_id}/append', {}), None)
+
+        assert response['statusCode'] == 400
+        assert json.loads(response['body'])['error'] == 'Missing required field: text'
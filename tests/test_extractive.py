@@ -0,0 +1,78 @@
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import extractive module
+spec = importlib.util.spec_from_file_location("extractive", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "extractive.py"))
+extractive = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(extractive)
+
+DOCUMENT = (
+    "The summarization service runs on AWS Lambda behind API Gateway. "
+    "Requests to the summarization service are answered by Bedrock models. "
+    "My cat enjoys sleeping in the sun. "
+    "Bedrock models return summaries that the Lambda service sends back through API Gateway. "
+    "Unsubscribe from this newsletter at any time.\n\n"
+    "Latency of the summarization service depends on Bedrock model latency."
+)
+
+
+class TestExtractive:
+    """Test suite for extractive sentence selection."""
+
+    def test_split_sentences(self):
+        """Test that sentences are split on punctuation and paragraph breaks."""
+        assert extractive.split_sentences("One. Two!\n\nThree?  Four") == ['One.', 'Two!', 'Three?', 'Four']
+
+    def test_select_keeps_central_sentences_in_order(self):
+        """Test that off-topic sentences are dropped and order is preserved."""
+        selected = extractive.select_sentences(DOCUMENT, 0.5)
+
+        assert len(selected) == 3
+        assert not any('cat' in sentence or 'newsletter' in sentence for sentence in selected)
+        sentences = extractive.split_sentences(DOCUMENT)
+        assert [sentences.index(sentence) for sentence in selected] == sorted(sentences.index(sentence) for sentence in selected)
+
+    def test_python_and_numpy_scores_agree(self):
+        """Test that both TextRank implementations produce the same scores."""
+        np = pytest.importorskip('numpy')
+        rows = extractive._feature_rows(extractive.split_sentences(DOCUMENT * 3))
+
+        numpy_scores = extractive._scores_numpy(np, rows)
+        python_scores = extractive._scores_python(rows)
+
+        assert max(abs(a - b) for a, b in zip(numpy_scores, python_scores)) < 1e-9
+
+    def test_large_documents_without_numpy(self):
+        """Test that scoring falls back to pure Python when NumPy is missing."""
+        sentences = extractive.split_sentences(DOCUMENT * 20)
+        with patch.dict(sys.modules, {'numpy': None}):
+            scores = extractive.score_sentences(sentences)
+
+        assert len(scores) == len(sentences)
+
+    def test_compress_text_skips_short_text(self):
+        """Test that short texts are sent to the model unchanged."""
+        assert extractive.compress_text(DOCUMENT, 0.5) == DOCUMENT
+
+    @patch.dict(os.environ, {'EXTRACTIVE_MIN_CHARS': '100'})
+    def test_compress_text(self):
+        """Test that long texts keep only the top fraction of sentences."""
+        compressed = extractive.compress_text(DOCUMENT, 0.5)
+
+        assert len(compressed) < len(DOCUMENT)
+        assert 'cat' not in compressed
+
+    def test_extractive_summary(self):
+        """Test the shape of a pure-extractive summary."""
+        result = extractive.extractive_summary(DOCUMENT, keep_ratio=0.2)
+
+        assert result['extractive'] is True
+        assert result['original_length'] == len(DOCUMENT)
+        assert result['summary_length'] == len(result['summary'])
+        assert len(extractive.split_sentences(result['summary'])) == 2
@@ -0,0 +1,224 @@
+import json
+import pytest
+import sys
+import os
+
+# Add the infrastructure directory to Python path so the stack can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "infrastructure"))
+
+import aws_cdk as cdk
+from aws_cdk.assertions import Match, Template
+
+from summarization_api.stack_settings import ScalingSchedule, StackSettings
+from summarization_api.summarization_api_stack import SummarizationApiStack
+
+# Skip asset bundling so templates synthesize without Docker or pip
+NO_BUNDLING = {"aws:cdk:bundling-stacks": []}
+
+
+def synth(settings=None, context=None):
+    app = cdk.App(context=dict(NO_BUNDLING, **(context or {})))
+    stack = SummarizationApiStack(app, "TestStack", settings=settings)
+    return Template.from_stack(stack)
+
+
+def function_properties(template, handler):
+    functions = template.find_resources("AWS::Lambda::Function", {"Properties": {"Handler": handler}})
+    assert len(functions) == 1
+    return next(iter(functions.values()))["Properties"]
+
+
+@pytest.fixture(scope="module")
+def default_template():
+    return synth()
+
+
+class TestStackSettings:
+    """Test suite for reading and validating stack settings."""
+
+    def test_from_context(self):
+        """Test that -c values, which arrive as strings, are parsed."""
+        app = cdk.App(context={
+            "architecture": "x86_64",
+            "memory_size": "1024",
+            "provisioned_concurrency": "2",
+            "provisioned_concurrency_max": "10",
+            "reserved_concurrency": "50",
+            "snap_start": "false",
+            "provisioned_concurrency_schedules": json.dumps([
+                {"name": "BusinessHours", "expression": "cron(0 8 ? * MON-FRI *)", "min_capacity": 5}
+            ])
+        })
+
+        settings = StackSettings.from_context(app.node)
+
+        assert settings.architecture == "x86_64"
+        assert settings.memory_size == 1024
+        assert settings.provisioned_concurrency == 2
+        assert settings.provisioned_concurrency_max == 10
+        assert settings.reserved_concurrency == 50
+        assert settings.snap_start is False
+        assert settings.provisioned_concurrency_schedules == (
+            ScalingSchedule("BusinessHours", "cron(0 8 ? * MON-FRI *)", min_capacity=5),
+        )
+        assert settings.runtime == StackSettings().runtime
+
+    @pytest.mark.parametrize("settings", [
+        StackSettings(architecture="sparc"),
+        StackSettings(runtime="nodejs20.x"),
+        StackSettings(memory_size=64),
+        StackSettings(provisioned_concurrency=5, provisioned_concurrency_max=2),
+        StackSettings(provisioned_concurrency=5, reserved_concurrency=4),
+        StackSettings(provisioned_concurrency_schedules=(ScalingSchedule("Peak", "rate(1 day)", 1, 2),)),
+        StackSettings(snap_start=True, provisioned_concurrency=1),
+        StackSettings(snap_start=True, runtime="python3.11"),
+        StackSettings(ingest_batch_size=100),
+        StackSettings(ingest_max_concurrency=1),
+    ])
+    def test_rejects_invalid_settings(self, settings):
+        with pytest.raises(ValueError):
+            settings.validate()
+
+
+class TestSummarizationApiStack:
+    """Test suite for the synthesized CloudFormation template."""
+
+    def test_defaults_to_graviton_and_current_runtime(self, default_template):
+        for handler in ("summarization.handler", "job_worker.handler", "run.sh"):
+            properties = function_properties(default_template, handler)
+            assert properties["Architectures"] == ["arm64"]
+            assert properties["Runtime"] == "python3.13"
+            assert properties["MemorySize"] == 512
+
+        layers = function_properties(default_template, "run.sh")["Layers"]
+        assert "LambdaAdapterLayerArm64" in json.dumps(layers)
+
+    def test_api_invokes_the_live_alias(self, default_template):
+        """Test that integrations target the alias, where provisioned concurrency lives."""
+        default_template.has_resource_properties("AWS::Lambda::Alias", {"Name": "live"})
+        properties = function_properties(default_template, "summarization.handler")
+        assert "ReservedConcurrentExecutions" not in properties
+
+        integrations = default_template.find_resources("AWS::ApiGatewayV2::Integration")
+        assert integrations
+        for integration in integrations.values():
+            assert "SummarizationLiveAlias" in json.dumps(integration["Properties"]["IntegrationUri"])
+
+    def test_multi_document_route(self, default_template):
+        default_template.has_resource_properties("AWS::ApiGatewayV2::Route", {"RouteKey": "POST /summarize/multi"})
+
+    def test_no_provisioned_concurrency_by_default(self, default_template):
+        alias = next(iter(default_template.find_resources("AWS::Lambda::Alias").values()))
+        assert "ProvisionedConcurrencyConfig" not in alias["Properties"]
+        default_template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+
+    def test_snap_start_off_by_default(self, default_template):
+        """Test that SnapStart, a billed feature, is opt-in."""
+        assert "SnapStart" not in function_properties(default_template, "summarization.handler")
+
+    def test_snap_start_opt_in(self):
+        """Test that SnapStart applies to the published versions the live alias points at."""
+        template = synth(StackSettings(snap_start=True))
+
+        properties = function_properties(template, "summarization.handler")
+        assert properties["SnapStart"] == {"ApplyOn": "PublishedVersions"}
+        assert "SnapStart" not in function_properties(template, "job_worker.handler")
+
+    def test_x86_and_memory_size(self):
+        template = synth(StackSettings(architecture="x86_64", runtime="python3.12", memory_size=2048, worker_memory_size=1024))
+
+        properties = function_properties(template, "summarization.handler")
+        assert properties["Architectures"] == ["x86_64"]
+        assert properties["Runtime"] == "python3.12"
+        assert properties["MemorySize"] == 2048
+        assert function_properties(template, "job_worker.handler")["MemorySize"] == 1024
+        assert "LambdaAdapterLayerX86" in json.dumps(function_properties(template, "run.sh")["Layers"])
+
+    def test_provisioned_concurrency_with_auto_scaling(self):
+        """Test that provisioned concurrency is set on the alias and scales on utilization and schedule."""
+        template = synth(StackSettings(
+            reserved_concurrency=100,
+            provisioned_concurrency=2,
+            provisioned_concurrency_max=20,
+            provisioned_concurrency_utilization=0.6,
+            provisioned_concurrency_schedules=(
+                ScalingSchedule("BusinessHours", "cron(0 8 ? * MON-FRI *)", min_capacity=10, max_capacity=40),
+                ScalingSchedule("Overnight", "cron(0 20 ? * * *)", min_capacity=2, max_capacity=20),
+            )
+        ))
+
+        assert function_properties(template, "summarization.handler")["ReservedConcurrentExecutions"] == 100
+        template.has_resource_properties("AWS::Lambda::Alias", {
+            "Name": "live",
+            "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2}
+        })
+        template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+            "MinCapacity": 2,
+            "MaxCapacity": 40,
+            "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+            "ScheduledActions": Match.array_with([
+                Match.object_like({
+                    "ScheduledActionName": "BusinessHours",
+                    "Schedule": "cron(0 8 ? * MON-FRI *)",
+                    "ScalableTargetAction": {"MinCapacity": 10, "MaxCapacity": 40}
+                })
+            ])
+        })
+        template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+            "PolicyType": "TargetTrackingScaling",
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like({
+                "TargetValue": 0.6,
+                "PredefinedMetricSpecification": {"PredefinedMetricType": "LambdaProvisionedConcurrencyUtilization"}
+            })
+        })
+
+    def test_fixed_provisioned_concurrency_has_no_scaling(self):
+        template = synth(StackSettings(provisioned_concurrency=3))
+
+        template.has_resource_properties("AWS::Lambda::Alias", {
+            "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 3}
+        })
+        template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+
+    def test_settings_from_context(self):
+        template = synth(context={"architecture": "x86_64", "provisioned_concurrency": "1"})
+
+        assert function_properties(template, "summarization.handler")["Architectures"] == ["x86_64"]
+        template.has_resource_properties("AWS::Lambda::Alias", {
+            "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 1}
+        })
+
+    def test_ingestion_queue_and_worker(self, default_template):
+        """Test that the worker consumes the queue with partial batch failure reporting and a DLQ."""
+        default_template.has_resource_properties("AWS::Lambda::EventSourceMapping", {
+            "BatchSize": 10,
+            "FunctionResponseTypes": ["ReportBatchItemFailures"]
+        })
+        default_template.has_resource_properties("AWS::SQS::Queue", {
+            "VisibilityTimeout": 1800,
+            "RedrivePolicy": Match.object_like({"maxReceiveCount": 3})
+        })
+        environment = function_properties(default_template, "ingest_worker.handler")["Environment"]["Variables"]
+        assert environment["INGEST_MAX_WORKERS"] == "8"
+        assert "JOBS_TABLE_NAME" in environment
+
+    def test_ingestion_throughput_settings(self):
+        template = synth(context={
+            "ingest_batch_size": "50",
+            "ingest_batching_window_seconds": "5",
+            "ingest_max_concurrency": "20",
+            "ingest_max_workers": "16",
+            "ingest_max_receive_count": "5"
+        })
+
+        template.has_resource_properties("AWS::Lambda::EventSourceMapping", {
+            "BatchSize": 50,
+            "MaximumBatchingWindowInSeconds": 5,
+            "ScalingConfig": {"MaximumConcurrency": 20}
+        })
+        template.has_resource_properties("AWS::SQS::Queue", {
+            "RedrivePolicy": Match.object_like({"maxReceiveCount": 5})
+        })
+        environment = function_properties(template, "ingest_worker.handler")["Environment"]["Variables"]
+        assert environment["INGEST_MAX_WORKERS"] == "16"
+        assert environment["INGEST_MAX_RECEIVE_COUNT"] == "5"
@@ -0,0 +1,241 @@
+import json
+import pytest
+import sys
+import os
+import threading
+import importlib.util
+from unittest.mock import patch
+from botocore.exceptions import ClientError
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import the emulator and producer tools
+spec = importlib.util.spec_from_file_location("sqs_emulator", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "sqs_emulator.py"))
+sqs_emulator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(sqs_emulator)
+
+spec = importlib.util.spec_from_file_location("enqueue_documents", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "enqueue_documents.py"))
+enqueue_tool = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(enqueue_tool)
+
+import chunking
+import ingestion
+import ingest_worker
+import job_store
+from job_store import FAILED, SUCCEEDED
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+QUEUE = 'ingest'
+
+
+def throttled():
+    return ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Slow down'}}, 'Converse')
+
+
+def summary(text, tier='balanced'):
+    return {'summary': f'Summary of {text[:20]}', 'original_length': len(text), 'summary_length': 10}
+
+
+@pytest.fixture
+def queue():
+    """Run the SQS emulator with a queue and dead-letter queue, and point fresh clients at them."""
+    server, endpoint_url = sqs_emulator.start_emulator()
+    sqs_emulator.create_queue_with_dlq(server.state, QUEUE, max_receive_count=3)
+    environment = {
+        'SQS_ENDPOINT_URL': endpoint_url,
+        'INGEST_QUEUE_URL': f'{endpoint_url}/{sqs_emulator.ACCOUNT_ID}/{QUEUE}',
+        'INGEST_MAX_RECEIVE_COUNT': '3',
+        'AWS_ACCESS_KEY_ID': 'test',
+        'AWS_SECRET_ACCESS_KEY': 'test',
+        'AWS_REGION': 'us-east-1'
+    }
+    with patch.dict(os.environ, environment), \
+            patch.object(ingestion, 'sqs_client', None), \
+            patch.object(job_store, 'job_store', None):
+        yield server.state
+    server.shutdown()
+    server.server_close()
+
+
+def sentences(count):
+    return ' '.join(f'Report line {index} describes a routine finding in some detail.' for index in range(count))
+
+
+def drain(state, batch_size=10):
+    return sqs_emulator.drain(state, QUEUE, ingest_worker.handler, batch_size)
+
+
+def get_job(item_id):
+    job_id = ingestion.ingest_job_id(item_id)
+    response = handler({'requestContext': {'http': {'method': 'GET', 'path': f'/jobs/{job_id}'}},
+                        'pathParameters': {'id': job_id}}, None)
+    return json.loads(response['body'])['data']
+
+
+class TestEnqueueDocuments:
+    """Test suite for the producer side of the ingestion queue."""
+
+    def test_enqueues_in_batches(self, queue):
+        documents = [{'item_id': f'doc-{index}', 'text': f'Document number {index}.'} for index in range(25)]
+
+        result = ingestion.enqueue_documents(documents)
+
+        assert result == {'sent': [f'doc-{index}' for index in range(25)], 'failed': []}
+        bodies = [json.loads(body) for body in queue.bodies(QUEUE)]
+        assert sorted(body['item_id'] for body in bodies) == sorted(result['sent'])
+        # 25 messages need three SendMessageBatch calls
+        assert queue.stats['requests'] == 3
+
+    def test_oversized_documents_are_reported(self, queue):
+        result = ingestion.enqueue_documents([
+            {'item_id': 'big', 'text': 'x' * (ingestion.MAX_MESSAGE_BYTES + 1)},
+            {'text': 'Small document.', 'tier': 'fast'}
+        ])
+
+        assert [failure['item_id'] for failure in result['failed']] == ['big']
+        assert len(result['sent']) == 1
+        assert json.loads(queue.bodies(QUEUE)[0])['tier'] == 'fast'
+
+    def test_rejects_documents_without_text_or_source(self, queue):
+        with pytest.raises(ValueError):
+            ingestion.enqueue_documents([{'item_id': 'empty'}])
+
+    def test_cli_reads_json_lines(self, queue, tmp_path, capsys):
+        path = tmp_path / 'backfill.jsonl'
+        path.write_text('\n'.join(json.dumps({'item_id': f'doc-{index}', 'text': 'Some text.'}) for index in range(3)))
+
+        assert enqueue_tool.main([str(path), '--tier', 'fast']) == 0
+
+        assert json.loads(capsys.readouterr().out) == {'sent': 3, 'failed': []}
+        assert all(json.loads(body)['tier'] == 'fast' for body in queue.bodies(QUEUE))
+
+
+class TestIngestWorker:
+    """Test suite for the SQS worker and its partial batch failure reporting."""
+
+    def test_summarizes_batch_and_stores_results(self, queue):
+        ingestion.enqueue_documents([{'item_id': f'doc-{index}', 'text': f'Document {index}.'} for index in range(5)])
+
+        with patch.object(ingestion, 'map_reduce_summarize', side_effect=summary) as mock_summarize:
+            assert drain(queue) == 1
+
+        assert mock_summarize.call_count == 5
+        assert queue.bodies(QUEUE) == []
+        job = get_job('doc-3')
+        assert job['status'] == SUCCEEDED
+        assert job['result']['summary'] == 'Summary of Document 3.'
+        assert job['input_length'] == len('Document 3.')
+
+    def test_items_run_concurrently(self, queue):
+        """Test that one slow item doesn't serialize the batch."""
+        ingestion.enqueue_documents([{'text': f'Document {index}.'} for index in range(4)])
+        barrier = threading.Barrier(4, timeout=5)
+
+        def wait_for_all(text, tier='balanced'):
+            barrier.wait()
+            return summary(text)
+
+        with patch.dict(os.environ, {'INGEST_MAX_WORKERS': '4'}), \
+                patch.object(ingestion, 'ingest_executor', None), \
+                patch.object(ingestion, 'map_reduce_summarize', side_effect=wait_for_all):
+            drain(queue)
+
+        assert queue.bodies(QUEUE) == []
+
+    def test_only_failed_items_are_retried(self, queue):
+        ingestion.enqueue_documents([{'item_id': name, 'text': f'Text of {name}.'} for name in ('a', 'b', 'c')])
+        calls, responses = [], []
+
+        def flaky(text, tier='balanced'):
+            calls.append(text)
+            if text == 'Text of b.' and calls.count(text) == 1:
+                raise throttled()
+            return summary(text)
+
+        def record_response(event, context):
+            responses.append(ingest_worker.handler(event, context))
+            return responses[-1]
+
+        with patch.object(ingestion, 'map_reduce_summarize', side_effect=flaky):
+            sqs_emulator.drain(queue, QUEUE, record_response)
+
+        assert len(responses[0]['batchItemFailures']) == 1
+        assert responses[1] == {'batchItemFailures': []}
+        # a and c were not summarized again
+        assert sorted(calls) == ['Text of a.', 'Text of b.', 'Text of b.', 'Text of c.']
+        assert {get_job(name)['status'] for name in 'abc'} == {SUCCEEDED}
+        assert get_job('b')['attempts'] == 1
+
+    def test_duplicate_deliveries_are_skipped(self, queue):
+        ingestion.enqueue_documents([{'item_id': 'twice', 'text': 'Delivered twice.'}] * 2)
+
+        with patch.object(ingestion, 'map_reduce_summarize', side_effect=summary) as mock_summarize:
+            drain(queue, batch_size=1)
+
+        mock_summarize.assert_called_once()
+
+    def test_persistent_failures_reach_the_dead_letter_queue(self, queue):
+        ingestion.enqueue_documents([{'item_id': 'stuck', 'text': 'Never works.'}, {'item_id': 'fine', 'text': 'Works.'}])
+
+        def fail_stuck(text, tier='balanced'):
+            if text == 'Never works.':
+                raise throttled()
+            return summary(text)
+
+        with patch.object(ingestion, 'map_reduce_summarize', side_effect=fail_stuck) as mock_summarize:
+            drain(queue)
+
+        assert mock_summarize.call_count == 4
+        assert queue.bodies(QUEUE) == []
+        assert [json.loads(body)['item_id'] for body in queue.bodies(f'{QUEUE}-dlq')] == ['stuck']
+        job = get_job('stuck')
+        assert job['status'] == FAILED
+        assert job['attempts'] == 3
+
+    def test_permanent_failures_are_not_retried(self, queue):
+        """Test that invalid input and malformed messages are acknowledged instead of redelivered."""
+        ingestion.enqueue_documents([{'item_id': 'bad', 'text': 'Too long for every model.'}])
+        queue.send(QUEUE, 'not json')
+
+        with patch.object(ingestion, 'map_reduce_summarize', side_effect=ValueError('No model accepts it')) as mock_summarize:
+            drain(queue)
+
+        mock_summarize.assert_called_once()
+        assert queue.bodies(QUEUE) == []
+        assert queue.bodies(f'{QUEUE}-dlq') == []
+        assert get_job('bad')['status'] == FAILED
+
+    def test_long_documents_are_chunked(self, queue):
+        """Test that text longer than one model call is summarized in chunks rather than failing."""
+        ingestion.enqueue_documents([{'item_id': 'long', 'text': sentences(600)}])
+
+        def summarize_chunk(text, prompt_template=None, tier='balanced', keep_ratio=None):
+            return {'summary': 'Chunk summary.', 'model_id': 'test-model'}
+
+        with patch.dict(os.environ, {'CHUNK_CONTEXT_FRACTION': '0.03'}), \
+                patch.object(chunking, 'summarize_text', side_effect=summarize_chunk) as mock_summarize:
+            drain(queue)
+
+        job = get_job('long')
+        assert job['status'] == SUCCEEDED
+        assert job['result']['chunk_count'] > 1
+        assert mock_summarize.call_count > job['result']['chunk_count']
+
+    def test_item_ids_cannot_overwrite_api_jobs(self, queue):
+        """Test that items are stored under their own namespace in the shared jobs table."""
+        job_store.get_job_store().create({'job_id': 'shared', 'status': SUCCEEDED, 'mode': 'default',
+                                          'result': {'summary': 'API job.'}, 'created_at': 0, 'updated_at': 0})
+        ingestion.enqueue_documents([{'item_id': 'shared', 'text': 'Ingested text.'}])
+
+        with patch.object(ingestion, 'map_reduce_summarize', side_effect=summary):
+            drain(queue)
+
+        assert job_store.get_job_store().get('shared')['result'] == {'summary': 'API job.'}
+        assert get_job('shared')['result']['summary'] == 'Summary of Ingested text.'
+
@@ -0,0 +1,244 @@
+import json
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch, MagicMock
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import job_store as job_store_module
+import jobs as jobs_module
+import s3_input
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+spec = importlib.util.spec_from_file_location("s3_emulator", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "s3_emulator.py"))
+s3_emulator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(s3_emulator)
+
+spec = importlib.util.spec_from_file_location("job_worker", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "job_worker.py"))
+job_worker_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(job_worker_module)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """Install a local job store backend for the duration of a test."""
+    if request.param == 'sqlite':
+        backend = job_store_module.SQLiteJobStore(str(tmp_path / 'jobs.db'))
+    else:
+        backend = job_store_module.InMemoryJobStore()
+    with patch.object(job_store_module, 'job_store', backend):
+        yield backend
+
+
+def submit_event(payload):
+    """Build a POST /jobs API Gateway event."""
+    return {
+        'requestContext': {'http': {'method': 'POST', 'path': '/jobs'}},
+        'body': json.dumps(payload)
+    }
+
+
+def status_event(job_id):
+    """Build a GET /jobs/{id} API Gateway event."""
+    return {
+        'requestContext': {'http': {'method': 'GET', 'path': f'/jobs/{job_id}'}},
+        'pathParameters': {'id': job_id}
+    }
+
+
+class TestJobStores:
+    """Test suite for the job store backends."""
+
+    def test_create_get_update(self, store):
+        """Test the basic job lifecycle in each backend."""
+        store.create({'job_id': 'abc', 'status': 'pending', 'input': 'text', 'created_at': 1.0, 'updated_at': 1.0})
+        store.update('abc', status='succeeded', result={'summary': 'done'})
+
+        job = store.get('abc')
+        assert job['status'] == 'succeeded'
+        assert job['result'] == {'summary': 'done'}
+        assert job['updated_at'] > 1.0
+
+    def test_missing_job(self, store):
+        """Test that unknown job ids return None."""
+        assert store.get('missing') is None
+
+    def test_dynamodb_store_round_trip(self):
+        """Test that the DynamoDB store serializes results and reads them back."""
+        client = MagicMock()
+        backend = job_store_module.DynamoDBJobStore('jobs', client=client)
+
+        backend.create({'job_id': 'abc', 'status': 'pending', 'created_at': 1.5})
+        item = client.put_item.call_args.kwargs['Item']
+        assert item['job_id'] == {'S': 'abc'}
+        assert item['created_at'] == {'N': '1.5'}
+        assert 'expires_at' in item
+
+        backend.update('abc', status='succeeded', result={'summary': 'done'})
+        kwargs = client.update_item.call_args.kwargs
+        assert kwargs['Key'] == {'job_id': {'S': 'abc'}}
+        assert {'S': json.dumps({'summary': 'done'})} in kwargs['ExpressionAttributeValues'].values()
+
+        client.get_item.return_value = {'Item': {
+            'job_id': {'S': 'abc'},
+            'status': {'S': 'succeeded'},
+            'result': {'S': '{"summary": "done"}'},
+            'created_at': {'N': '1.5'},
+            'expires_at': {'N': '99'}
+        }}
+        assert backend.get('abc') == {'job_id': 'abc', 'status': 'succeeded', 'result': {'summary': 'done'}, 'created_at': 1.5}
+
+
+class TestJobsApi:
+    """Test suite for the asynchronous job endpoints."""
+
+    def test_submit_returns_job_id_and_dispatches(self, store):
+        """Test that POST /jobs returns 202 with a job id and starts the worker."""
+        with patch.object(jobs_module, 'dispatch_job') as mock_dispatch:
+            response = handler(submit_event({'text': 'x' * 5000}), None)
+
+        assert response['statusCode'] == 202
+        body = json.loads(response['body'])
+        job_id = body['data']['job_id']
+        assert body['data']['status'] == 'pending'
+        assert response['headers']['Location'] == f'/jobs/{job_id}'
+        mock_dispatch.assert_called_once_with(job_id)
+        assert store.get(job_id)['input'] == 'x' * 5000
+
+    def test_submit_missing_text(self, store):
+        """Test that POST /jobs requires text."""
+        response = handler(submit_event({}), None)
+
+        assert response['statusCode'] == 400
+        assert json.loads(response['body'])['error'] == 'Missing required field: text'
+
+    def test_submit_dispatch_failure_marks_job_failed(self, store):
+        """Test that a failed dispatch returns 500 and fails the job."""
+        with patch.object(jobs_module, 'dispatch_job', side_effect=Exception('Lambda unavailable')):
+            response = handler(submit_event({'text': 'Some text'}), None)
+
+        assert response['statusCode'] == 500
+        assert json.loads(response['body'])['error'] == 'Failed to submit job'
+
+    def test_dispatch_invokes_worker_asynchronously(self):
+        """Test that dispatch_job uses an Event invocation of the worker."""
+        client = MagicMock()
+        with patch.object(jobs_module, 'lambda_client', client), \
+                patch.dict(os.environ, {'JOB_WORKER_FUNCTION_NAME': 'worker'}):
+            jobs_module.dispatch_job('abc')
+
+        client.invoke.assert_called_once_with(
+            FunctionName='worker',
+            InvocationType='Event',
+            Payload=b'{"job_id": "abc"}'
+        )
+
+    def test_worker_completes_job_and_status_reports_result(self, store):
+        """Test the full submit, work and poll flow."""
+        with patch.object(jobs_module, 'dispatch_job'):
+            job_id = json.loads(handler(submit_event({'text': 'Some text', 'mode': 'default'}), None)['body'])['data']['job_id']
+
+        response = handler(status_event(job_id), None)
+        assert json.loads(response['body'])['data']['status'] == 'pending'
+
+        with patch.object(jobs_module, 'summarize_text', return_value={'summary': 'Done.'}) as mock_summarize:
+            assert job_worker_module.handler({'job_id': job_id}, None) == {'job_id': job_id, 'status': 'succeeded'}
+        mock_summarize.assert_called_once_with('Some text')
+
+        response = handler(status_event(job_id), None)
+        assert response['statusCode'] == 200
+        data = json.loads(response['body'])['data']
+        assert data['status'] == 'succeeded'
+        assert data['result'] == {'summary': 'Done.'}
+        assert data['input_length'] == len('Some text')
+        assert 'input' not in data
+
+    def test_worker_records_failure(self, store):
+        """Test that a Bedrock failure is recorded on the job."""
+        with patch.object(jobs_module, 'dispatch_job'):
+            job_id = json.loads(handler(submit_event({'text': 'Some text'}), None)['body'])['data']['job_id']
+
+        with patch.object(jobs_module, 'map_reduce_summarize', side_effect=Exception('Bedrock service unavailable')):
+            job_worker_module.handler({'job_id': job_id}, None)
+
+        data = json.loads(handler(status_event(job_id), None)['body'])['data']
+        assert data['status'] == 'failed'
+        assert data['error'] == 'Bedrock service unavailable'
+
+    def test_worker_skips_finished_jobs(self, store):
+        """Test that a redelivered invocation does not rerun a finished job."""
+        store.create({'job_id': 'done', 'status': 'succeeded', 'mode': 'default', 'input': 'x', 'created_at': 1.0, 'updated_at': 1.0})
+
+        with patch.object(jobs_module, 'summarize_text') as mock_summarize:
+            job_worker_module.handler({'job_id': 'done'}, None)
+
+        mock_summarize.assert_not_called()
+
+    def test_status_polling_does_not_call_bedrock(self, store):
+        """Test that polling only reads the job store."""
+        store.create({'job_id': 'abc', 'status': 'running', 'mode': 'default', 'input': 'x', 'created_at': 1.0, 'updated_at': 1.0})
+
+        with patch.object(jobs_module, 'summarize_text') as mock_summarize, \
+                patch.object(jobs_module, 'map_reduce_summarize') as mock_map_reduce:
+            response = handler(status_event('abc'), None)
+
+        assert json.loads(response['body'])['data']['status'] == 'running'
+        mock_summarize.assert_not_called()
+        mock_map_reduce.assert_not_called()
+
+    def test_unknown_job_returns_404(self, store):
+        """Test that an unknown job id returns 404."""
+        response = handler(status_event('missing'), None)
+
+        assert response['statusCode'] == 404
+        assert json.loads(response['body'])['error'] == 'Job not found'
+
+    def test_large_input_is_offloaded_to_the_input_bucket(self, store):
+        """Test that inputs over the store's item limit go to S3 and the worker reads them back."""
+        server, endpoint_url = s3_emulator.start_emulator()
+        environment = {
+            'S3_ENDPOINT_URL': endpoint_url,
+            'INPUT_BUCKET_NAME': 'inputs',
+            'AWS_ACCESS_KEY_ID': 'test',
+            'AWS_SECRET_ACCESS_KEY': 'test',
+            'AWS_REGION': 'us-east-1'
+        }
+        text = 'Long document. ' * 10000
+        try:
+            with patch.dict(os.environ, environment), \
+                    patch.object(s3_input, 's3_client', None), \
+                    patch.object(store, 'max_item_bytes', 100 * 1024, create=True), \
+                    patch.object(jobs_module, 'dispatch_job'):
+                job_id = json.loads(handler(submit_event({'text': text}), None)['body'])['data']['job_id']
+                job = store.get(job_id)
+                assert 'input' not in job
+                assert job['input_source'] == f's3://inputs/jobs/{job_id}'
+
+                with patch.object(jobs_module, 'map_reduce_summarize', return_value={'summary': 'Done.'}) as mock_summarize:
+                    job_worker_module.handler({'job_id': job_id}, None)
+                mock_summarize.assert_called_once_with(text)
+
+                data = json.loads(handler(status_event(job_id), None)['body'])['data']
+                assert data['status'] == 'succeeded'
+                assert data['input_length'] == len(text)
+                assert 'input_source' not in data
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_large_input_without_bucket_is_rejected(self, store):
+        with patch.dict(os.environ, {'INPUT_BUCKET_NAME': ''}), \
+                patch.object(store, 'max_item_bytes', 100 * 1024, create=True), \
+                patch.object(jobs_module, 'dispatch_job') as mock_dispatch:
+            response = handler(submit_event({'text': 'x' * 200000}), None)
+
+        assert response['statusCode'] == 413
+        mock_dispatch.assert_not_called()
@@ -0,0 +1,119 @@
+import json
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import metrics
+import summarization
+import bedrock_service
+from router import Request
+
+
+class TestMetrics:
+    """Test suite for EMF request metrics."""
+
+    def setup_method(self):
+        """Route metrics to an in-memory sink and reset shared Bedrock state."""
+        self.sink = metrics.MemoryMetricsSink()
+        metrics.metrics_sink = self.sink
+        bedrock_service.bedrock_client = None
+        bedrock_service.get_summary_cache().clear()
+
+    def teardown_method(self):
+        metrics.metrics_sink = None
+
+    def test_recorder_builds_emf(self):
+        """Test that the recorder produces a valid EMF record."""
+        ticks = iter([1.0, 1.25])
+        recorder = metrics.MetricsRecorder('Test', clock=lambda: next(ticks))
+        recorder.set_dimension('Route', 'POST /summarize')
+        recorder.add('InputTokens', 10)
+        recorder.add('InputTokens', 5)
+        with recorder.phase('Bedrock'):
+            pass
+
+        record = recorder.to_emf(timestamp=1700000000)
+
+        directive = record['_aws']['CloudWatchMetrics'][0]
+        assert record['_aws']['Timestamp'] == 1700000000000
+        assert directive['Namespace'] == 'Test'
+        assert directive['Dimensions'] == [['Route']]
+        assert {'Name': 'BedrockMs', 'Unit': 'Milliseconds'} in directive['Metrics']
+        assert record['Route'] == 'POST /summarize'
+        assert record['InputTokens'] == 15
+        assert record['BedrockMs'] == 250.0
+
+    def test_record_outside_request_is_noop(self):
+        """Test that recording without an active request does nothing."""
+        metrics.record_metric('InputTokens', 1)
+        with metrics.record_phase('Parse'):
+            pass
+
+        assert self.sink.records == []
+
+    @patch.dict(os.environ, {'RATE_LIMIT_ENABLED': 'false'})
+    @patch('boto3.client')
+    def test_handler_emits_phases_usage_and_returns_metrics(self, mock_get_client):
+        """Test that a summarize request emits one EMF record and can return its metrics."""
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'Summary.'}]}},
+            'usage': {'inputTokens': 42, 'outputTokens': 7},
+            'metrics': {'latencyMs': 321}
+        }
+        event = {
+            'requestContext': {'http': {'method': 'POST', 'path': '/summarize'}},
+            'body': json.dumps({'text': 'Metrics test text.', 'include_metrics': True})
+        }
+
+        response = summarization.handler(event, None)
+
+        assert response['statusCode'] == 200
+        returned = json.loads(response['body'])['data']['metrics']
+        assert returned['counts']['InputTokens'] == 42
+        assert returned['counts']['CacheMisses'] == 1
+        assert returned['ModelId'] == 'us.anthropic.claude-3-haiku-20240307-v1:0'
+        assert {'Parse', 'Summarize', 'Bedrock', 'BedrockLatency'} <= set(returned['timings_ms'])
+
+        record = self.sink.records[-1]
+        assert record['Route'] == 'POST /summarize'
+        assert record['StatusCode'] == 200
+        assert record['OutputTokens'] == 7
+        assert record['BedrockLatencyMs'] == 321
+        assert record['BedrockCalls'] == 1
+        assert record['ColdStart'] in (0, 1)
+        assert {'ParseMs', 'SummarizeMs', 'SerializeMs', 'TotalMs'} <= set(record)
+
+    def test_handler_records_error_class(self):
+        """Test that failures record their error class."""
+        with patch.object(summarization, 'summarize_text', side_effect=ValueError('boom')):
+            summarization.handler({
+                'requestContext': {'http': {'method': 'POST', 'path': '/summarize'}},
+                'body': json.dumps({'text': 'Some text'})
+            }, None)
+
+        record = self.sink.records[-1]
+        assert record['Errors'] == 1
+        assert record['ErrorClass'] == 'ValueError'
+        assert record['StatusCode'] == 500
+
+    def test_job_routes_share_one_dimension(self):
+        """Test that job ids don't create a metric dimension per job."""
+        def route_name(method, path):
+            request = Request({'requestContext': {'http': {'method': method, 'path': path}}})
+            request.route, request.params, request.allowed_methods = summarization.router.match(method, path)
+            return request.route_name
+
+        assert route_name('GET', '/jobs/abc') == 'GET /jobs/{id}'
+        assert route_name('GET', '/nope') == 'unmatched'
+
+    @patch.dict(os.environ, {'METRICS_ENABLED': 'false'})
+    def test_metrics_can_be_disabled(self):
+        """Test that METRICS_ENABLED=false emits nothing."""
+        summarization.handler({'requestContext': {'http': {'method': 'GET', 'path': '/health'}}}, None)
+
+        assert self.sink.records == []
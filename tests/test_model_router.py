@@ -0,0 +1,148 @@
+import json
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import model router module
+spec = importlib.util.spec_from_file_location("model_router", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "model_router.py"))
+model_router_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(model_router_module)
+
+ModelRouter = model_router_module.ModelRouter
+
+TABLE = [
+    {'model_id': 'small', 'tiers': ['fast'], 'max_input_tokens': 1000},
+    {'model_id': 'medium', 'tiers': ['fast', 'balanced'], 'max_input_tokens': 100000},
+    {'model_id': 'large', 'tiers': ['balanced', 'quality'], 'max_input_tokens': 200000},
+]
+
+
+class TestModelRouter:
+    """Test suite for size- and SLO-aware model routing."""
+
+    def test_routes_by_tier_in_table_order(self):
+        """Test that the tier selects eligible models in preference order."""
+        router = ModelRouter(table=TABLE)
+
+        assert router.route(100, 'fast') == ['small', 'medium']
+        assert router.route(100, 'balanced') == ['medium', 'large']
+        assert router.route(100, 'quality') == ['large']
+
+    def test_routes_by_input_size(self):
+        """Test that models whose input limit is too small are skipped."""
+        router = ModelRouter(table=TABLE)
+
+        assert router.route(5000, 'fast') == ['medium']
+        assert router.route(150000, 'balanced') == ['large']
+
+    def test_default_tier_sends_short_inputs_to_fast_model(self):
+        """Test that the default table routes short balanced-tier inputs to the fastest model."""
+        router = ModelRouter()
+        small = model_router_module.DEFAULT_MODEL_TABLE[0]['model_id']
+
+        assert router.route(50) == [small, 'us.anthropic.claude-3-5-haiku-20241022-v1:0',
+                                    'us.anthropic.claude-3-5-sonnet-20241022-v2:0']
+        assert router.route(5000) == ['us.anthropic.claude-3-5-haiku-20241022-v1:0',
+                                      'us.anthropic.claude-3-5-sonnet-20241022-v2:0']
+
+    def test_models_below_their_size_band_are_fallbacks(self):
+        """Test that entries whose min_input_tokens an input doesn't reach only serve as fallbacks."""
+        table = [
+            {'model_id': 'large', 'tiers': ['balanced'], 'min_input_tokens': 2000},
+            {'model_id': 'medium', 'tiers': ['balanced'], 'max_input_tokens': 100000},
+        ]
+        router = ModelRouter(table=table)
+
+        assert router.route(100, 'balanced') == ['medium', 'large']
+        assert router.route(5000, 'balanced') == ['large', 'medium']
+        assert router.route(500000, 'balanced') == ['large']
+
+    def test_unknown_tier(self):
+        """Test that unknown tiers are rejected."""
+        with pytest.raises(ValueError, match='Unknown tier'):
+            ModelRouter(table=TABLE).route(100, 'premium')
+
+    def test_input_too_large_for_any_model(self):
+        """Test that oversized inputs are rejected."""
+        with pytest.raises(ValueError, match='No model'):
+            ModelRouter(table=TABLE).route(500000, 'fast')
+
+    def test_high_error_rate_demotes_model(self):
+        """Test that a failing model moves to the end of the fallback list."""
+        router = ModelRouter(table=TABLE, max_error_rate=0.3)
+        for _ in range(5):
+            router.observe('medium', None, False)
+
+        assert router.route(100, 'balanced') == ['large', 'medium']
+        assert router.stats()['medium']['error_rate'] > 0.3
+
+    def test_recovers_after_successes(self):
+        """Test that a demoted model is promoted again once it recovers."""
+        router = ModelRouter(table=TABLE, max_error_rate=0.3)
+        for _ in range(3):
+            router.observe('medium', None, False)
+        for _ in range(10):
+            router.observe('medium', 100, True)
+
+        assert router.route(100, 'balanced') == ['medium', 'large']
+
+    def test_slow_model_demoted_for_latency_tier(self):
+        """Test that a model slower than the tier SLO is demoted."""
+        router = ModelRouter(table=TABLE, tier_latency_slo_ms={'fast': 1000, 'balanced': 10000, 'quality': 30000})
+        for _ in range(3):
+            router.observe('small', 5000, True)
+
+        assert router.route(100, 'fast') == ['medium', 'small']
+
+    def test_single_slow_call_does_not_demote(self):
+        """Test that latency only counts once there are enough samples, averaged rather than taken from the first."""
+        router = ModelRouter(table=TABLE, tier_latency_slo_ms={'fast': 1000, 'balanced': 10000, 'quality': 30000},
+                             clock=lambda: 0.0)
+        router.observe('small', 5000, True)
+
+        assert router.route(100, 'fast') == ['small', 'medium']
+
+        router.observe('small', 500, True)
+        router.observe('small', 500, True)
+
+        assert router.stats()['small']['latency_ms'] == pytest.approx(2000)
+        assert router.route(100, 'fast') == ['medium', 'small']
+
+    def test_demoted_model_recovers_while_idle(self):
+        """Test that a demoted model is tried first again once its failures have faded."""
+        now = [0.0]
+        router = ModelRouter(table=TABLE, max_error_rate=0.3, half_life_s=60, clock=lambda: now[0])
+        for _ in range(5):
+            router.observe('medium', None, False)
+
+        now[0] += 30
+        assert router.route(100, 'balanced') == ['large', 'medium']
+
+        now[0] += 90
+        assert router.route(100, 'balanced') == ['medium', 'large']
+        assert router.stats()['medium']['error_rate'] < 0.3
+
+    def test_slow_model_recovers_while_idle(self):
+        """Test that stale latency samples stop demoting a model."""
+        now = [0.0]
+        router = ModelRouter(table=TABLE, tier_latency_slo_ms={'fast': 1000, 'balanced': 10000, 'quality': 30000},
+                             half_life_s=60, clock=lambda: now[0])
+        for _ in range(3):
+            router.observe('small', 5000, True)
+
+        now[0] += 60
+        assert router.route(100, 'fast') == ['small', 'medium']
+
+    @patch.dict(os.environ, {'MODEL_ROUTING_TABLE': json.dumps(TABLE[:1]), 'MODEL_HEALTH_HALF_LIFE_S': '30'})
+    def test_table_from_environment(self):
+        """Test that the routing table can be configured through the environment."""
+        router = ModelRouter.from_env()
+
+        assert router.tiers == {'fast'}
+        assert router.route(10, 'fast') == ['small']
+        assert router.half_life_s == 30
@@ -0,0 +1,95 @@
+import pytest
+import sys
+import os
+import importlib.util
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import near-duplicate module
+spec = importlib.util.spec_from_file_location("near_duplicate", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "near_duplicate.py"))
+near_duplicate = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(near_duplicate)
+
+# Import the evaluation tool
+spec = importlib.util.spec_from_file_location("evaluate_near_duplicates", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "evaluate_near_duplicates.py"))
+evaluate_near_duplicates = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(evaluate_near_duplicates)
+
+NearDuplicateIndex = near_duplicate.NearDuplicateIndex
+
+ARTICLE = ' '.join(f'Paragraph {index} explains how the council plans to fund new schools next year.' for index in range(15))
+
+
+class TestNearDuplicateIndex:
+    """Test suite for MinHash/LSH near-duplicate reuse."""
+
+    def test_shingles_ignore_case_and_spacing(self):
+        """Test that formatting differences don't change the shingles."""
+        assert near_duplicate.shingles('The  Quick brown fox jumps over') == near_duplicate.shingles('the quick\nbrown fox jumps over')
+
+    def test_python_and_numpy_signatures_match(self):
+        """Test that both MinHash implementations give identical signatures."""
+        pytest.importorskip('numpy')
+        hasher = near_duplicate.MinHasher(32)
+        values = set(range(5000, 5200))
+
+        python_signature = tuple(min((a * value + b) % near_duplicate._PRIME for value in values) for a, b in hasher.coefficients)
+
+        assert hasher.signature(values) == python_signature
+
+    def test_reuses_near_duplicate(self):
+        """Test that a text with a different footer finds the stored entry."""
+        index = NearDuplicateIndex(threshold=0.8)
+        index.add(index.fingerprint(ARTICLE + ' utm_campaign=abc123'), {'summary': 'Schools.'})
+
+        match = index.lookup(index.fingerprint(ARTICLE + ' utm_campaign=zzz999'))
+
+        assert match is not None
+        value, similarity = match
+        assert value == {'summary': 'Schools.'}
+        assert similarity >= 0.8
+        assert index.stats()['hits'] == 1
+
+    def test_rejects_different_text(self):
+        """Test that unrelated texts are not reused."""
+        index = NearDuplicateIndex(threshold=0.8)
+        index.add(index.fingerprint(ARTICLE), {'summary': 'Schools.'})
+        other = ' '.join(f'Item {index} covers the storm forecast for the coastal towns this weekend.' for index in range(15))
+
+        assert index.lookup(index.fingerprint(other)) is None
+
+    def test_scopes_are_isolated(self):
+        """Test that entries never match across scopes (models or prompts)."""
+        index = NearDuplicateIndex()
+        signature = index.fingerprint(ARTICLE)
+        index.add(signature, {'summary': 'Schools.'}, scope='model-a')
+
+        assert index.lookup(signature, scope='model-b') is None
+        assert index.lookup(signature, scope='model-a') is not None
+
+    def test_short_texts_are_not_fingerprinted(self):
+        """Test that texts too short to compare safely are skipped."""
+        assert NearDuplicateIndex(min_shingles=20).fingerprint('Approve the request.') is None
+
+    def test_evicts_least_recently_used(self):
+        """Test that the index stays within max_entries and cleans up buckets."""
+        index = NearDuplicateIndex(max_entries=1, min_shingles=1)
+        first = index.fingerprint(ARTICLE)
+        index.add(first, {'summary': 'one'})
+        index.add(index.fingerprint('A completely different text about the harvest festival in town.'), {'summary': 'two'})
+
+        assert index.lookup(first) is None
+        assert index.stats()['entries'] == 1
+        assert index.stats()['evictions'] == 1
+
+    def test_evaluation_on_labelled_corpus(self):
+        """Test that the evaluation reports hit and false-reuse rates."""
+        corpus = evaluate_near_duplicates.generate_corpus(40, seed=3)
+
+        report = evaluate_near_duplicates.evaluate(corpus, [0.8])
+
+        result = report['results'][0]
+        assert report['positives'] == 20
+        assert result['hit_rate'] >= 0.8
+        assert result['false_reuse_rate'] <= 0.05
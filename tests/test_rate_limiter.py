@@ -0,0 +1,184 @@
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import rate limiter module
+spec = importlib.util.spec_from_file_location("rate_limiter", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "rate_limiter.py"))
+rate_limiter_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rate_limiter_module)
+
+InMemoryRateLimitBackend = rate_limiter_module.InMemoryRateLimitBackend
+DynamoDBRateLimitBackend = rate_limiter_module.DynamoDBRateLimitBackend
+RateLimiter = rate_limiter_module.RateLimiter
+RateLimitExceeded = rate_limiter_module.RateLimitExceeded
+
+
+class FakeClock:
+    """Clock advanced by the fake sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeDynamoDB:
+    """Minimal DynamoDB client supporting conditional puts on one table."""
+
+    def __init__(self):
+        self.items = {}
+        self.conflicts = 0
+
+    def get_item(self, TableName, Key, ConsistentRead):
+        item = self.items.get(Key['bucket_key']['S'])
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, TableName, Item, ConditionExpression, ExpressionAttributeValues):
+        if self.conflicts:
+            self.conflicts -= 1
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}}, 'PutItem')
+        key = Item['bucket_key']['S']
+        current = self.items.get(key)
+        if current and current['version'] != ExpressionAttributeValues[':version']:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}}, 'PutItem')
+        self.items[key] = Item
+
+
+def make_limiter(clock, backend=None, **quota):
+    """Build a limiter with a single test model quota."""
+    quota = {'requests_per_minute': 60, 'tokens_per_minute': 6000, **quota}
+    return RateLimiter(
+        backend or InMemoryRateLimitBackend(clock=clock),
+        quotas={'model': quota},
+        max_wait_seconds=2.0,
+        sleep=clock.sleep,
+        clock=clock
+    )
+
+
+class TestRateLimiter:
+    """Test suite for the token bucket rate limiter."""
+
+    def test_acquire_within_quota(self):
+        """Test that requests within quota are admitted immediately."""
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+
+        assert limiter.acquire('model', 100, 100) == 200
+        assert clock.now == 0
+        assert limiter.stats()['acquired'] == 1
+
+    def test_waits_for_request_refill(self):
+        """Test that a request waits briefly for the request bucket to refill."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, requests_per_minute=60)
+
+        for _ in range(60):
+            limiter.acquire('model', 1, 1)
+        assert clock.now == 0
+
+        limiter.acquire('model', 1, 1)
+
+        assert clock.now == pytest.approx(1.0)
+
+    def test_rejects_when_wait_exceeds_limit(self):
+        """Test that requests are rejected with a retry-after when the wait is too long."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, requests_per_minute=1)
+        limiter.acquire('model', 1, 1)
+
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            limiter.acquire('model', 1, 1)
+
+        assert excinfo.value.retry_after == pytest.approx(60.0)
+        assert limiter.stats()['rejected'] == 1
+
+    def test_waits_for_token_refill(self):
+        """Test that token debt is paid off by waiting when it is short."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, tokens_per_minute=6000)
+
+        limiter.acquire('model', 5900, 0)
+        limiter.acquire('model', 150, 0)
+
+        # 100 tokens per second refill, 50 missing
+        assert clock.now == pytest.approx(0.5)
+        assert limiter.stats()['waited'] == 1
+
+    def test_token_rejection_refunds_request_slot(self):
+        """Test that a token rejection does not consume a request slot."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, requests_per_minute=2, tokens_per_minute=600)
+
+        limiter.acquire('model', 600, 0)
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire('model', 600, 0)
+
+        clock.now += 60
+        limiter.acquire('model', 1, 0)
+        limiter.acquire('model', 1, 0)
+
+    def test_reconcile_charges_actual_usage(self):
+        """Test that actual usage beyond the estimate is debited."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, tokens_per_minute=6000)
+
+        reserved = limiter.acquire('model', 100, 100)
+        limiter.reconcile('model', reserved, {'inputTokens': 3000, 'outputTokens': 2900})
+
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire('model', 1000, 0)
+
+    def test_models_have_independent_buckets(self):
+        """Test that quotas are tracked per model."""
+        clock = FakeClock()
+        limiter = make_limiter(clock, requests_per_minute=1)
+        limiter.quotas['other'] = {'requests_per_minute': 1, 'tokens_per_minute': 6000}
+
+        limiter.acquire('model', 1, 1)
+        limiter.acquire('other', 1, 1)
+
+
+class TestDynamoDBBackend:
+    """Test suite for the shared DynamoDB backend."""
+
+    def test_shared_state_across_limiters(self):
+        """Test that two containers share one quota through the table."""
+        clock = FakeClock()
+        table = FakeDynamoDB()
+        first = make_limiter(clock, DynamoDBRateLimitBackend('buckets', client=table, clock=clock), requests_per_minute=1)
+        second = make_limiter(clock, DynamoDBRateLimitBackend('buckets', client=table, clock=clock), requests_per_minute=1)
+
+        first.acquire('model', 1, 1)
+        with pytest.raises(RateLimitExceeded):
+            second.acquire('model', 1, 1)
+
+    def test_retries_on_conditional_conflict(self):
+        """Test that a concurrent update is retried."""
+        clock = FakeClock()
+        table = FakeDynamoDB()
+        table.conflicts = 2
+        backend = DynamoDBRateLimitBackend('buckets', client=table, clock=clock)
+
+        assert backend.take('model#requests', 1, 10, 1) == 0
+        assert float(table.items['model#requests']['tokens']['N']) == 9
+
+    def test_other_errors_propagate(self):
+        """Test that unexpected DynamoDB errors are raised."""
+        client = MagicMock()
+        client.get_item.return_value = {}
+        client.put_item.side_effect = ClientError({'Error': {'Code': 'AccessDeniedException', 'Message': ''}}, 'PutItem')
+        backend = DynamoDBRateLimitBackend('buckets', client=client)
+
+        with pytest.raises(ClientError):
+            backend.take('model#requests', 1, 10, 1)
@@ -0,0 +1,265 @@
+import pytest
+import sys
+import os
+import time
+import importlib.util
+from unittest.mock import patch
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import resilience module
+spec = importlib.util.spec_from_file_location("resilience", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "resilience.py"))
+resilience_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(resilience_module)
+
+import metrics
+
+CircuitBreaker = resilience_module.CircuitBreaker
+CircuitOpenError = resilience_module.CircuitOpenError
+call_with_retries = resilience_module.call_with_retries
+
+
+def client_error(code):
+    """Build a botocore ClientError with the given code."""
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'Converse')
+
+
+class FakeClock:
+    """Manually advanced clock for breaker tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeContext:
+    """Lambda context with a fixed remaining time."""
+
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class TestErrorClassification:
+    """Test suite for retryable error classification."""
+
+    def test_throttling_and_unavailable_are_retryable(self):
+        """Test that transient Bedrock errors are retryable."""
+        assert resilience_module.is_retryable(client_error('ThrottlingException'))
+        assert resilience_module.is_retryable(client_error('ServiceUnavailableException'))
+        assert resilience_module.is_retryable(EndpointConnectionError(endpoint_url='https://bedrock'))
+
+    def test_client_errors_are_not_retryable(self):
+        """Test that validation and permission errors are not retried."""
+        assert not resilience_module.is_retryable(client_error('ValidationException'))
+        assert not resilience_module.is_retryable(client_error('AccessDeniedException'))
+        assert not resilience_module.is_retryable(ValueError('bad'))
+
+
+class TestCircuitBreaker:
+    """Test suite for the circuit breaker state machine."""
+
+    def test_opens_after_threshold(self):
+        """Test that consecutive failures open the breaker."""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=FakeClock())
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_half_open_probe_closes_on_success(self):
+        """Test that a successful probe after the reset timeout closes the breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.before_call()
+        breaker.record_failure()
+
+        clock.now = 11
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        # Only one probe at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_probe_reopens_on_failure(self):
+        """Test that a failed probe reopens the breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.before_call()
+        breaker.record_failure()
+
+        clock.now = 11
+        breaker.before_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.open_count == 2
+
+
+class TestCallWithRetries:
+    """Test suite for retries with backoff."""
+
+    def setup_method(self):
+        """Reset counters, breaker and deadline before each test."""
+        resilience_module.reset_resilience_state()
+        resilience_module.set_invocation_deadline(None)
+
+    def test_retries_until_success_with_full_jitter(self):
+        """Test that delays are drawn from [0, base * 2^attempt]."""
+        outcomes = [client_error('ThrottlingException'), client_error('ThrottlingException'), 'ok']
+        delays = []
+        bounds = []
+
+        def operation():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        def rng(low, high):
+            bounds.append((low, high))
+            return high
+
+        result = call_with_retries(operation, sleep=delays.append, rng=rng)
+
+        assert result == 'ok'
+        assert bounds == [(0, 0.4), (0, 0.8)]
+        assert delays == [0.4, 0.8]
+        stats = resilience_module.get_resilience_stats()
+        assert stats['retries'] == 2
+        assert stats['circuit_breakers']['default']['state'] == 'closed'
+
+    @patch.dict(os.environ, {'BEDROCK_MAX_ATTEMPTS': '3'})
+    def test_gives_up_after_max_attempts(self):
+        """Test that retries stop after the configured attempts."""
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise client_error('ServiceUnavailableException')
+
+        with pytest.raises(ClientError):
+            call_with_retries(operation, sleep=lambda delay: None)
+
+        assert len(calls) == 3
+        assert resilience_module.get_resilience_stats()['retries_exhausted'] == 1
+
+    def test_non_retryable_error_is_raised_immediately(self):
+        """Test that validation errors are not retried."""
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise client_error('ValidationException')
+
+        with pytest.raises(ClientError):
+            call_with_retries(operation, sleep=lambda delay: None)
+
+        assert len(calls) == 1
+
+    def test_backoff_is_bounded_by_invocation_deadline(self):
+        """Test that no retry is scheduled past the remaining invocation time."""
+        resilience_module.set_invocation_deadline(FakeContext(remaining_ms=1500))
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise client_error('ThrottlingException')
+
+        with pytest.raises(ClientError):
+            call_with_retries(operation, sleep=lambda delay: None, rng=lambda low, high: 1.0)
+
+        assert len(calls) == 1
+        assert resilience_module.get_resilience_stats()['deadline_exceeded'] == 1
+
+    @patch.dict(os.environ, {'BREAKER_FAILURE_THRESHOLD': '2', 'BEDROCK_MAX_ATTEMPTS': '1'})
+    def test_open_breaker_sheds_load(self):
+        """Test that calls fail fast once the breaker is open."""
+        calls = []
+
+        def operation():
+            calls.append(1)
+            raise client_error('ServiceUnavailableException')
+
+        for _ in range(2):
+            with pytest.raises(ClientError):
+                call_with_retries(operation, sleep=lambda delay: None)
+
+        start = time.monotonic()
+        with pytest.raises(CircuitOpenError):
+            call_with_retries(operation, sleep=lambda delay: None)
+
+        assert time.monotonic() - start < 0.05
+        assert len(calls) == 2
+        stats = resilience_module.get_resilience_stats()
+        assert stats['short_circuited'] == 1
+        assert stats['circuit_breakers']['default']['state'] == 'open'
+
+    @patch.dict(os.environ, {'BREAKER_FAILURE_THRESHOLD': '2', 'BEDROCK_MAX_ATTEMPTS': '1'})
+    def test_throttling_does_not_open_breaker(self):
+        """Test that throttled calls are retried but never trip the breaker."""
+        def operation():
+            raise client_error('ThrottlingException')
+
+        for _ in range(3):
+            with pytest.raises(ClientError):
+                call_with_retries(operation, sleep=lambda delay: None)
+
+        assert resilience_module.get_resilience_stats()['circuit_breakers']['default']['state'] == 'closed'
+
+    @patch.dict(os.environ, {'BREAKER_FAILURE_THRESHOLD': '1', 'BREAKER_RESET_SECONDS': '0', 'BEDROCK_MAX_ATTEMPTS': '2'})
+    def test_retries_and_breaker_transitions_are_recorded(self):
+        """Test that retries, throttles and breaker open/close transitions reach the request metrics."""
+        outcomes = [client_error('ThrottlingException'), client_error('ServiceUnavailableException'), 'ok']
+
+        def operation():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        recorder = metrics.MetricsRecorder('Test')
+        token = metrics.current_metrics.set(recorder)
+        try:
+            with pytest.raises(ClientError):
+                call_with_retries(operation, sleep=lambda delay: None)
+            assert call_with_retries(operation, sleep=lambda delay: None) == 'ok'
+        finally:
+            metrics.current_metrics.reset(token)
+
+        assert recorder.values == {'BedrockThrottles': 1, 'BedrockRetries': 1, 'CircuitOpened': 1, 'CircuitClosed': 1}
+
+    def test_client_error_from_half_open_probe_keeps_breaker_half_open(self):
+        """Test that a client error from a probe neither closes the breaker nor blocks the next probe."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        resilience_module.circuit_breakers['default'] = breaker
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        clock.now = 11
+
+        def operation():
+            raise client_error('ValidationException')
+
+        with pytest.raises(ClientError):
+            call_with_retries(operation, sleep=lambda delay: None)
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.consecutive_failures == 2
+        # The probe slot was released for the next call
+        assert call_with_retries(lambda: 'ok', sleep=lambda delay: None) == 'ok'
+        assert breaker.state == CircuitBreaker.CLOSED
+
@@ -0,0 +1,120 @@
+import json
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import job_store as job_store_module
+from router import HttpError, Request, Router, json_response
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+
+def make_request(method, path, body=None, headers=None):
+    event = {'requestContext': {'http': {'method': method, 'path': path}}, 'headers': headers or {}}
+    if body is not None:
+        event['body'] = body
+    return Request(event)
+
+
+class TestRouter:
+    """Test suite for the routing core."""
+
+    def setup_method(self):
+        self.router = Router()
+        self.router.add('GET', '/health', lambda request: json_response(200, {'route': 'health'}))
+        self.router.add('GET', '/jobs/{id}', lambda request: json_response(200, dict(request.params)))
+        self.router.add('POST', '/documents/{id}/append', lambda request: json_response(200, dict(request.params)))
+        self.router.add('GET', '/documents/{id}/summary', lambda request: json_response(200, {'summary': request.params['id']}))
+
+    def test_matches_static_and_parameterized_paths(self):
+        """Test that static paths and path parameters are matched."""
+        assert json.loads(self.router.dispatch(make_request('GET', '/health'))['body']) == {'route': 'health'}
+        assert json.loads(self.router.dispatch(make_request('GET', '/jobs/abc'))['body']) == {'id': 'abc'}
+        assert json.loads(self.router.dispatch(make_request('GET', '/documents/d1/summary'))['body']) == {'summary': 'd1'}
+
+    def test_unknown_path_returns_404(self):
+        """Test that paths without routes return 404, including empty parameters."""
+        for path in ('/nope', '/jobs/', '/jobs/abc/extra', ''):
+            response = self.router.dispatch(make_request('GET', path))
+            assert response['statusCode'] == 404
+            assert json.loads(response['body'])['error'] == 'Endpoint not found'
+
+    def test_wrong_method_returns_405_with_allow(self):
+        """Test that a known path with another method returns 405 and Allow."""
+        response = self.router.dispatch(make_request('DELETE', '/documents/d1/append'))
+
+        assert response['statusCode'] == 405
+        assert response['headers']['Allow'] == 'POST'
+
+    def test_duplicate_route_is_rejected(self):
+        """Test that registering the same method and pattern twice fails."""
+        with pytest.raises(ValueError):
+            self.router.add('GET', '/jobs/{id}', lambda request: None)
+
+    def test_middleware_run_in_registration_order(self):
+        """Test that the first middleware registered runs outermost."""
+        calls = []
+
+        def outer(request, call_next):
+            calls.append('outer')
+            return call_next(request)
+
+        def inner(request, call_next):
+            calls.append('inner')
+            if request.path == '/health':
+                raise HttpError(418, 'Teapot', kind='test')
+            return call_next(request)
+
+        self.router.use(outer)
+        self.router.use(inner)
+        response = self.router.dispatch(make_request('GET', '/health'))
+
+        assert calls == ['outer', 'inner']
+        assert response['statusCode'] == 418
+        assert json.loads(response['body']) == {'error': 'Teapot', 'kind': 'test'}
+
+    def test_headers_are_case_insensitive(self):
+        """Test request header lookup."""
+        assert make_request('GET', '/', headers={'If-None-Match': '"x"'}).header('if-none-match') == '"x"'
+
+
+class TestHandlerMiddleware:
+    """Test suite for the middleware used by the API handler."""
+
+    def test_invalid_json_returns_400(self):
+        """Test that unparseable bodies are rejected before the route runs."""
+        for body in ('{not json', '[1, 2]'):
+            response = handler({'requestContext': {'http': {'method': 'POST', 'path': '/summarize'}}, 'body': body}, None)
+
+            assert response['statusCode'] == 400
+            assert json.loads(response['body'])['error'].startswith('Request body must be')
+
+    def test_job_status_supports_conditional_get(self):
+        """Test that polling with a matching ETag returns 304 without a body."""
+        store = job_store_module.InMemoryJobStore()
+        store.create({'job_id': 'abc', 'status': 'running', 'mode': 'default', 'input': 'x', 'created_at': 1.0, 'updated_at': 1.0})
+        event = {'requestContext': {'http': {'method': 'GET', 'path': '/jobs/abc'}}}
+
+        with patch.object(job_store_module, 'job_store', store):
+            first = handler(event, None)
+            second = handler(dict(event, headers={'if-none-match': first['headers']['ETag']}), None)
+
+        assert first['statusCode'] == 200
+        assert first['headers']['Cache-Control'] == 'no-cache'
+        assert second['statusCode'] == 304
+        assert second['body'] == ''
+
+    def test_health_is_not_cached(self):
+        """Test that route options set Cache-Control."""
+        response = handler({'requestContext': {'http': {'method': 'GET', 'path': '/health'}}}, None)
+
+        assert response['headers']['Cache-Control'] == 'no-store'
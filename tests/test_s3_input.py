@@ -0,0 +1,167 @@
+import json
+import pytest
+import sys
+import os
+import importlib.util
+import urllib.request
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import the emulator tool
+spec = importlib.util.spec_from_file_location("s3_emulator", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "s3_emulator.py"))
+s3_emulator = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(s3_emulator)
+
+import s3_input
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+BUCKET = 'inputs'
+
+
+@pytest.fixture
+def emulator():
+    """Run the S3 emulator and point a fresh client at it."""
+    server, endpoint_url = s3_emulator.start_emulator()
+    environment = {
+        'S3_ENDPOINT_URL': endpoint_url,
+        'INPUT_BUCKET_NAME': BUCKET,
+        'AWS_ACCESS_KEY_ID': 'test',
+        'AWS_SECRET_ACCESS_KEY': 'test',
+        'AWS_REGION': 'us-east-1'
+    }
+    with patch.dict(os.environ, environment), patch.object(s3_input, 's3_client', None):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
+def summarize_event(payload):
+    return {
+        'requestContext': {'http': {'method': 'POST', 'path': '/summarize'}},
+        'body': json.dumps(payload)
+    }
+
+
+class TestReadSource:
+    """Test suite for reading s3:// sources through botocore against the emulator."""
+
+    def test_parse_source(self):
+        """Test that references are split and checked against the allowed buckets."""
+        with patch.dict(os.environ, {'INPUT_BUCKET_NAME': BUCKET, 'S3_ALLOWED_BUCKETS': 'shared, archive'}):
+            assert s3_input.parse_source('s3://inputs/a/b.txt') == ('inputs', 'a/b.txt')
+            assert s3_input.parse_source('s3://archive/c.txt') == ('archive', 'c.txt')
+            with pytest.raises(s3_input.SourceNotAllowed):
+                s3_input.parse_source('s3://elsewhere/c.txt')
+            for source in ('https://inputs/a.txt', 's3://inputs', 's3://inputs/', 42):
+                with pytest.raises(s3_input.InvalidSource):
+                    s3_input.parse_source(source)
+
+    def test_byte_ranges(self):
+        """Test that ranges cover the object exactly."""
+        assert s3_input.byte_ranges(10, 4) == [(0, 3), (4, 7), (8, 9)]
+        assert s3_input.byte_ranges(8, 4) == [(0, 3), (4, 7)]
+        assert s3_input.byte_ranges(3, 4) == [(0, 2)]
+
+    def test_small_object_single_get(self, emulator):
+        """Test that an object within one range is read with a single GET."""
+        emulator.state.put(BUCKET, 'notes.txt', b'Short meeting notes.')
+
+        assert s3_input.read_source('s3://inputs/notes.txt', 1024) == 'Short meeting notes.'
+        assert emulator.state.stats['heads'] == 1
+        assert emulator.state.stats['ranged_gets'] == 1
+
+    def test_ranged_reads_reassemble_multibyte_characters(self, emulator):
+        """Test that characters split across range boundaries decode correctly."""
+        text = 'Café résumé — naïve 日本語 text. ' * 50
+        emulator.state.put(BUCKET, 'unicode.txt', text.encode('utf-8'))
+
+        with patch.dict(os.environ, {'S3_RANGE_BYTES': '7', 'S3_MAX_CONCURRENCY': '4'}):
+            assert s3_input.read_source('s3://inputs/unicode.txt', 1024 * 1024) == text
+        assert emulator.state.stats['ranged_gets'] == -(-len(text.encode('utf-8')) // 7)
+
+    def test_missing_object(self, emulator):
+        with pytest.raises(s3_input.SourceNotFound):
+            s3_input.read_source('s3://inputs/missing.txt', 1024)
+
+    def test_too_large(self, emulator):
+        """Test that oversized objects are rejected after HEAD, without downloading them."""
+        emulator.state.put(BUCKET, 'big.txt', b'x' * 2048)
+
+        with pytest.raises(s3_input.SourceTooLarge):
+            s3_input.read_source('s3://inputs/big.txt', 1024)
+        assert emulator.state.stats['gets'] == 0
+
+    def test_not_utf8(self, emulator):
+        emulator.state.put(BUCKET, 'binary.bin', b'\xff\xfe\x00binary')
+
+        with pytest.raises(s3_input.InvalidSource):
+            s3_input.read_source('s3://inputs/binary.bin', 1024)
+
+
+class TestSummarizeSource:
+    """Test suite for /summarize with an s3:// source and presigned uploads."""
+
+    @patch.object(summarization_module, 'map_reduce_summarize')
+    def test_summarize_source(self, mock_map_reduce, emulator):
+        """Test that the object's text goes to map_reduce by default."""
+        text = 'The quarterly report covers revenue and costs. ' * 20
+        emulator.state.put(BUCKET, 'report.txt', text.encode('utf-8'))
+        mock_map_reduce.return_value = {'summary': 'Report summary.', 'model_id': 'test-model'}
+
+        response = handler(summarize_event({'source': 's3://inputs/report.txt'}), None)
+
+        assert response['statusCode'] == 200
+        assert json.loads(response['body'])['data']['summary'] == 'Report summary.'
+        mock_map_reduce.assert_called_once_with(text)
+
+    @pytest.mark.parametrize('source,status', [
+        ('s3://inputs/missing.txt', 404),
+        ('s3://elsewhere/report.txt', 403),
+        ('http://inputs/report.txt', 400)
+    ])
+    def test_source_errors(self, emulator, source, status):
+        response = handler(summarize_event({'source': source}), None)
+
+        assert response['statusCode'] == status
+
+    def test_source_too_large(self, emulator):
+        emulator.state.put(BUCKET, 'big.txt', b'x' * 2048)
+
+        with patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_source_bytes=1024)):
+            response = handler(summarize_event({'source': 's3://inputs/big.txt'}), None)
+
+        assert response['statusCode'] == 413
+
+    def test_text_and_source(self, emulator):
+        response = handler(summarize_event({'text': 'Inline text.', 'source': 's3://inputs/report.txt'}), None)
+
+        assert response['statusCode'] == 400
+        assert emulator.state.stats['requests'] == 0
+
+    @patch.object(summarization_module, 'map_reduce_summarize')
+    def test_presigned_upload(self, mock_map_reduce, emulator):
+        """Test the full flow: reserve an upload, PUT to the presigned URL, summarize by source."""
+        mock_map_reduce.return_value = {'summary': 'Uploaded summary.', 'model_id': 'test-model'}
+
+        response = handler({'requestContext': {'http': {'method': 'POST', 'path': '/uploads'}}}, None)
+        assert response['statusCode'] == 201
+        upload = json.loads(response['body'])['data']
+        assert upload['method'] == 'PUT'
+        assert upload['source'].startswith('s3://inputs/uploads/')
+
+        text = 'Uploaded transcript of the design review. ' * 10
+        request = urllib.request.Request(upload['upload_url'], data=text.encode('utf-8'), method='PUT')
+        with urllib.request.urlopen(request) as put_response:
+            assert put_response.status == 200
+
+        response = handler(summarize_event({'source': upload['source']}), None)
+
+        assert response['statusCode'] == 200
+        mock_map_reduce.assert_called_once_with(text)
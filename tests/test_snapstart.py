@@ -0,0 +1,84 @@
+import random
+import sys
+import os
+from unittest.mock import Mock, patch
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import boto3
+
+import bedrock_service
+import document_store
+import job_store
+import rate_limiter
+import snapstart
+from summary_cache import get_summary_cache
+
+# No table names, so the stores fall back to memory and nothing needs AWS
+ENVIRONMENT = {
+    'AWS_ACCESS_KEY_ID': 'test',
+    'AWS_SECRET_ACCESS_KEY': 'test',
+    'AWS_REGION': 'us-east-1'
+}
+
+
+class TestSnapStartHooks:
+    """Test suite for the SnapStart before-snapshot and after-restore hooks."""
+
+    def setup_method(self):
+        """Reset global variables before each test."""
+        bedrock_service.bedrock_client = None
+        job_store.job_store = None
+        document_store.document_store = None
+        rate_limiter.rate_limiter = None
+        get_summary_cache().clear()
+
+    @patch.dict(os.environ, ENVIRONMENT, clear=True)
+    def test_prime_builds_clients_without_side_effects(self):
+        """Test that priming creates clients but sends nothing and caches nothing."""
+        with patch.object(bedrock_service, 'warm_bedrock_connection') as mock_warm:
+            snapstart.prime()
+
+        assert bedrock_service.bedrock_client is not None
+        assert job_store.job_store is not None
+        assert document_store.document_store is not None
+        assert rate_limiter.rate_limiter is not None
+        mock_warm.assert_not_called()
+        assert get_summary_cache().stats()['entries'] == 0
+
+    @patch.dict(os.environ, ENVIRONMENT, clear=True)
+    def test_refresh_after_restore_replaces_clients(self):
+        """Test that clients, the default session and the random state are all renewed."""
+        snapstart.prime()
+        client = bedrock_service.bedrock_client
+        limiter = rate_limiter.rate_limiter
+        boto3.setup_default_session()
+        session = boto3.DEFAULT_SESSION
+
+        random.seed(1)
+        snapshot_draw = random.random()
+        random.seed(1)
+        with patch.object(bedrock_service, 'warm_bedrock_connection') as mock_warm:
+            snapstart.refresh_after_restore()
+
+        assert bedrock_service.bedrock_client is not client
+        assert rate_limiter.rate_limiter is not limiter
+        assert boto3.DEFAULT_SESSION is not session
+        assert random.random() != snapshot_draw
+        mock_warm.assert_called_once()
+
+    @patch.dict(os.environ, {'AWS_LAMBDA_INITIALIZATION_TYPE': 'on-demand'})
+    def test_hooks_only_for_snap_start_init(self):
+        with patch.object(snapstart, 'register_before_snapshot', Mock()) as before:
+            assert snapstart.register_hooks() is False
+        before.assert_not_called()
+
+    @patch.dict(os.environ, {'AWS_LAMBDA_INITIALIZATION_TYPE': 'snap-start'})
+    def test_registers_hooks(self):
+        with patch.object(snapstart, 'register_before_snapshot', Mock()) as before, \
+                patch.object(snapstart, 'register_after_restore', Mock()) as after:
+            assert snapstart.register_hooks() is True
+
+        before.assert_called_once_with(snapstart.prime)
+        after.assert_called_once_with(snapstart.refresh_after_restore)
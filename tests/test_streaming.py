@@ -0,0 +1,117 @@
+import json
+import pytest
+import sys
+import os
+import threading
+import importlib.util
+import http.client
+from unittest.mock import patch
+
+# Add the lambda directory to Python path so streaming can import bedrock_service
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import streaming module
+spec = importlib.util.spec_from_file_location("streaming", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "streaming.py"))
+streaming_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(streaming_module)
+
+iter_summary_events = streaming_module.iter_summary_events
+encode_event = streaming_module.encode_event
+
+
+def fake_stream(text):
+    """Yield a summary in three fragments."""
+    yield 'A short '
+    yield 'streamed '
+    yield 'summary.'
+
+
+@pytest.fixture
+def server():
+    """Run the streaming server on an ephemeral port."""
+    httpd = streaming_module.create_server(port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(server, path, payload, headers=None):
+    """POST JSON to the test server and return the response."""
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    connection.request('POST', path, body=json.dumps(payload), headers=headers or {})
+    return connection.getresponse()
+
+
+class TestSummaryEvents:
+    """Test suite for streamed summary events."""
+
+    def test_deltas_then_done_with_metadata(self):
+        """Test that deltas are followed by a done event with length metadata."""
+        with patch.object(streaming_module, 'stream_summary', side_effect=fake_stream):
+            events = list(iter_summary_events('Original text'))
+
+        assert [event['type'] for event in events] == ['delta', 'delta', 'delta', 'done']
+        assert ''.join(event['text'] for event in events[:-1]) == 'A short streamed summary.'
+        assert events[-1]['original_length'] == len('Original text')
+        assert events[-1]['summary_length'] == len('A short streamed summary.')
+
+    def test_error_event_on_failure(self):
+        """Test that a Bedrock failure mid-stream ends with an error event."""
+        def failing_stream(text):
+            yield 'partial'
+            raise Exception('Bedrock service unavailable')
+
+        with patch.object(streaming_module, 'stream_summary', side_effect=failing_stream):
+            events = list(iter_summary_events('Original text'))
+
+        assert events[0] == {'type': 'delta', 'text': 'partial'}
+        assert events[-1]['type'] == 'error'
+        assert 'Bedrock service unavailable' in events[-1]['details']
+
+    def test_encode_ndjson_and_sse(self):
+        """Test both wire formats."""
+        event = {'type': 'delta', 'text': 'hi'}
+
+        assert encode_event(event, 'ndjson') == b'{"type": "delta", "text": "hi"}\n'
+        assert encode_event(event, 'sse') == b'event: delta\ndata: {"type": "delta", "text": "hi"}\n\n'
+
+
+class TestStreamingServer:
+    """Test suite for the HTTP server behind the Lambda Web Adapter."""
+
+    def test_stream_ndjson(self, server):
+        """Test that the summary is delivered as chunked NDJSON."""
+        with patch.object(streaming_module, 'stream_summary', side_effect=fake_stream):
+            response = post(server, '/summarize/stream', {'text': 'Some text'})
+            lines = response.read().decode('utf-8').splitlines()
+
+        assert response.status == 200
+        assert response.getheader('Content-Type') == 'application/x-ndjson'
+        assert response.getheader('Transfer-Encoding') == 'chunked'
+        events = [json.loads(line) for line in lines]
+        assert events[-1] == {'type': 'done', 'original_length': 9, 'summary_length': 25}
+
+    def test_stream_sse(self, server):
+        """Test that SSE is used when the client accepts text/event-stream."""
+        with patch.object(streaming_module, 'stream_summary', side_effect=fake_stream):
+            response = post(server, '/summarize/stream', {'text': 'Some text'}, {'Accept': 'text/event-stream'})
+            body = response.read().decode('utf-8')
+
+        assert response.getheader('Content-Type') == 'text/event-stream'
+        assert body.startswith('event: delta\ndata: ')
+        assert 'event: done' in body
+
+    def test_stream_missing_text(self, server):
+        """Test that missing text is rejected before streaming starts."""
+        response = post(server, '/summarize/stream', {})
+
+        assert response.status == 400
+        assert json.loads(response.read())['error'] == 'Missing required field: text'
+
+    def test_unknown_path(self, server):
+        """Test that unknown paths return 404."""
+        response = post(server, '/unknown', {'text': 'x'})
+
+        assert response.status == 404
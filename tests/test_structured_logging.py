@@ -0,0 +1,91 @@
+import json
+import logging
+import sys
+import os
+import importlib.util
+from unittest.mock import patch, MagicMock
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import structured logging module
+spec = importlib.util.spec_from_file_location("structured_logging", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "structured_logging.py"))
+structured_logging = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(structured_logging)
+
+import summarization
+
+
+class TestStructuredLogging:
+    """Test suite for bounded, structured logging."""
+
+    def test_json_formatter_includes_request_context_and_fields(self):
+        """Test that records are JSON with the bound request fields and extras."""
+        record = logging.LogRecord('root', logging.INFO, __file__, 1, 'Request %s', ('completed',), None)
+        record.status = 200
+        token = structured_logging.bind_request(request_id='req-1', route='/summarize')
+        try:
+            entry = json.loads(structured_logging.JsonFormatter().format(record))
+        finally:
+            structured_logging.reset_request(token)
+
+        assert entry['message'] == 'Request completed'
+        assert entry['level'] == 'INFO'
+        assert entry['request_id'] == 'req-1'
+        assert entry['route'] == '/summarize'
+        assert entry['status'] == 200
+
+    def test_describe_payload_hides_content(self):
+        """Test that payloads are described by size and digest only."""
+        description = structured_logging.describe_payload('secret text')
+
+        assert description['bytes'] == len('secret text')
+        assert len(description['sha256']) == 16
+        assert 'secret' not in json.dumps(description)
+
+    def test_truncate(self):
+        """Test that long fields are cut and short ones kept."""
+        assert structured_logging.truncate('short', max_chars=10) == 'short'
+        assert structured_logging.truncate('x' * 30, max_chars=10) == 'x' * 10 + '...[20 more chars]'
+
+    def test_body_sampling(self):
+        """Test that bodies are only logged at debug level and at the sample rate."""
+        logger = logging.getLogger('sampling-test')
+        logger.setLevel(logging.INFO)
+        with patch.dict(os.environ, {'LOG_BODY_SAMPLE_RATE': '1'}):
+            assert structured_logging.should_log_body(logger) is False
+            logger.setLevel(logging.DEBUG)
+            assert structured_logging.should_log_body(logger, rng=lambda: 0.5) is True
+        with patch.dict(os.environ, {'LOG_BODY_SAMPLE_RATE': '0.1'}):
+            assert structured_logging.should_log_body(logger, rng=lambda: 0.5) is False
+
+    def test_handler_logs_sizes_not_bodies(self, caplog):
+        """Test that the handler logs one bounded record per request."""
+        event = {
+            'requestContext': {'http': {'method': 'POST', 'path': '/unknown'}},
+            'body': json.dumps({'text': 'very private document'})
+        }
+        context = MagicMock(aws_request_id='req-42')
+
+        with caplog.at_level(logging.INFO):
+            summarization.handler(event, context)
+
+        assert 'very private document' not in caplog.text
+        completed = [record for record in caplog.records if record.getMessage() == 'Request completed']
+        assert len(completed) == 1
+        assert completed[0].status == 404
+        assert completed[0].request_length == len(event['body'])
+        assert completed[0].duration_ms >= 0
+
+    def test_sampled_body_log_includes_digest(self, caplog):
+        """Test that a sampled debug body is truncated and carries the full body's size and digest."""
+        body = json.dumps({'text': 'x' * 1000})
+        event = {'requestContext': {'http': {'method': 'POST', 'path': '/unknown'}}, 'body': body}
+
+        with caplog.at_level(logging.DEBUG), patch.dict(os.environ, {'LOG_BODY_SAMPLE_RATE': '1'}):
+            summarization.handler(event, MagicMock(aws_request_id='req-43'))
+
+        logged = [record for record in caplog.records if record.getMessage() == 'Request body']
+        assert len(logged) == 1
+        assert len(logged[0].body) < len(body)
+        assert logged[0].payload == structured_logging.describe_payload(body)
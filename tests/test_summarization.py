@@ -114,7 +114,7 @@ class TestSummarizationHandler:
         body = json.loads(response['body'])
         assert body['error'] == 'Missing required field: text'
     
-    @patch.dict(os.environ, {'MAX_TEXT_LENGTH': '10'})
+    @patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_text_length=10))
     def test_summarize_endpoint_text_exceeds_max_length(self):
         """Test the /summarize endpoint with text exceeding max length."""
         event = {
@@ -138,7 +138,7 @@ class TestSummarizationHandler:
         body = json.loads(response['body'])
         assert body['error'] == 'Text exceeds maximum length of 10 characters'
     
-    @patch.dict(os.environ, {'MAX_TEXT_LENGTH': '500'})
+    @patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_text_length=500))
     def test_summarize_endpoint_text_within_max_length(self):
         """Test the /summarize endpoint with text within max length."""
         with patch.object(summarization_module, 'summarize_text') as mock_summarize:
@@ -211,6 +211,79 @@ class TestSummarizationHandler:
             assert body['error'] == 'Failed to summarize text'
             assert 'Bedrock service unavailable' in body['details']
 
+    def test_summarize_endpoint_circuit_open(self):
+        """Test that an open circuit breaker returns 503 with Retry-After."""
+        with patch.object(summarization_module, 'summarize_text') as mock_summarize:
+            mock_summarize.side_effect = summarization_module.CircuitOpenError(12.3)
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': 'Some text to summarize'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 503
+            assert response['headers']['Retry-After'] == '12'
+            body = json.loads(response['body'])
+            assert body['error'] == 'Summarization service is temporarily unavailable'
+
+    def test_summarize_endpoint_rate_limited(self):
+        """Test that the client-side rate limiter returns 429 with Retry-After."""
+        with patch.object(summarization_module, 'summarize_text') as mock_summarize:
+            mock_summarize.side_effect = summarization_module.RateLimitExceeded('model', 2.2)
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': 'Some text to summarize'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 429
+            assert response['headers']['Retry-After'] == '3'
+            body = json.loads(response['body'])
+            assert body['error'] == 'Too many requests'
+
+    def test_summarize_endpoint_throttled(self):
+        """Test that exhausted throttling retries return 503 instead of 500."""
+        from botocore.exceptions import ClientError
+        with patch.object(summarization_module, 'summarize_text') as mock_summarize:
+            mock_summarize.side_effect = ClientError(
+                {'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'Converse'
+            )
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': 'Some text to summarize'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 503
+            assert response['headers']['Retry-After'] == '1'
+
     def test_unknown_endpoint_returns_404(self):
         """Test that unknown endpoints return 404."""
         event = {
@@ -233,7 +306,7 @@ class TestSummarizationHandler:
 
 
     def test_different_methods_on_health_endpoint(self):
-        """Test that non-GET methods on /health return 404."""
+        """Test that non-GET methods on /health return 405."""
         for method in ['POST', 'PUT', 'DELETE', 'PATCH']:
             event = {
                 'requestContext': {
@@ -246,12 +319,13 @@ class TestSummarizationHandler:
             
             response = handler(event, None)
             
-            assert response['statusCode'] == 404
+            assert response['statusCode'] == 405
+            assert response['headers']['Allow'] == 'GET'
             body = json.loads(response['body'])
-            assert body['error'] == 'Endpoint not found'
+            assert body['error'] == 'Method not allowed'
 
     def test_different_methods_on_summarize_endpoint(self):
-        """Test that non-POST methods on /summarize return 404."""
+        """Test that non-POST methods on /summarize return 405."""
         for method in ['GET', 'PUT', 'DELETE', 'PATCH']:
             event = {
                 'requestContext': {
@@ -264,7 +338,334 @@ class TestSummarizationHandler:
             
             response = handler(event, None)
             
-            assert response['statusCode'] == 404
+            assert response['statusCode'] == 405
+            assert response['headers']['Allow'] == 'POST'
             body = json.loads(response['body'])
-            assert body['error'] == 'Endpoint not found'
+            assert body['error'] == 'Method not allowed'
 
+
+    def test_summarize_endpoint_map_reduce_mode(self):
+        """Test that map_reduce mode accepts text beyond MAX_TEXT_LENGTH."""
+        with patch.object(summarization_module, 'map_reduce_summarize') as mock_map_reduce:
+            mock_map_reduce.return_value = {
+                'summary': 'A summary of a long document.',
+                'original_length': 5000,
+                'summary_length': 29,
+                'chunk_count': 3,
+                'depth': 2
+            }
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': 'x' * 5000,
+                    'mode': 'map_reduce'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 200
+            body = json.loads(response['body'])
+            assert body['data']['chunk_count'] == 3
+            mock_map_reduce.assert_called_once_with('x' * 5000)
+
+    def test_summarize_endpoint_unsupported_mode(self):
+        """Test that an unknown mode is rejected."""
+        event = {
+            'requestContext': {
+                'http': {
+                    'method': 'POST',
+                    'path': '/summarize'
+                }
+            },
+            'body': json.dumps({
+                'text': 'Some text',
+                'mode': 'bogus'
+            })
+        }
+
+        response = handler(event, None)
+
+        assert response['statusCode'] == 400
+        body = json.loads(response['body'])
+        assert body['error'] == 'Unsupported mode: bogus'
+
+    @patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_text_length=20))
+    def test_batch_endpoint_returns_results_in_order(self):
+        """Test that /summarize/batch returns per-item results and errors in input order."""
+        with patch.object(summarization_module, 'summarize_batch') as mock_batch:
+            mock_batch.return_value = [
+                {'index': 0, 'success': True, 'data': {'summary': 'first'}},
+                {'index': 1, 'success': False, 'error': 'Bedrock failed'}
+            ]
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize/batch'
+                    }
+                },
+                'body': json.dumps({
+                    'texts': ['first text', '', 'second text', 'x' * 21]
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 200
+            body = json.loads(response['body'])
+            results = body['data']['results']
+            assert [item['index'] for item in results] == [0, 1, 2, 3]
+            assert results[0]['data']['summary'] == 'first'
+            assert results[1]['error'] == 'Missing required field: text'
+            assert results[2]['error'] == 'Bedrock failed'
+            assert results[3]['error'] == 'Text exceeds maximum length of 20 characters'
+            assert body['data']['succeeded'] == 1
+            assert body['data']['failed'] == 3
+            assert body['success'] is False
+            mock_batch.assert_called_once_with(['first text', 'second text'])
+
+    def test_batch_endpoint_missing_texts(self):
+        """Test that /summarize/batch requires a non-empty texts array."""
+        for payload in [{}, {'texts': []}, {'texts': 'not a list'}]:
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize/batch'
+                    }
+                },
+                'body': json.dumps(payload)
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 400
+            body = json.loads(response['body'])
+            assert body['error'] == 'Missing required field: texts'
+
+    @patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_batch_size=2))
+    def test_batch_endpoint_exceeds_max_size(self):
+        """Test that oversized batches are rejected."""
+        event = {
+            'requestContext': {
+                'http': {
+                    'method': 'POST',
+                    'path': '/summarize/batch'
+                }
+            },
+            'body': json.dumps({'texts': ['a', 'b', 'c']})
+        }
+
+        response = handler(event, None)
+
+        assert response['statusCode'] == 400
+        body = json.loads(response['body'])
+        assert body['error'] == 'Batch exceeds maximum size of 2 texts'
+
+    def test_multi_endpoint_labels_documents(self):
+        """Test that /summarize/multi accepts strings and objects and labels them for attribution."""
+        with patch.object(summarization_module, 'summarize_documents') as mock_documents:
+            mock_documents.return_value = {'summary': 'Combined [INC-1][2].', 'sources': []}
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize/multi'
+                    }
+                },
+                'body': json.dumps({
+                    'documents': [{'id': 'INC-1', 'text': 'Database failover.'}, 'Pager escalation.'],
+                    'tier': 'fast'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 200
+            assert json.loads(response['body'])['data']['summary'] == 'Combined [INC-1][2].'
+            mock_documents.assert_called_once_with(
+                [('INC-1', 'Database failover.'), ('2', 'Pager escalation.')], tier='fast'
+            )
+
+    @patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_text_length=20, max_multi_documents=3))
+    def test_multi_endpoint_validation(self):
+        """Test that invalid documents are rejected with the offending index."""
+        cases = [
+            ({}, 'Missing required field: documents', None),
+            ({'documents': ['a', 'b', 'c', 'd']}, 'Request exceeds maximum of 3 documents', None),
+            ({'documents': ['fine', 'x' * 21]}, 'Text exceeds maximum length of 20 characters', 1),
+            ({'documents': [{'id': 'a', 'text': 'one'}, {'id': 'a', 'text': 'two'}]}, 'Document ids must be unique', None),
+            ({'documents': [{'id': '[x]', 'text': 'one'}]}, 'Document id must be a string of 1 to 100 characters without brackets', 0),
+        ]
+        with patch.object(summarization_module, 'summarize_documents') as mock_documents:
+            for payload, error, index in cases:
+                event = {
+                    'requestContext': {
+                        'http': {
+                            'method': 'POST',
+                            'path': '/summarize/multi'
+                        }
+                    },
+                    'body': json.dumps(payload)
+                }
+
+                response = handler(event, None)
+
+                assert response['statusCode'] == 400
+                body = json.loads(response['body'])
+                assert body['error'] == error
+                assert body.get('index') == index
+            mock_documents.assert_not_called()
+
+    def test_summarize_endpoint_passes_tier(self):
+        """Test that the requested tier is passed to the summarizer."""
+        with patch.object(summarization_module, 'summarize_text') as mock_summarize:
+            mock_summarize.return_value = {
+                'summary': 'Fast summary.',
+                'original_length': 20,
+                'summary_length': 13,
+                'model_id': 'us.anthropic.claude-3-haiku-20240307-v1:0'
+            }
+
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': 'Some text to summarize',
+                    'tier': 'fast'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 200
+            body = json.loads(response['body'])
+            assert body['data']['model_id'] == 'us.anthropic.claude-3-haiku-20240307-v1:0'
+            mock_summarize.assert_called_once_with('Some text to summarize', tier='fast')
+
+    def test_summarize_endpoint_unsupported_tier(self):
+        """Test that an unknown tier is rejected."""
+        event = {
+            'requestContext': {
+                'http': {
+                    'method': 'POST',
+                    'path': '/summarize'
+                }
+            },
+            'body': json.dumps({
+                'text': 'Some text',
+                'tier': 'premium'
+            })
+        }
+
+        response = handler(event, None)
+
+        assert response['statusCode'] == 400
+        body = json.loads(response['body'])
+        assert body['error'] == 'Unsupported tier: premium'
+
+    def test_summarize_endpoint_non_string_tier(self):
+        """Test that a tier that isn't a string is rejected rather than failing the lookup."""
+        event = {
+            'requestContext': {
+                'http': {
+                    'method': 'POST',
+                    'path': '/summarize'
+                }
+            },
+            'body': json.dumps({
+                'text': 'Some text',
+                'tier': ['fast']
+            })
+        }
+
+        response = handler(event, None)
+
+        assert response['statusCode'] == 400
+        assert json.loads(response['body'])['error'] == "Unsupported tier: ['fast']"
+
+    def test_summarize_endpoint_fast_mode(self):
+        """Test that fast mode returns an extractive summary without calling Bedrock."""
+        text = ('Lambda functions scale with traffic. Bedrock models generate summaries. '
+                'Lambda functions and Bedrock models together serve summaries at scale. '
+                'The weather was pleasant. Lambda scales Bedrock summaries.')
+        with patch.object(summarization_module, 'summarize_text') as mock_summarize:
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': text,
+                    'mode': 'fast',
+                    'keep_ratio': 0.4
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 200
+            data = json.loads(response['body'])['data']
+            assert data['extractive'] is True
+            assert data['model_id'] is None
+            assert 'weather' not in data['summary']
+            mock_summarize.assert_not_called()
+
+    def test_summarize_endpoint_invalid_keep_ratio(self):
+        """Test that keep_ratio outside (0, 1] is rejected."""
+        event = {
+            'requestContext': {
+                'http': {
+                    'method': 'POST',
+                    'path': '/summarize'
+                }
+            },
+            'body': json.dumps({
+                'text': 'Some text',
+                'keep_ratio': 1.5
+            })
+        }
+
+        response = handler(event, None)
+
+        assert response['statusCode'] == 400
+        assert 'keep_ratio' in json.loads(response['body'])['error']
+
+    @patch.object(summarization_module, 'config', summarization_module.load_config()._replace(extractive_fallback=True))
+    def test_summarize_endpoint_extractive_fallback(self):
+        """Test that an unavailable Bedrock degrades to an extractive summary when enabled."""
+        with patch.object(summarization_module, 'summarize_text') as mock_summarize:
+            mock_summarize.side_effect = summarization_module.CircuitOpenError(5)
+            event = {
+                'requestContext': {
+                    'http': {
+                        'method': 'POST',
+                        'path': '/summarize'
+                    }
+                },
+                'body': json.dumps({
+                    'text': 'First sentence here. Second sentence here.'
+                })
+            }
+
+            response = handler(event, None)
+
+            assert response['statusCode'] == 200
+            data = json.loads(response['body'])['data']
+            assert data['degraded'] is True
+            assert data['extractive'] is True
@@ -0,0 +1,183 @@
+import pytest
+import sys
+import os
+import threading
+import time
+import importlib.util
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+# Import summary cache module
+spec = importlib.util.spec_from_file_location("summary_cache", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summary_cache.py"))
+summary_cache_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summary_cache_module)
+
+SummaryCache = summary_cache_module.SummaryCache
+make_cache_key = summary_cache_module.make_cache_key
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCacheKey:
+    """Test suite for content-addressed cache keys."""
+
+    def test_whitespace_is_normalized(self):
+        """Test that whitespace differences map to the same key."""
+        assert make_cache_key("a  b\n c", "model", "prompt") == make_cache_key(" a b c ", "model", "prompt")
+
+    def test_model_and_prompt_are_part_of_key(self):
+        """Test that the model id and prompt template change the key."""
+        base = make_cache_key("text", "model", "prompt")
+
+        assert make_cache_key("text", "other-model", "prompt") != base
+        assert make_cache_key("text", "model", "other-prompt") != base
+
+    def test_unicode_normalization(self):
+        """Test that composed and decomposed unicode share a key."""
+        assert make_cache_key("café", "m", "p") == make_cache_key("café", "m", "p")
+
+
+class TestSummaryCache:
+    """Test suite for the LRU summary cache."""
+
+    def test_hit_and_miss_counts(self):
+        """Test that hits and misses are counted."""
+        cache = SummaryCache()
+
+        assert cache.get('k') is None
+        cache.put('k', {'summary': 'v'})
+        assert cache.get('k') == {'summary': 'v'}
+
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_lru_eviction_by_entry_count(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = SummaryCache(max_entries=2)
+        cache.put('a', {'summary': 'a'})
+        cache.put('b', {'summary': 'b'})
+        cache.get('a')
+        cache.put('c', {'summary': 'c'})
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats()['evictions'] == 1
+
+    def test_eviction_by_bytes(self):
+        """Test that the cache stays within its byte budget."""
+        cache = SummaryCache(max_bytes=100)
+        for i in range(10):
+            cache.put(f'k{i}', {'summary': 'x' * 30})
+
+        assert cache.stats()['bytes'] <= 100
+        assert cache.get('k9') is not None
+        assert cache.get('k0') is None
+
+    def test_oversized_entry_is_not_stored(self):
+        """Test that an entry larger than the byte budget is skipped."""
+        cache = SummaryCache(max_bytes=10)
+        cache.put('k', {'summary': 'x' * 100})
+
+        assert cache.get('k') is None
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        cache = SummaryCache(ttl_seconds=10, clock=clock)
+        cache.put('k', {'summary': 'v'})
+
+        clock.now = 9
+        assert cache.get('k') is not None
+        clock.now = 11
+        assert cache.get('k') is None
+        assert cache.stats()['expirations'] == 1
+
+    def test_get_or_compute_caches_result(self):
+        """Test that get_or_compute only computes on a miss."""
+        cache = SummaryCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'summary': 'v'}
+
+        assert cache.get_or_compute('k', compute) == ({'summary': 'v'}, False)
+        assert cache.get_or_compute('k', compute) == ({'summary': 'v'}, True)
+        assert len(calls) == 1
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed computation is retried on the next call."""
+        cache = SummaryCache()
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute('k', lambda: (_ for _ in ()).throw(RuntimeError('boom')))
+
+        assert cache.get_or_compute('k', lambda: {'summary': 'v'}) == ({'summary': 'v'}, False)
+
+    def test_single_flight_deduplicates_concurrent_misses(self):
+        """Test that concurrent identical requests share one computation."""
+        cache = SummaryCache()
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return {'summary': 'shared'}
+
+        results = []
+
+        def worker():
+            results.append(cache.get_or_compute('k', compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(value == {'summary': 'shared'} for value, _ in results)
+        assert cache.stats()['coalesced'] == 4
+
+    def test_single_flight_propagates_errors(self):
+        """Test that waiters see the leader's exception."""
+        cache = SummaryCache()
+        started = threading.Event()
+        errors = []
+
+        def compute():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError('bedrock down')
+
+        def worker():
+            try:
+                cache.get_or_compute('k', compute)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=worker)
+        follower.start()
+        leader.join()
+        follower.join()
+
+        assert errors == ['bedrock down', 'bedrock down']
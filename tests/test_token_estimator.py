@@ -0,0 +1,179 @@
+import json
+import math
+import pytest
+import sys
+import os
+import importlib.util
+from unittest.mock import patch, MagicMock
+
+# Add the lambda directory to Python path so modules can be imported
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+import bedrock_service as bedrock_service_module
+import chunking as chunking_module
+import token_estimator as token_estimator_module
+
+# Import handlers from lambda modules using importlib to avoid reserved keyword issue
+spec = importlib.util.spec_from_file_location("summarization", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "summarization.py"))
+summarization_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(summarization_module)
+handler = summarization_module.handler
+
+TokenEstimator = token_estimator_module.TokenEstimator
+
+PROSE = 'The committee reviewed the budget and agreed to postpone the vote until next week. '
+CODE = 'def f(x):\n    return {"a": [x[0], x[1]], "b": (x * 2) % 3}\n'
+CJK = '会议审查了预算并同意将投票推迟到下周。'
+EMOJI = '🎉🚀👍🔥'
+
+
+def summarize_event(payload, path='/summarize'):
+    return {
+        'requestContext': {'http': {'method': 'POST', 'path': path}},
+        'body': json.dumps(payload)
+    }
+
+
+class TestTokenEstimator:
+    """Test suite for the tokenizer-free token estimate and its calibration."""
+
+    def test_estimate_tokens(self):
+        """Test the estimate for plain letters and empty text."""
+        estimator = TokenEstimator()
+
+        assert estimator.estimate('x' * 400) == 100
+        assert estimator.estimate('') == 1
+
+    def test_counts_character_classes(self):
+        counts = token_estimator_module.count_character_classes('ab 12!\né日🎉')
+
+        assert counts == {
+            'letter': 2, 'digit': 2, 'space': 2, 'punctuation': 1,
+            'two_byte': 1, 'three_byte': 1, 'four_byte': 1
+        }
+
+    def test_dense_text_has_fewer_characters_per_token(self):
+        """Test that code, CJK and emoji are estimated as denser than prose."""
+        estimator = TokenEstimator()
+
+        def chars_per_token(text):
+            return len(text) / estimator.raw_estimate(text)
+
+        assert chars_per_token(PROSE) > 3
+        assert chars_per_token(CODE) < chars_per_token(PROSE)
+        assert chars_per_token(CJK) < 1
+        assert chars_per_token(EMOJI) < chars_per_token(CJK)
+
+    def test_calibrates_per_model(self):
+        """Test that observed usage scales estimates for that model and, by default, for others."""
+        estimator = TokenEstimator(alpha=0.5)
+        raw = estimator.raw_estimate(PROSE * 10)
+
+        estimator.observe('model-a', 200.0, 300)
+        assert estimator.scale('model-a') == pytest.approx(1.5)
+        assert estimator.estimate(PROSE * 10, 'model-a') == pytest.approx(raw * 1.5, abs=1)
+        # Models without observations use the overall scale
+        assert estimator.scale('model-b') == pytest.approx(1.5)
+
+        estimator.observe('model-a', 200.0, 500)
+        assert estimator.scale('model-a') == pytest.approx(2.0)
+
+        stats = estimator.stats()
+        assert stats['models']['model-a']['observations'] == 2
+        assert stats['overall']['observations'] == 2
+        assert stats['models']['model-a']['mean_relative_error'] > 0
+
+    def test_calibration_is_clamped(self):
+        """Test that a bogus usage report can't push the scale out of bounds."""
+        estimator = TokenEstimator()
+
+        estimator.observe('model', 100.0, 1000000)
+        assert estimator.scale('model') == estimator.max_scale
+        estimator.observe('model', 100.0, None)
+        assert estimator.stats()['models']['model']['observations'] == 1
+
+
+class TestTokenBudgets:
+    """Test suite for token-based chunk sizing, maxTokens selection and admission."""
+
+    def setup_method(self):
+        """Reset global variables before each test."""
+        token_estimator_module.token_estimator = None
+        bedrock_service_module.bedrock_client = None
+        bedrock_service_module.get_summary_cache().clear()
+        sys.modules['resilience'].reset_resilience_state()
+        sys.modules['rate_limiter'].rate_limiter = None
+        sys.modules['model_router'].model_router = None
+
+    def test_chunks_are_sized_in_tokens(self):
+        """Test that denser text gets shorter chunks for the same token budget."""
+        prose_chars = chunking_module.chunk_size_for_model(chars_per_token=chunking_module.chars_per_token(PROSE * 10))
+        cjk_chars = chunking_module.chunk_size_for_model(chars_per_token=chunking_module.chars_per_token(CJK * 10))
+
+        assert cjk_chars < prose_chars / 3
+
+    @pytest.mark.parametrize('input_tokens,expected', [(10, 256), (1000, 500), (100000, 2048)])
+    def test_output_token_budget(self, input_tokens, expected):
+        assert bedrock_service_module.output_token_budget(input_tokens) == expected
+
+    @patch('boto3.client')
+    def test_usage_calibrates_estimator(self, mock_boto_client):
+        """Test that maxTokens is derived from the estimate and Bedrock's usage is fed back."""
+        mock_client = MagicMock()
+        mock_boto_client.return_value = mock_client
+        text = PROSE * 40
+        prompt = bedrock_service_module.SUMMARY_PROMPT.format(text=text)
+        raw = TokenEstimator().raw_estimate(prompt)
+        mock_client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'Summary.'}]}},
+            'usage': {'inputTokens': int(raw * 1.2), 'outputTokens': 5}
+        }
+
+        bedrock_service_module.summarize_text(text)
+
+        call = mock_client.converse.call_args.kwargs
+        assert call['inferenceConfig']['maxTokens'] == bedrock_service_module.output_token_budget(math.ceil(raw))
+        estimator = token_estimator_module.get_token_estimator()
+        assert estimator.scale(call['modelId']) == pytest.approx(int(raw * 1.2) / raw)
+
+    def test_admission_by_route_and_tier(self):
+        """Test that limits from INPUT_TOKEN_LIMITS apply per route with per-tier overrides."""
+        limits = summarization_module.parse_token_limits(json.dumps({'POST /summarize': {'fast': 50, '*': 200}}))
+        limited = summarization_module.load_config()._replace(input_token_limits=limits, max_text_length=5000)
+        text = PROSE * 3
+
+        with patch.object(summarization_module, 'config', limited), \
+                patch.object(summarization_module, 'summarize_text', return_value={'summary': 'S.'}) as mock_summarize:
+            rejected = handler(summarize_event({'text': text, 'tier': 'fast'}), None)
+            accepted = handler(summarize_event({'text': text}), None)
+
+        assert rejected['statusCode'] == 400
+        body = json.loads(rejected['body'])
+        assert body['max_tokens'] == 50
+        assert body['estimated_tokens'] > 50
+        assert accepted['statusCode'] == 200
+        mock_summarize.assert_called_once()
+
+    def test_single_call_must_fit_the_tier(self):
+        """Test that text sent in one call is admitted only if some model in the tier can take it."""
+        table = json.dumps([{'model_id': 'small', 'tiers': ['balanced'], 'max_input_tokens': 100}])
+        with patch.dict(os.environ, {'MODEL_ROUTING_TABLE': table}), \
+                patch.object(summarization_module, 'config', summarization_module.load_config()._replace(max_text_length=5000)), \
+                patch.object(summarization_module, 'map_reduce_summarize', return_value={'summary': 'S.'}):
+            single = handler(summarize_event({'text': CJK * 10}), None)
+            chunked = handler(summarize_event({'text': CJK * 10, 'mode': 'map_reduce'}), None)
+
+        assert single['statusCode'] == 400
+        assert json.loads(single['body'])['max_tokens'] == 100
+        assert chunked['statusCode'] == 200
+
+    def test_batch_items_are_admitted_individually(self):
+        limits = summarization_module.parse_token_limits(json.dumps({'POST /summarize/batch': 30}))
+        with patch.object(summarization_module, 'config', summarization_module.load_config()._replace(input_token_limits=limits)), \
+                patch.object(summarization_module, 'summarize_batch', return_value=[{'success': True, 'data': {'summary': 'S.'}}]):
+            response = handler(summarize_event({'texts': ['Short text.', PROSE * 2]}, '/summarize/batch'), None)
+
+        results = json.loads(response['body'])['data']['results']
+        assert results[0]['success'] is True
+        assert results[1]['success'] is False
+        assert 'tokens' in results[1]['error']
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Bedrock Runtime Converse and ConverseStream APIs.
+
+Speaks the same wire protocol as Bedrock (REST JSON for Converse, the binary
+event-stream encoding for ConverseStream), so botocore can call it through
+`endpoint_url` and real HTTP, connection pooling and streaming can be
+measured offline:
+
+    python tools/bedrock_emulator.py --port 8089 --latency lognormal:300:0.5 \\
+        --tokens-per-second 80 --throttle-rate 0.05
+
+    BEDROCK_ENDPOINT_URL=http://127.0.0.1:8089 AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x ...
+
+GET /__stats reports request, connection and error counters; POST /__reset clears them.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+_PATH = re.compile(r'^/model/(?P<model_id>[^/]+)/(?P<operation>converse|converse-stream)$')
+
+# Injectable errors: exception name -> HTTP status, as Bedrock returns them
+ERRORS = {
+    'ThrottlingException': 429,
+    'ServiceUnavailableException': 503,
+    'InternalServerException': 500,
+    'ModelTimeoutException': 408,
+    'ValidationException': 400,
+}
+
+CHARS_PER_TOKEN = 4
+
+
+class LatencyDistribution:
+    """
+    Time to first token, in milliseconds.
+
+    Parsed from 'constant:MS', 'uniform:LOW:HIGH' or 'lognormal:MEDIAN:SIGMA'.
+    """
+
+    def __init__(self, spec='constant:0', rng=None):
+        self.spec = spec
+        self._rng = rng or random.Random()
+        kind, *params = spec.split(':')
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        if kind not in ('constant', 'uniform', 'lognormal') or len(self.params) != {'constant': 1, 'uniform': 2, 'lognormal': 2}[kind]:
+            raise ValueError(f'Invalid latency distribution: {spec}')
+
+    def sample(self):
+        if self.kind == 'constant':
+            return self.params[0]
+        if self.kind == 'uniform':
+            return self._rng.uniform(*self.params)
+        median, sigma = self.params
+        return self._rng.lognormvariate(math.log(max(median, 1e-3)), sigma)
+
+
+def encode_header(name, value):
+    """
+    Encode one string-valued event-stream header
+    """
+    name_bytes = name.encode('utf-8')
+    value_bytes = value.encode('utf-8')
+    return struct.pack('!B', len(name_bytes)) + name_bytes + struct.pack('!BH', 7, len(value_bytes)) + value_bytes
+
+
+def encode_event_message(event_type, payload):
+    """
+    Encode one application/vnd.amazon.eventstream event message
+    """
+    headers = (
+        encode_header(':event-type', event_type)
+        + encode_header(':content-type', 'application/json')
+        + encode_header(':message-type', 'event')
+    )
+    body = json.dumps(payload).encode('utf-8')
+    total_length = 16 + len(headers) + len(body)
+    prelude = struct.pack('!II', total_length, len(headers))
+    prelude += struct.pack('!I', zlib.crc32(prelude))
+    message = prelude + headers + body
+    return message + struct.pack('!I', zlib.crc32(message))
+
+
+def generate_summary(prompt, max_tokens):
+    """
+    Deterministic stand-in output: the opening words of the text being summarized
+    """
+    words = prompt.split('\n\n', 1)[-1].split()
+    # About a fifth of the input, capped by the output token limit
+    words = words[:min(len(words) // 5 + 1, max(1, max_tokens * CHARS_PER_TOKEN // 6))]
+    return ' '.join(words) or 'Empty input.'
+
+
+class EmulatorState:
+    """
+    Behaviour knobs and counters shared by all handler threads
+    """
+
+    def __init__(self, latency='constant:0', tokens_per_second=0.0, throttle_rate=0.0,
+                 error_rate=0.0, error_type='InternalServerException', max_tokens=256, seed=None):
+        self.rng = random.Random(seed)
+        self.latency = LatencyDistribution(latency, self.rng)
+        self.tokens_per_second = tokens_per_second
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.error_type = error_type
+        self.max_tokens = max_tokens
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'connections': 0, 'throttled': 0, 'errors': 0, 'streams': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+            if name == 'in_flight':
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+
+    def pick_error(self):
+        """
+        Decide whether this request fails, returning the exception name or None
+        """
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return 'ThrottlingException'
+        if roll < self.throttle_rate + self.error_rate:
+            return self.error_type
+        return None
+
+
+class BedrockEmulatorHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler so botocore can keep connections alive and pool them
+    """
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this Nagle plus
+    # delayed ACKs add ~40 ms to every response
+    disable_nagle_algorithm = True
+    state = None
+
+    def setup(self):
+        super().setup()
+        self.state.count('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, error_type, message):
+        self._send_json(ERRORS[error_type], {'message': message}, {'x-amzn-ErrorType': f'{error_type}:http://internal.amazon.com/coral/com.amazon.bedrock/'})
+
+    def do_GET(self):
+        if self.path == '/__stats':
+            with self.state.lock:
+                stats = dict(self.state.stats)
+            self._send_json(200, stats)
+        else:
+            # Connection pre-warm probes and anything else unknown
+            self._send_json(404, {'message': 'Not found'})
+
+    def do_POST(self):
+        raw_body = self.rfile.read(int(self.headers.get('Content-Length', '0')))
+        if self.path == '/__reset':
+            self.state.reset()
+            self._send_json(200, {})
+            return
+
+        match = _PATH.match(self.path)
+        if not match:
+            self._send_json(404, {'message': 'Not found'})
+            return
+
+        self.state.count('requests')
+        self.state.count('in_flight')
+        try:
+            self._converse(unquote(match.group('model_id')), match.group('operation') == 'converse-stream', raw_body)
+        finally:
+            self.state.count('in_flight', -1)
+
+    def _converse(self, model_id, stream, raw_body):
+        try:
+            request = json.loads(raw_body or b'{}')
+            prompt = ''.join(block.get('text', '') for message in request['messages'] for block in message['content'])
+        except (ValueError, KeyError, TypeError):
+            self._send_error('ValidationException', 'Malformed input request')
+            return
+
+        error_type = self.state.pick_error()
+        if error_type:
+            self.state.count('throttled' if error_type == 'ThrottlingException' else 'errors')
+            self._send_error(error_type, f'Injected {error_type}')
+            return
+
+        max_tokens = request.get('inferenceConfig', {}).get('maxTokens', self.state.max_tokens)
+        summary = generate_summary(prompt, max_tokens)
+        usage = {
+            'inputTokens': max(1, math.ceil(len(prompt) / CHARS_PER_TOKEN)),
+            'outputTokens': max(1, math.ceil(len(summary) / CHARS_PER_TOKEN)),
+        }
+        usage['totalTokens'] = usage['inputTokens'] + usage['outputTokens']
+
+        started = time.monotonic()
+        time.sleep(self.state.latency.sample() / 1000.0)
+
+        if stream:
+            self.state.count('streams')
+            self._stream(summary, usage, started)
+            return
+
+        if self.state.tokens_per_second > 0:
+            time.sleep(usage['outputTokens'] / self.state.tokens_per_second)
+        self._send_json(200, {
+            'output': {'message': {'role': 'assistant', 'content': [{'text': summary}]}},
+            'stopReason': 'end_turn',
+            'usage': usage,
+            'metrics': {'latencyMs': int((time.monotonic() - started) * 1000)}
+        })
+
+    def _stream(self, summary, usage, started):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.amazon.eventstream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def write(message):
+            self.wfile.write(f"{len(message):X}\r\n".encode('ascii') + message + b"\r\n")
+            self.wfile.flush()
+
+        write(encode_event_message('messageStart', {'role': 'assistant'}))
+        # Emit roughly one token per delta, paced at tokens_per_second
+        fragments = re.findall(r'\S+\s*', summary)
+        for fragment in fragments:
+            if self.state.tokens_per_second > 0:
+                time.sleep(max(1, len(fragment) // CHARS_PER_TOKEN) / self.state.tokens_per_second)
+            write(encode_event_message('contentBlockDelta', {'contentBlockIndex': 0, 'delta': {'text': fragment}}))
+        write(encode_event_message('contentBlockStop', {'contentBlockIndex': 0}))
+        write(encode_event_message('messageStop', {'stopReason': 'end_turn'}))
+        write(encode_event_message('metadata', {'usage': usage, 'metrics': {'latencyMs': int((time.monotonic() - started) * 1000)}}))
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def create_emulator(port=0, host='127.0.0.1', **options):
+    """
+    Create an emulator server; port 0 picks a free port (see server.server_address)
+    """
+    handler_class = type('ConfiguredBedrockEmulatorHandler', (BedrockEmulatorHandler,), {'state': EmulatorState(**options)})
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    server.state = handler_class.state
+    return server
+
+
+def start_emulator(**options):
+    """
+    Start an emulator on a background thread and return (server, endpoint_url)
+    """
+    server = create_emulator(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='constant:0', help="time to first token: constant:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='output pacing (0 = instant)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests rejected with ThrottlingException')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests failed with --error-type')
+    parser.add_argument('--error-type', default='InternalServerException', choices=sorted(ERRORS))
+    parser.add_argument('--max-tokens', type=int, default=256, help='output limit when the request sets none')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = create_emulator(
+        port=args.port,
+        host=args.host,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        error_type=args.error_type,
+        max_tokens=args.max_tokens,
+        seed=args.seed
+    )
+    print(f"Bedrock emulator listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark for one warm container of the summarization handler.
+
+Drives `summarization.handler` in-process with API Gateway v2 events of varying
+sizes and routes, at each requested concurrency, against a fake Bedrock backend:
+
+    python tools/benchmark.py --concurrency 1,8,32 --requests 200
+    python tools/benchmark.py --backend emulator --latency lognormal:300:0.4 --output results.json
+    python tools/benchmark.py --compare results.json
+
+`stub` answers in-process (measures handler overhead); `emulator` goes over real
+HTTP to tools/bedrock_emulator.py (adds botocore, connection pooling, parsing).
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "lambda"))
+sys.path.insert(0, os.path.join(REPO_ROOT, "tools"))
+
+DEFAULT_ROUTES = 'summarize:6,batch:1,map_reduce:1,health:2'
+DEFAULT_SIZES = '200,800,4000,20000'
+
+WORDS = ('the model summarizes long documents into short paragraphs while the service keeps '
+         'latency low and throughput high under load from many concurrent clients').split()
+
+
+class StubBedrockClient:
+    """
+    In-process Converse stand-in with a fixed latency, for measuring handler overhead
+    """
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+
+    def converse(self, modelId, messages, **kwargs):
+        prompt = messages[0]['content'][0]['text']
+        time.sleep(self.latency_ms / 1000.0)
+        summary = ' '.join(prompt.split()[:40])
+        return {
+            'output': {'message': {'role': 'assistant', 'content': [{'text': summary}]}},
+            'stopReason': 'end_turn',
+            'usage': {'inputTokens': len(prompt) // 4, 'outputTokens': len(summary) // 4},
+            'metrics': {'latencyMs': int(self.latency_ms)}
+        }
+
+
+class DiscardMetricsSink:
+    """
+    Serialize EMF records like the stdout sink would, then drop them
+    """
+
+    def emit(self, record):
+        json.dumps(record)
+
+
+def make_text(size, rng):
+    """
+    Roughly size characters of sentence-shaped text, unique per call so the cache misses
+    """
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+        if len(words) % 12 == 0:
+            words[-1] += '.'
+    words.append(str(rng.random()))
+    return ' '.join(words)[:max(size, 1)]
+
+
+def make_event(route, size, rng):
+    """
+    Build an API Gateway HTTP API (payload v2) event for the route
+    """
+    if route == 'health':
+        method, path, body = 'GET', '/health', None
+    elif route == 'batch':
+        method, path = 'POST', '/summarize/batch'
+        body = json.dumps({'texts': [make_text(min(size, 1000), rng) for _ in range(4)]})
+    elif route == 'map_reduce':
+        method, path = 'POST', '/summarize'
+        body = json.dumps({'text': make_text(size, rng), 'mode': 'map_reduce'})
+    else:
+        method, path = 'POST', '/summarize'
+        body = json.dumps({'text': make_text(min(size, 1000), rng)})
+    event = {
+        'version': '2.0',
+        'routeKey': f'{method} {path}',
+        'rawPath': path,
+        'headers': {'content-type': 'application/json'},
+        'requestContext': {
+            'http': {'method': method, 'path': path},
+            'requestId': f'bench-{rng.getrandbits(48):x}'
+        },
+        'isBase64Encoded': False
+    }
+    if body is not None:
+        event['body'] = body
+    return event
+
+
+def parse_weights(spec):
+    """
+    Parse 'name:weight,name:weight' into a dict
+    """
+    weights = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition(':')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_level(handler, events, concurrency):
+    """
+    Send every event through handler with `concurrency` workers and time each call
+    """
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def send(event):
+        started = time.perf_counter()
+        response = handler(event, None)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+            statuses[response['statusCode']] = statuses.get(response['statusCode'], 0) + 1
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, events))
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    return {
+        'concurrency': concurrency,
+        'requests': len(events),
+        'duration_s': round(wall, 4),
+        'throughput_rps': round(len(events) / wall, 2) if wall else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p90': round(percentile(latencies, 0.90), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(max(latencies), 3),
+            'mean': round(sum(latencies) / len(latencies), 3)
+        },
+        'cpu_ms_per_request': round(cpu * 1000.0 / len(events), 3),
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def measure_memory(handler, events):
+    """
+    Peak Python allocation per request, measured sequentially with tracemalloc
+    """
+    peaks = []
+    tracemalloc.start()
+    try:
+        for event in events:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            handler(event, None)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return {'p50_kb': round(percentile(peaks, 0.5) / 1024.0, 1), 'max_kb': round(max(peaks) / 1024.0, 1)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def configure_backend(args):
+    """
+    Point the service at the chosen fake backend; returns a cleanup callable
+    """
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+    os.environ.setdefault('AWS_REGION', 'us-east-1')
+    logging.getLogger().setLevel(logging.WARNING)
+
+    import bedrock_service
+    import metrics
+    metrics.metrics_sink = DiscardMetricsSink()
+
+    if args.backend == 'stub':
+        latency = float(args.latency.split(':')[1]) if args.latency.startswith('constant:') else 0.0
+        bedrock_service.bedrock_client = StubBedrockClient(latency)
+        return lambda: None
+
+    import bedrock_emulator
+    server, endpoint_url = bedrock_emulator.start_emulator(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                                                            throttle_rate=args.throttle_rate, seed=args.seed)
+    os.environ.update({'BEDROCK_ENDPOINT_URL': endpoint_url, 'AWS_ACCESS_KEY_ID': 'bench', 'AWS_SECRET_ACCESS_KEY': 'bench'})
+    bedrock_service.bedrock_client = None
+    return server.shutdown
+
+
+def run_benchmark(args):
+    """
+    Run every concurrency level and return the machine-readable results
+    """
+    cleanup = configure_backend(args)
+    try:
+        import summarization
+
+        rng = random.Random(args.seed)
+        weights = parse_weights(args.routes)
+        sizes = [int(size) for size in args.sizes.split(',')]
+
+        def workload(count):
+            routes = rng.choices(list(weights), weights=list(weights.values()), k=count)
+            return [make_event(route, rng.choice(sizes), rng) for route in routes]
+
+        # Warm up so the numbers describe a warm container
+        for event in workload(args.warmup):
+            summarization.handler(event, None)
+
+        levels = [run_level(summarization.handler, workload(args.requests), int(level)) for level in args.concurrency.split(',')]
+        memory = measure_memory(summarization.handler, workload(min(args.requests, 50))) if args.trace_memory else None
+    finally:
+        cleanup()
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'backend': args.backend,
+            'latency': args.latency,
+            'tokens_per_second': args.tokens_per_second,
+            'throttle_rate': args.throttle_rate,
+            'routes': weights,
+            'sizes': sizes,
+            'requests': args.requests,
+            'seed': args.seed
+        },
+        'levels': levels,
+        'memory_per_request': memory
+    }
+
+
+def compare(current, previous):
+    """
+    Describe throughput and latency changes against a previous result file
+    """
+    lines = [f"vs {previous.get('commit')} ({previous.get('timestamp')}):"]
+    baseline = {level['concurrency']: level for level in previous['levels']}
+    for level in current['levels']:
+        before = baseline.get(level['concurrency'])
+        if not before:
+            continue
+        change = (level['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] * 100.0
+        lines.append(f"  c={level['concurrency']:<4} throughput {change:+.1f}%  "
+                     f"p50 {before['latency_ms']['p50']:.2f} -> {level['latency_ms']['p50']:.2f} ms  "
+                     f"p99 {before['latency_ms']['p99']:.2f} -> {level['latency_ms']['p99']:.2f} ms")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=['stub', 'emulator'], default='stub')
+    parser.add_argument('--latency', default='constant:0', help='Bedrock latency (see tools/bedrock_emulator.py; stub supports constant:MS)')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--concurrency', default='1,4,16', help='comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=200, help='requests per concurrency level')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--routes', default=DEFAULT_ROUTES, help='route mix as name:weight (summarize, batch, map_reduce, health)')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated text sizes in characters')
+    parser.add_argument('--trace-memory', action='store_true', help='also measure peak allocation per request')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write results JSON to this file')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    for level in results['levels']:
+        latency = level['latency_ms']
+        print(f"c={level['concurrency']:<4} {level['throughput_rps']:>9.1f} req/s  "
+              f"p50 {latency['p50']:.2f} ms  p90 {latency['p90']:.2f} ms  p99 {latency['p99']:.2f} ms  "
+              f"cpu {level['cpu_ms_per_request']:.2f} ms/req  statuses {level['status_codes']}")
+    if results['memory_per_request']:
+        print(f"memory per request: p50 {results['memory_per_request']['p50_kb']} KiB, max {results['memory_per_request']['max_kb']} KiB")
+    if args.compare:
+        with open(args.compare) as previous:
+            print(compare(results, json.load(previous)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Enqueue documents for bulk summarization by the ingestion worker.
+
+Reads JSON Lines, one document per line with either "text" or an s3:// "source"
+and optionally "item_id" and "tier", or plain text files with --files (the file
+name becomes the item_id):
+
+    python tools/enqueue_documents.py backfill.jsonl --queue-url "$INGEST_QUEUE_URL"
+    python tools/enqueue_documents.py --files docs/*.txt --tier fast
+    cat backfill.jsonl | python tools/enqueue_documents.py -
+
+Results are stored under each item_id and can be read with GET /jobs/ingest:{item_id}.
+Prints {"sent": n, "failed": [...]} and exits 1 if any document wasn't queued.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "lambda"))
+
+from ingestion import enqueue_documents
+
+
+def _jsonl(path):
+    handle = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    with handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_documents(paths, files=False, tier=None):
+    """
+    Yield documents from JSON Lines paths ('-' for stdin) or, with files=True, text files
+    """
+    for path in paths:
+        if files:
+            with open(path, encoding='utf-8') as handle:
+                documents = [{'item_id': os.path.basename(path), 'text': handle.read()}]
+        else:
+            documents = _jsonl(path)
+        for document in documents:
+            if tier and not document.get('tier'):
+                document = dict(document, tier=tier)
+            yield document
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help="JSON Lines files, '-' for stdin, or text files with --files")
+    parser.add_argument('--files', action='store_true', help='treat paths as plain text documents')
+    parser.add_argument('--queue-url', default=os.environ.get('INGEST_QUEUE_URL'))
+    parser.add_argument('--tier', help='model tier for documents that don\'t set one')
+    parser.add_argument('--concurrency', type=int, default=4, help='SendMessageBatch calls in flight')
+    parser.add_argument('--chunk', type=int, default=1000, help='documents read into memory at a time')
+    args = parser.parse_args(argv)
+    if not args.queue_url:
+        parser.error('--queue-url or INGEST_QUEUE_URL is required')
+
+    documents = read_documents(args.paths, args.files, args.tier)
+    sent, failed = 0, []
+    while True:
+        chunk = list(itertools.islice(documents, args.chunk))
+        if not chunk:
+            break
+        result = enqueue_documents(chunk, args.queue_url, max_workers=args.concurrency)
+        sent += len(result['sent'])
+        failed.extend(result['failed'])
+
+    print(json.dumps({'sent': sent, 'failed': failed}, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Measure near-duplicate summary reuse on a labelled corpus of text pairs.
+
+The corpus is JSONL with one pair per line:
+
+    {"a": "...", "b": "...", "duplicate": true}
+
+For each pair, `a` is indexed and `b` is looked up. A positive pair that is
+reused counts toward the hit rate. A negative pair that is reused counts toward
+the false-reuse rate. Without --corpus, a synthetic corpus is generated: news
+articles with different tracking footers, emails in different boilerplate, and
+hard negatives that share boilerplate or some sentences.
+
+    python tools/evaluate_near_duplicates.py --thresholds 0.6,0.7,0.8,0.9
+    python tools/evaluate_near_duplicates.py --corpus labelled.jsonl --json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda"))
+
+from near_duplicate import NearDuplicateIndex
+
+TOPICS = ['markets', 'weather', 'elections', 'football', 'vaccines', 'startups', 'housing', 'energy', 'courts', 'schools']
+VOCABULARY = ('report said officials announced new plan city council budget growth rate increase decline '
+              'season team players coach win loss storm rain forecast vote candidate poll campaign trial '
+              'judge ruling company investors funding shares prices homes rent power grid solar teachers '
+              'students test scores hospital patients study results researchers data analysis week year').split()
+
+
+def make_article(rng, sentences=14):
+    topic = rng.choice(TOPICS)
+    lines = []
+    for _ in range(sentences):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 18))]
+        words.insert(rng.randrange(len(words)), topic)
+        lines.append(' '.join(words).capitalize() + '.')
+    return lines
+
+
+def tracking_footer(rng):
+    campaign = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(12))
+    return (f"Read more at https://news.example.com/story?utm_source=newsletter&utm_campaign={campaign} "
+            f"You are receiving this because you subscribed. Manage preferences id {rng.randrange(10 ** 8)}.")
+
+
+def email_wrapper(rng, body):
+    greeting = rng.choice(['Hi team,', 'Hello all,', 'Dear colleagues,'])
+    signature = rng.choice(['Best regards, Operations', 'Thanks, The Data Team', 'Cheers, Platform Group'])
+    disclaimer = ('This message and any attachments are confidential and intended solely for the addressee. '
+                  'If you received it in error please notify the sender and delete it.')
+    return f"{greeting}\n\n{body}\n\n{signature}\n\n{disclaimer}"
+
+
+def generate_corpus(pairs, seed=0):
+    """
+    Build a labelled corpus of roughly half duplicate and half distinct pairs
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(pairs):
+        article = make_article(rng)
+        kind = index % 4
+        if kind == 0:
+            # Same article, different tracking footers
+            body = ' '.join(article)
+            corpus.append({'a': f"{body}\n\n{tracking_footer(rng)}", 'b': f"{body}\n\n{tracking_footer(rng)}", 'duplicate': True})
+        elif kind == 1:
+            # Same email body in different boilerplate, with a light edit
+            edited = list(article)
+            edited[rng.randrange(len(edited))] = ' '.join(rng.choice(VOCABULARY) for _ in range(10)).capitalize() + '.'
+            corpus.append({'a': email_wrapper(rng, ' '.join(article)), 'b': email_wrapper(rng, ' '.join(edited)), 'duplicate': True})
+        elif kind == 2:
+            # Different bodies in identical boilerplate
+            wrapper_seed = rng.random()
+            corpus.append({
+                'a': email_wrapper(random.Random(wrapper_seed), ' '.join(article)),
+                'b': email_wrapper(random.Random(wrapper_seed), ' '.join(make_article(rng))),
+                'duplicate': False
+            })
+        else:
+            # A follow-up story that reuses a third of the original
+            shared = article[:len(article) // 3]
+            corpus.append({'a': ' '.join(article), 'b': ' '.join(shared + make_article(rng, len(article) - len(shared))), 'duplicate': False})
+    return corpus
+
+
+def evaluate(corpus, thresholds, bands=16, num_perm=128):
+    """
+    Return hit and false-reuse rates for each threshold
+    """
+    index = NearDuplicateIndex(num_perm=num_perm, bands=bands, min_shingles=1)
+    started = time.perf_counter()
+    signatures = [(index.fingerprint(pair['a']), index.fingerprint(pair['b'])) for pair in corpus]
+    fingerprint_ms = (time.perf_counter() - started) * 1000.0 / (2 * len(corpus))
+
+    positives = sum(1 for pair in corpus if pair['duplicate'])
+    negatives = len(corpus) - positives
+    results = []
+    for threshold in thresholds:
+        index = NearDuplicateIndex(num_perm=num_perm, bands=bands, threshold=threshold, min_shingles=1)
+        hits = false_reuses = 0
+        for position, (pair, (first, second)) in enumerate(zip(corpus, signatures)):
+            # Each pair gets its own scope so pairs can't match each other
+            index.add(first, {'pair': position}, scope=position)
+            if index.lookup(second, scope=position) is not None:
+                if pair['duplicate']:
+                    hits += 1
+                else:
+                    false_reuses += 1
+        results.append({
+            'threshold': threshold,
+            'hit_rate': hits / positives if positives else None,
+            'false_reuse_rate': false_reuses / negatives if negatives else None,
+            'precision': hits / (hits + false_reuses) if hits + false_reuses else None
+        })
+    return {
+        'pairs': len(corpus),
+        'positives': positives,
+        'negatives': negatives,
+        'bands': bands,
+        'num_perm': num_perm,
+        'fingerprint_ms_per_text': round(fingerprint_ms, 3),
+        'results': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='labelled JSONL corpus; a synthetic one is generated if omitted')
+    parser.add_argument('--pairs', type=int, default=400, help='synthetic corpus size')
+    parser.add_argument('--thresholds', default='0.5,0.6,0.7,0.8,0.9')
+    parser.add_argument('--bands', type=int, default=16)
+    parser.add_argument('--num-perm', type=int, default=128)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus) as corpus_file:
+            corpus = [json.loads(line) for line in corpus_file if line.strip()]
+    else:
+        corpus = generate_corpus(args.pairs, args.seed)
+
+    report = evaluate(corpus, [float(value) for value in args.thresholds.split(',')], args.bands, args.num_perm)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['pairs']} pairs ({report['positives']} duplicate, {report['negatives']} distinct), "
+          f"{report['num_perm']} permutations in {report['bands']} bands, "
+          f"{report['fingerprint_ms_per_text']:.2f} ms per fingerprint")
+    for result in report['results']:
+        print(f"  threshold {result['threshold']:.2f}: hit rate {result['hit_rate']:.3f}, "
+              f"false reuse {result['false_reuse_rate']:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
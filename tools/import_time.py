@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Report how long the Lambda handler takes to import, using `python -X importtime`.
+
+Each run uses a fresh interpreter so nothing is cached between samples:
+
+    python tools/import_time.py                 # summary for summarization.py
+    python tools/import_time.py --runs 10 --json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda")
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+# Modules whose presence at import time means the lazy-loading work has regressed
+HEAVY_MODULES = ('boto3', 'botocore')
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output into a list of (module, self_us, cumulative_us, depth)
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure(module, python=sys.executable):
+    """
+    Import module once in a fresh interpreter and return the parsed entries
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=LAMBDA_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def summarize(module, runs, top):
+    """
+    Import module `runs` times and summarize the timings in milliseconds
+    """
+    samples = [measure(module) for _ in range(runs)]
+    totals = [next(cumulative for name, _, cumulative, depth in entries if name == module and depth == 0) for entries in samples]
+
+    # Report the slowest dependencies from the median run
+    median_entries = samples[totals.index(sorted(totals)[len(totals) // 2])]
+    slowest = sorted(median_entries, key=lambda entry: entry[1], reverse=True)[:top]
+    imported = {name.split('.')[0] for name, _, _, _ in median_entries}
+
+    return {
+        'module': module,
+        'runs': runs,
+        'median_ms': statistics.median(totals) / 1000.0,
+        'min_ms': min(totals) / 1000.0,
+        'max_ms': max(totals) / 1000.0,
+        'module_count': len(median_entries),
+        'heavy_modules_loaded': sorted(imported.intersection(HEAVY_MODULES)),
+        'slowest_self_ms': [
+            {'module': name, 'self_ms': self_us / 1000.0, 'cumulative_ms': cumulative_us / 1000.0}
+            for name, self_us, cumulative_us, _ in slowest
+        ]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='summarization', help='module to import (default: summarization)')
+    parser.add_argument('--runs', type=int, default=5, help='number of fresh-interpreter samples')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest modules to list')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args(argv)
+
+    report = summarize(args.module, args.runs, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['module']}: median {report['median_ms']:.1f} ms "
+          f"(min {report['min_ms']:.1f}, max {report['max_ms']:.1f}) over {report['runs']} runs, "
+          f"{report['module_count']} modules")
+    if report['heavy_modules_loaded']:
+        print(f"heavy modules loaded at import: {', '.join(report['heavy_modules_loaded'])}")
+    for entry in report['slowest_self_ms']:
+        print(f"  {entry['self_ms']:8.2f} ms  {entry['module']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of Amazon S3 the service uses.
+
+Serves path-style requests (http://host:port/bucket/key) for PutObject,
+GetObject with Range and If-Match, and HeadObject, with S3's XML errors, so
+botocore and presigned URLs can be exercised offline. Signatures are not
+checked. Objects live in memory.
+
+    python tools/s3_emulator.py --port 8090 --latency-ms 20
+
+    S3_ENDPOINT_URL=http://127.0.0.1:8090 INPUT_BUCKET_NAME=inputs AWS_ACCESS_KEY_ID=x AWS_SECRET_ACCESS_KEY=x ...
+
+GET /__stats reports request counters; POST /__reset clears them and all objects.
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+from xml.sax.saxutils import escape
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class S3State:
+    """
+    Objects and counters shared by all handler threads
+    """
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.objects.clear()
+            self.stats = {'requests': 0, 'puts': 0, 'gets': 0, 'ranged_gets': 0, 'heads': 0, 'bytes_sent': 0}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def put(self, bucket, key, body):
+        """
+        Store an object directly, returning its ETag
+        """
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        with self.lock:
+            self.objects[(bucket, key)] = (body, etag, time.time())
+        return etag
+
+    def get(self, bucket, key):
+        with self.lock:
+            return self.objects.get((bucket, key))
+
+
+class S3EmulatorHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler so botocore can keep connections alive and pool them
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _location(self):
+        path = unquote(urlsplit(self.path).path)
+        bucket, _, key = path.lstrip('/').partition('/')
+        return bucket, key
+
+    def _send(self, status, body=b'', headers=None, content_length=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        # HEAD reports the object's length without sending it
+        self.send_header('Content-Length', str(len(body) if content_length is None else content_length))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+            self.state.count('bytes_sent', len(body))
+
+    def _send_error(self, status, code, message, send_body=True):
+        body = (f'<?xml version="1.0" encoding="UTF-8"?>\n<Error><Code>{code}</Code>'
+                f'<Message>{escape(message)}</Message><RequestId>emulator</RequestId></Error>').encode('utf-8')
+        self._send(status, body if send_body else b'', {'Content-Type': 'application/xml'})
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length', '0')))
+
+    def _pause(self):
+        if self.state.latency_ms:
+            time.sleep(self.state.latency_ms / 1000.0)
+
+    def do_PUT(self):
+        body = self._read_body()
+        self.state.count('requests')
+        bucket, key = self._location()
+        if not bucket:
+            self._send_error(400, 'InvalidBucketName', 'Bucket name is required')
+            return
+        if not key:
+            # CreateBucket; buckets are otherwise implicit
+            self._send(200)
+            return
+        self._pause()
+        self.state.count('puts')
+        self._send(200, headers={'ETag': self.state.put(bucket, key, body)})
+
+    def _object_headers(self, etag, modified):
+        return {
+            'ETag': etag,
+            'Last-Modified': formatdate(modified, usegmt=True),
+            'Accept-Ranges': 'bytes',
+            'Content-Type': 'application/octet-stream'
+        }
+
+    def do_HEAD(self):
+        self.state.count('requests')
+        self.state.count('heads')
+        self._pause()
+        stored = self.state.get(*self._location())
+        if stored is None:
+            self._send_error(404, 'NoSuchKey', 'The specified key does not exist.', send_body=False)
+            return
+        body, etag, modified = stored
+        self._send(200, headers=self._object_headers(etag, modified), content_length=len(body))
+
+    def do_GET(self):
+        if self.path == '/__stats':
+            with self.state.lock:
+                stats = dict(self.state.stats, objects=len(self.state.objects))
+            self._send(200, json.dumps(stats).encode('utf-8'), {'Content-Type': 'application/json'})
+            return
+
+        self.state.count('requests')
+        self.state.count('gets')
+        self._pause()
+        stored = self.state.get(*self._location())
+        if stored is None:
+            self._send_error(404, 'NoSuchKey', 'The specified key does not exist.')
+            return
+        body, etag, modified = stored
+        if_match = self.headers.get('If-Match')
+        if if_match and if_match.strip() not in (etag, '*'):
+            self._send_error(412, 'PreconditionFailed', 'At least one of the pre-conditions you specified did not hold')
+            return
+
+        headers = self._object_headers(etag, modified)
+        range_header = self.headers.get('Range')
+        match = _RANGE.match(range_header or '')
+        if not match:
+            self._send(200, body, headers)
+            return
+
+        self.state.count('ranged_gets')
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), len(body) - 1) if last else len(body) - 1
+        else:
+            start, end = max(0, len(body) - int(last or 0)), len(body) - 1
+        if start >= len(body) or start > end:
+            self._send_error(416, 'InvalidRange', 'The requested range is not satisfiable')
+            return
+        headers['Content-Range'] = f'bytes {start}-{end}/{len(body)}'
+        self._send(206, body[start:end + 1], headers)
+
+    def do_POST(self):
+        self._read_body()
+        if self.path == '/__reset':
+            self.state.reset()
+            self._send(200, b'{}', {'Content-Type': 'application/json'})
+        else:
+            self._send_error(405, 'MethodNotAllowed', 'The specified method is not allowed against this resource.')
+
+
+def create_emulator(port=0, host='127.0.0.1', **options):
+    """
+    Create an emulator server; port 0 picks a free port (see server.server_address)
+    """
+    handler_class = type('ConfiguredS3EmulatorHandler', (S3EmulatorHandler,), {'state': S3State(**options)})
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    server.state = handler_class.state
+    return server
+
+
+def start_emulator(**options):
+    """
+    Start an emulator on a background thread and return (server, endpoint_url)
+    """
+    server = create_emulator(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='added to every object request')
+    args = parser.parse_args(argv)
+
+    server = create_emulator(port=args.port, host=args.host, latency_ms=args.latency_ms)
+    print(f"S3 emulator listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of Amazon SQS the ingestion pipeline uses.
+
+Speaks the AWS JSON 1.0 protocol botocore uses for SQS (CreateQueue,
+GetQueueUrl, GetQueueAttributes, SendMessage(Batch), ReceiveMessage,
+DeleteMessage(Batch), ChangeMessageVisibility) with visibility timeouts,
+receive counts and redrive to a dead-letter queue after maxReceiveCount.
+Signatures are not checked. Messages live in memory.
+
+    python tools/sqs_emulator.py --port 8091 --queue ingest --max-receive-count 3
+
+    SQS_ENDPOINT_URL=http://127.0.0.1:8091 INGEST_QUEUE_URL=http://127.0.0.1:8091/000000000000/ingest ...
+
+deliver() plays the part of Lambda's event source mapping: it receives a
+batch, invokes a handler with an SQS event and deletes every message not
+listed in the handler's batchItemFailures.
+
+GET /__stats reports request counters; POST /__reset clears them and all queues.
+"""
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ACCOUNT_ID = '000000000000'
+REGION = 'us-east-1'
+MAX_BATCH_ENTRIES = 10
+
+
+class QueueError(Exception):
+    """
+    An SQS error response: HTTP status, error code and message
+    """
+
+    def __init__(self, code, message, status=400):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+class Queue:
+    """
+    One queue's attributes and messages, in send order
+    """
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = {
+            'VisibilityTimeout': '30',
+            'MaximumMessageSize': '262144',
+            **attributes
+        }
+        self.messages = []
+
+    @property
+    def arn(self):
+        return f'arn:aws:sqs:{REGION}:{ACCOUNT_ID}:{self.name}'
+
+    @property
+    def redrive_policy(self):
+        policy = self.attributes.get('RedrivePolicy')
+        return json.loads(policy) if policy else None
+
+
+class SQSState:
+    """
+    Queues and counters shared by all handler threads
+    """
+
+    def __init__(self, latency_ms=0.0, clock=time.monotonic):
+        self.latency_ms = latency_ms
+        self.clock = clock
+        self.lock = threading.Condition()
+        self.queues = {}
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.queues.clear()
+            self.stats = {'requests': 0, 'sent': 0, 'received': 0, 'deleted': 0, 'redriven': 0}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def create_queue(self, name, attributes=None):
+        with self.lock:
+            queue = self.queues.get(name)
+            if queue is None:
+                queue = self.queues[name] = Queue(name, attributes or {})
+            return queue
+
+    def queue(self, name_or_url):
+        name = name_or_url.rstrip('/').rsplit('/', 1)[-1]
+        with self.lock:
+            queue = self.queues.get(name)
+        if queue is None:
+            raise QueueError('QueueDoesNotExist', 'The specified queue does not exist.')
+        return queue
+
+    def _queue_by_arn(self, arn):
+        for queue in self.queues.values():
+            if queue.arn == arn:
+                return queue
+        return None
+
+    def send(self, name, body, delay_seconds=0):
+        """
+        Enqueue a message, returning (message_id, md5 of body)
+        """
+        queue = self.queue(name)
+        if len(body.encode('utf-8')) > int(queue.attributes['MaximumMessageSize']):
+            raise QueueError('InvalidParameterValue', 'Message must be shorter than MaximumMessageSize bytes.')
+        message = {
+            'MessageId': str(uuid.uuid4()),
+            'Body': body,
+            'MD5OfBody': hashlib.md5(body.encode('utf-8')).hexdigest(),
+            'SentTimestamp': str(int(time.time() * 1000)),
+            'receive_count': 0,
+            'receipt_handle': None,
+            'visible_at': self.clock() + delay_seconds
+        }
+        with self.lock:
+            queue.messages.append(message)
+            self.stats['sent'] += 1
+            self.lock.notify_all()
+        return message['MessageId'], message['MD5OfBody']
+
+    def _redrive(self, queue, message):
+        policy = queue.redrive_policy
+        if policy is None or message['receive_count'] < int(policy['maxReceiveCount']):
+            return False
+        target = self._queue_by_arn(policy['deadLetterTargetArn'])
+        if target is None:
+            return False
+        queue.messages.remove(message)
+        target.messages.append(dict(message, receive_count=0, receipt_handle=None, visible_at=self.clock()))
+        self.stats['redriven'] += 1
+        return True
+
+    def receive(self, name, max_messages=1, visibility_timeout=None, wait_seconds=0):
+        """
+        Return up to max_messages visible messages, hiding them for the visibility timeout
+        """
+        queue = self.queue(name)
+        if visibility_timeout is None:
+            visibility_timeout = int(queue.attributes['VisibilityTimeout'])
+        deadline = self.clock() + wait_seconds
+        with self.lock:
+            while True:
+                now = self.clock()
+                received = []
+                for message in list(queue.messages):
+                    if len(received) >= max_messages:
+                        break
+                    # Like SQS, a message that was already received maxReceiveCount
+                    # times moves to the dead-letter queue instead of being delivered
+                    if message['visible_at'] > now or self._redrive(queue, message):
+                        continue
+                    message['receive_count'] += 1
+                    message['receipt_handle'] = uuid.uuid4().hex
+                    message['visible_at'] = now + visibility_timeout
+                    received.append({
+                        'MessageId': message['MessageId'],
+                        'ReceiptHandle': message['receipt_handle'],
+                        'MD5OfBody': message['MD5OfBody'],
+                        'Body': message['Body'],
+                        'Attributes': {
+                            'ApproximateReceiveCount': str(message['receive_count']),
+                            'SentTimestamp': message['SentTimestamp']
+                        }
+                    })
+                remaining = deadline - self.clock()
+                if received or remaining <= 0:
+                    self.stats['received'] += len(received)
+                    return received
+                self.lock.wait(min(remaining, 0.05))
+
+    def _find(self, queue, receipt_handle):
+        for message in queue.messages:
+            if message['receipt_handle'] == receipt_handle:
+                return message
+        raise QueueError('ReceiptHandleIsInvalid', f'The input receipt handle "{receipt_handle}" is not valid.')
+
+    def delete(self, name, receipt_handle):
+        queue = self.queue(name)
+        with self.lock:
+            queue.messages.remove(self._find(queue, receipt_handle))
+            self.stats['deleted'] += 1
+
+    def change_visibility(self, name, receipt_handle, visibility_timeout):
+        queue = self.queue(name)
+        with self.lock:
+            self._find(queue, receipt_handle)['visible_at'] = self.clock() + visibility_timeout
+            self.lock.notify_all()
+
+    def attributes(self, name):
+        queue = self.queue(name)
+        now = self.clock()
+        with self.lock:
+            visible = sum(1 for message in queue.messages if message['visible_at'] <= now)
+            return dict(
+                queue.attributes,
+                QueueArn=queue.arn,
+                ApproximateNumberOfMessages=str(visible),
+                ApproximateNumberOfMessagesNotVisible=str(len(queue.messages) - visible)
+            )
+
+    def bodies(self, name):
+        """
+        Bodies of every message in a queue, visible or not, in send order
+        """
+        queue = self.queue(name)
+        with self.lock:
+            return [message['Body'] for message in queue.messages]
+
+
+def deliver(state, name, handler, batch_size=10, context=None):
+    """
+    Deliver one batch from queue name to handler the way Lambda's SQS event
+    source mapping does with ReportBatchItemFailures. Returns the number of
+    messages delivered.
+
+    Failed messages are made visible again at once rather than after the
+    visibility timeout, so retries can be driven without waiting.
+    """
+    queue = state.queue(name)
+    messages = state.receive(name, batch_size)
+    if not messages:
+        return 0
+
+    event = {'Records': [{
+        'messageId': message['MessageId'],
+        'receiptHandle': message['ReceiptHandle'],
+        'body': message['Body'],
+        'attributes': message['Attributes'],
+        'messageAttributes': {},
+        'md5OfBody': message['MD5OfBody'],
+        'eventSource': 'aws:sqs',
+        'eventSourceARN': queue.arn,
+        'awsRegion': REGION
+    } for message in messages]}
+
+    try:
+        response = handler(event, context)
+        failed = {failure['itemIdentifier'] for failure in (response or {}).get('batchItemFailures', [])}
+    except Exception:
+        # An exception fails the whole batch
+        failed = {message['MessageId'] for message in messages}
+
+    for message in messages:
+        if message['MessageId'] in failed:
+            state.change_visibility(name, message['ReceiptHandle'], 0)
+        else:
+            state.delete(name, message['ReceiptHandle'])
+    return len(messages)
+
+
+def drain(state, name, handler, batch_size=10, context=None, max_batches=1000):
+    """
+    Deliver batches until the queue is empty (or max_batches). Returns the number of batches.
+    """
+    for batch in range(max_batches):
+        if not deliver(state, name, handler, batch_size, context):
+            return batch
+    return max_batches
+
+
+class SQSEmulatorHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/1.1 handler so botocore can keep connections alive and pool them
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, content_type='application/x-amz-json-1.0'):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _queue_url(self, name):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/{ACCOUNT_ID}/{name}'
+
+    def do_GET(self):
+        if self.path == '/__stats':
+            with self.state.lock:
+                stats = dict(self.state.stats, queues={name: len(queue.messages) for name, queue in self.state.queues.items()})
+            self._send(200, stats, 'application/json')
+        else:
+            self._send(404, {'__type': 'com.amazonaws.sqs#InvalidAction', 'message': 'Not found'})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', '0')))
+        if self.path == '/__reset':
+            self.state.reset()
+            self._send(200, {}, 'application/json')
+            return
+
+        self.state.count('requests')
+        action = self.headers.get('X-Amz-Target', '').rpartition('.')[2]
+        operation = getattr(self, f'_{action}', None)
+        if operation is None:
+            self._send(400, {'__type': 'com.amazonaws.sqs#InvalidAction', 'message': f'Unknown action {action}'})
+            return
+        if self.state.latency_ms:
+            time.sleep(self.state.latency_ms / 1000.0)
+        try:
+            self._send(200, operation(json.loads(body or b'{}')))
+        except QueueError as e:
+            self._send(e.status, {'__type': f'com.amazonaws.sqs#{e.code}', 'message': str(e)})
+
+    def _CreateQueue(self, request):
+        self.state.create_queue(request['QueueName'], request.get('Attributes'))
+        return {'QueueUrl': self._queue_url(request['QueueName'])}
+
+    def _GetQueueUrl(self, request):
+        self.state.queue(request['QueueName'])
+        return {'QueueUrl': self._queue_url(request['QueueName'])}
+
+    def _GetQueueAttributes(self, request):
+        attributes = self.state.attributes(request['QueueUrl'])
+        names = request.get('AttributeNames') or ['All']
+        if 'All' not in names:
+            attributes = {name: value for name, value in attributes.items() if name in names}
+        return {'Attributes': attributes}
+
+    def _SendMessage(self, request):
+        message_id, md5 = self.state.send(request['QueueUrl'], request['MessageBody'], request.get('DelaySeconds', 0))
+        return {'MessageId': message_id, 'MD5OfMessageBody': md5}
+
+    def _SendMessageBatch(self, request):
+        queue = self.state.queue(request['QueueUrl'])
+        entries = request.get('Entries', [])
+        if not entries:
+            raise QueueError('EmptyBatchRequest', 'There should be at least one SendMessageBatchRequestEntry in the request.')
+        if len(entries) > MAX_BATCH_ENTRIES:
+            raise QueueError('TooManyEntriesInBatchRequest', f'Maximum number of entries per request are {MAX_BATCH_ENTRIES}.')
+        if sum(len(entry['MessageBody'].encode('utf-8')) for entry in entries) > int(queue.attributes['MaximumMessageSize']):
+            raise QueueError('BatchRequestTooLong', 'Batch requests cannot be longer than MaximumMessageSize bytes.')
+
+        successful, failed = [], []
+        for entry in entries:
+            try:
+                message_id, md5 = self.state.send(queue.name, entry['MessageBody'], entry.get('DelaySeconds', 0))
+            except QueueError as e:
+                failed.append({'Id': entry['Id'], 'SenderFault': True, 'Code': e.code, 'Message': str(e)})
+            else:
+                successful.append({'Id': entry['Id'], 'MessageId': message_id, 'MD5OfMessageBody': md5})
+        return {'Successful': successful, 'Failed': failed}
+
+    def _ReceiveMessage(self, request):
+        messages = self.state.receive(
+            request['QueueUrl'],
+            min(int(request.get('MaxNumberOfMessages', 1)), MAX_BATCH_ENTRIES),
+            request.get('VisibilityTimeout'),
+            min(int(request.get('WaitTimeSeconds', 0)), 20)
+        )
+        return {'Messages': messages} if messages else {}
+
+    def _DeleteMessage(self, request):
+        self.state.delete(request['QueueUrl'], request['ReceiptHandle'])
+        return {}
+
+    def _DeleteMessageBatch(self, request):
+        successful, failed = [], []
+        for entry in request.get('Entries', []):
+            try:
+                self.state.delete(request['QueueUrl'], entry['ReceiptHandle'])
+            except QueueError as e:
+                failed.append({'Id': entry['Id'], 'SenderFault': True, 'Code': e.code, 'Message': str(e)})
+            else:
+                successful.append({'Id': entry['Id']})
+        return {'Successful': successful, 'Failed': failed}
+
+    def _ChangeMessageVisibility(self, request):
+        self.state.change_visibility(request['QueueUrl'], request['ReceiptHandle'], int(request['VisibilityTimeout']))
+        return {}
+
+
+def create_emulator(port=0, host='127.0.0.1', **options):
+    """
+    Create an emulator server; port 0 picks a free port (see server.server_address)
+    """
+    handler_class = type('ConfiguredSQSEmulatorHandler', (SQSEmulatorHandler,), {'state': SQSState(**options)})
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    server.state = handler_class.state
+    return server
+
+
+def start_emulator(**options):
+    """
+    Start an emulator on a background thread and return (server, endpoint_url)
+    """
+    server = create_emulator(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}'
+
+
+def create_queue_with_dlq(state, name, max_receive_count=3, visibility_timeout=30):
+    """
+    Create queue name and name-dlq with a redrive policy between them
+    """
+    dead_letter_queue = state.create_queue(f'{name}-dlq')
+    return state.create_queue(name, {
+        'VisibilityTimeout': str(visibility_timeout),
+        'RedrivePolicy': json.dumps({'deadLetterTargetArn': dead_letter_queue.arn, 'maxReceiveCount': str(max_receive_count)})
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='added to every queue request')
+    parser.add_argument('--queue', action='append', default=[], help='queue to create at startup, with a <name>-dlq')
+    parser.add_argument('--max-receive-count', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    server = create_emulator(port=args.port, host=args.host, latency_ms=args.latency_ms)
+    for name in args.queue:
+        create_queue_with_dlq(server.state, name, args.max_receive_count)
+    print(f"SQS emulator listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())